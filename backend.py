@@ -1,16 +1,40 @@
 import os
 import json
+import hashlib
+import base64
 import smtplib
 import socket
 import sqlite3
 import random 
+import bisect
 import re
+import threading
+import queue
+import time
+import functools
+import zlib
+import contextlib
+import abc
+from collections import OrderedDict, namedtuple
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import click
+from email import message_from_string
 from email.mime.text import MIMEText
-from flask import Flask, request, jsonify, send_file
+from email.mime.multipart import MIMEMultipart
+from datetime import datetime, timedelta, timezone
+import jinja2
+import jinja2.sandbox
+from flask import Flask, Request, Response, request, jsonify, send_file, stream_with_context, g
 from flask_cors import CORS, cross_origin
+from werkzeug.exceptions import ClientDisconnected, RequestEntityTooLarge
+from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
-import pandas as pd
+import openpyxl
+import numpy as np
 import io
+import csv
+import tempfile
 
 
 PDF_EXTRACTION_AVAILABLE = False
@@ -30,6 +54,23 @@ except ImportError:
         print("WARNING: No PDF extraction library found. Install pdfplumber or PyPDF2 for resume highlighting.")
         print("Install with: pip install pdfplumber") 
 
+# Optional PostgreSQL driver for the shared application store (DATABASE_URL)
+try:
+    import psycopg2
+    import psycopg2.extras
+    import psycopg2.pool
+    POSTGRES_AVAILABLE = True
+except ImportError:
+    POSTGRES_AVAILABLE = False
+
+# Optional Parquet writer for /api/export.parquet
+try:
+    import pyarrow
+    import pyarrow.parquet
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -75,9 +116,81 @@ UPLOAD_FOLDER = 'resumes'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 ALLOWED_EXTENSIONS = {'pdf', 'jpg', 'jpeg'}
+# Uploads stream into this folder (same filesystem as UPLOAD_FOLDER) and are renamed into place
+UPLOAD_TMP_FOLDER = os.path.join(UPLOAD_FOLDER, '.incoming')
+os.makedirs(UPLOAD_TMP_FOLDER, exist_ok=True)
+RESUME_MAX_BYTES = int(os.getenv('RESUME_MAX_BYTES', 10 * 1024 * 1024))
+# Request bodies above this are refused with 413 before they are read (room for multipart framing)
+app.config['MAX_CONTENT_LENGTH'] = RESUME_MAX_BYTES + 1024 * 1024
+# Content-addressed resume storage: resumes/blobs/<sha[:2]>/<sha[2:4]>/<sha256>
+RESUME_BLOB_FOLDER = os.path.join(UPLOAD_FOLDER, 'blobs')
+os.makedirs(RESUME_BLOB_FOLDER, exist_ok=True)
+# Blobs no resume references any more are kept this long before garbage collection removes them
+RESUME_BLOB_GC_GRACE_SECONDS = int(os.getenv('RESUME_BLOB_GC_GRACE_SECONDS', 3600))
+# Hand resume bodies to the front server: X-Sendfile (Apache/lighttpd) or an nginx
+# internal location mapped onto RESUME_BLOB_FOLDER (X-Accel-Redirect)
+app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE', 'false').lower() in ('1', 'true', 'yes')
+RESUME_ACCEL_REDIRECT_PREFIX = os.getenv('RESUME_ACCEL_REDIRECT_PREFIX', '').strip()
+# Resumable upload sessions (and stray partial files) idle longer than this are discarded
+UPLOAD_SESSION_TTL_SECONDS = int(os.getenv('UPLOAD_SESSION_TTL_SECONDS', 24 * 3600))
 DATABASE = 'applications.db'
+# Shared store for applications and invites: a postgresql:// URL lets several
+# app nodes share them; empty keeps them in the local SQLite DATABASE
+DATABASE_URL = os.getenv('DATABASE_URL', '').strip()
+PG_POOL_MAX = int(os.getenv('PG_POOL_MAX', 10))
+# SQLite connection pool: idle connections kept per process and per-connection pragmas
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 8))
+DB_BUSY_TIMEOUT_MS = int(os.getenv('DB_BUSY_TIMEOUT_MS', 5000))
+DB_MMAP_SIZE = int(os.getenv('DB_MMAP_SIZE', 256 * 1024 * 1024))
+DB_CACHE_SIZE_KB = int(os.getenv('DB_CACHE_SIZE_KB', 20000))
 EXCEL_FILE = 'All_Applications_Export.xlsx' 
+# Quiet period after the last edit before the Excel export is rebuilt in the background
+EXCEL_REBUILD_DELAY_SECONDS = float(os.getenv('EXCEL_REBUILD_DELAY_SECONDS', 30))
+# A steady stream of edits still gets a rebuild this long after the first one
+EXCEL_REBUILD_MAX_WAIT_SECONDS = float(os.getenv('EXCEL_REBUILD_MAX_WAIT_SECONDS', 300))
 PUBLIC_BASE_URL = os.getenv('PUBLIC_BASE_URL', 'http://127.0.0.1:5000')
+# SMTP session pool: idle logged-in sessions kept per process, and how long one may sit idle
+SMTP_POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', 4))
+SMTP_IDLE_SECONDS = float(os.getenv('SMTP_IDLE_SECONDS', 60))
+SMTP_TIMEOUT_SECONDS = float(os.getenv('SMTP_TIMEOUT_SECONDS', 15))
+BULK_INVITE_MAX = 500  # applicants per bulk invite request
+# Email outbox: delivery worker threads per process (0 disables them), retries and rate limits
+EMAIL_WORKERS = int(os.getenv('EMAIL_WORKERS', 2))
+EMAIL_MAX_ATTEMPTS = int(os.getenv('EMAIL_MAX_ATTEMPTS', 6))
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv('EMAIL_RETRY_BASE_SECONDS', 30))
+EMAIL_LEASE_SECONDS = 300  # sending rows older than this are assumed orphaned by a dead worker
+EMAIL_POLL_SECONDS = 2.0
+# Per-provider caps (messages per minute, per day; None = no cap), keyed by EMAIL_HOST.
+# Gmail allows about 500 messages a day from personal accounts (2000 on Workspace).
+EMAIL_PROVIDER_RATE_LIMITS = {
+    'smtp.gmail.com': (20, 500),
+}
+EMAIL_DEFAULT_RATE_LIMITS = (60, None)
+# Background job queue (resume processing, confirmation emails). JOB_WORKERS=0
+# disables the in-process workers, e.g. when a separate run-workers process runs them.
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 5))
+JOB_RETRY_BASE_SECONDS = float(os.getenv('JOB_RETRY_BASE_SECONDS', 10))
+JOB_LEASE_SECONDS = 600  # running jobs older than this are assumed orphaned by a dead worker
+JOB_POLL_SECONDS = 2.0
+RESCORE_CHUNK_SIZE = int(os.getenv('RESCORE_CHUNK_SIZE', 200))
+RESCORE_LEASE_SECONDS = 900  # a running rescore run not checkpointed for this long is assumed abandoned
+# Version of the scoring rules in simulate_ats_scoring. Bump it whenever the
+# rules change so persisted rows in ats_scores get recomputed on next access.
+ATS_SCORING_VERSION = 2
+# Version of the highlighted resume markup (highlight_text_in_resume); bump it
+# when that output changes so cached fragments are discarded
+HIGHLIGHTED_HTML_VERSION = 2
+HIGHLIGHTED_HTML_CACHE_MAX_ENTRIES = int(os.getenv('HIGHLIGHTED_HTML_CACHE_MAX_ENTRIES', 5000))
+# Score jitter: 'seeded' derives the +/-2 jitter from (app_id, ATS_SCORING_VERSION)
+# so scores are reproducible, 'random' draws it per call, 'off' disables it.
+ATS_SCORING_JITTER = os.getenv('ATS_SCORING_JITTER', 'seeded').strip().lower()
+if ATS_SCORING_JITTER not in ('seeded', 'random', 'off'):
+    print(f"WARNING: Unknown ATS_SCORING_JITTER '{ATS_SCORING_JITTER}', using 'seeded'.")
+    ATS_SCORING_JITTER = 'seeded'
+# Version stamped on ats_scores rows: scores depend on the jitter mode as well as
+# the rules, so changing either makes every stored row stale
+ATS_SCORE_ROW_VERSION = ATS_SCORING_VERSION * 10 + ('seeded', 'random', 'off').index(ATS_SCORING_JITTER)
 
 # NEW: Load Recruiter Authentication Key
 RECRUITER_KEY = os.getenv("RECRUITER_API_KEY") 
@@ -91,6 +204,8 @@ def init_db():
     """Initializes the SQLite database structure."""
     conn = sqlite3.connect(DATABASE)
     cursor = conn.cursor()
+    # WAL lets readers proceed while one writer commits; the mode is stored in the database file
+    cursor.execute("PRAGMA journal_mode=WAL")
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS applications (
             app_id TEXT PRIMARY KEY,
@@ -131,225 +246,1566 @@ def init_db():
         cursor.execute("ALTER TABLE invites ADD COLUMN rsvp_response_at TEXT")
     except Exception:
         pass
+    # Last-write timestamps for incremental exports (updated_since)
+    for table in ('applications', 'invites'):
+        try:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN updated_at TEXT")
+        except Exception:
+            pass
+    # Materialized ATS scores, recomputed only when inputs or scoring rules change
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ats_scores (
+            app_id TEXT PRIMARY KEY,
+            job_title TEXT,
+            score INTEGER NOT NULL,
+            has_resume INTEGER NOT NULL DEFAULT 0,
+            resume_file TEXT,
+            details TEXT,
+            input_hash TEXT,
+            scoring_version INTEGER NOT NULL,
+            scored_at TEXT
+        )
+    ''')
+    # Schedule listing: newest invites first, filterable by recruiter, interviewer and status
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_invites_invited_at ON invites (invited_at, app_id)")
+    # Filtered schedule pages are read in (invited_at, app_id) order from the filter's index
+    for column in ('recruiter', 'interviewer', 'application_status'):
+        cursor.execute(f"DROP INDEX IF EXISTS idx_invites_{column}")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_invites_{column}_keyset ON invites ({column}, invited_at, app_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ats_scores_score ON ats_scores (score DESC, app_id)")
+    # Keyset pagination indexes for /api/scored_applications: (score, app_id) order, optionally per job or resume flag
+    cursor.execute("DROP INDEX IF EXISTS idx_ats_scores_resume_score")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ats_scores_resume_keyset ON ats_scores (has_resume, score DESC, app_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ats_scores_job_keyset ON ats_scores (job_title, score DESC, app_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ats_scores_version ON ats_scores (scoring_version)")
+    # Index of uploaded resume files so lookups never scan the upload folder
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS resumes (
+            app_id TEXT PRIMARY KEY,
+            stored_path TEXT NOT NULL,
+            file_name TEXT NOT NULL,
+            mime_type TEXT,
+            size_bytes INTEGER,
+            sha256 TEXT,
+            uploaded_at TEXT
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_resumes_sha256 ON resumes (sha256)")
+    # One row per stored resume blob; ref_count = resumes rows pointing at it
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS resume_blobs (
+            sha256 TEXT PRIMARY KEY,
+            size_bytes INTEGER NOT NULL,
+            mime_type TEXT,
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT DEFAULT (datetime('now')),
+            unreferenced_at REAL
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_resume_blobs_unreferenced ON resume_blobs (unreferenced_at) WHERE ref_count <= 0")
+    # Lets readers notice files changed on disk without rehashing them
+    try:
+        cursor.execute("ALTER TABLE resumes ADD COLUMN mtime_ns INTEGER")
+    except Exception:
+        pass
+    # Precomputed highlights for the current score inputs (filled by the job worker)
+    try:
+        cursor.execute("ALTER TABLE ats_scores ADD COLUMN highlights TEXT")
+    except Exception:
+        pass
+    # Invite status copied from the application store so listings filter on it with one indexed query
+    try:
+        cursor.execute("ALTER TABLE ats_scores ADD COLUMN application_status TEXT NOT NULL DEFAULT 'Open'")
+    except Exception:
+        pass
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ats_scores_status_keyset ON ats_scores (application_status, score DESC, app_id)")
+    # Applications whose score inputs changed outside the application store (e.g. a new
+    # resume); their scores were dropped and are recomputed by the next listing
+    cursor.execute("CREATE TABLE IF NOT EXISTS ats_score_pending (app_id TEXT PRIMARY KEY)")
+    # High-water marks for data copied incrementally from the application store
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_state (
+            name TEXT PRIMARY KEY,
+            synced_until TEXT NOT NULL
+        )
+    ''')
+    # Extracted resume text, keyed by file content hash
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS resume_text_cache (
+            sha256 TEXT PRIMARY KEY,
+            extractor TEXT,
+            text TEXT NOT NULL,
+            pages TEXT NOT NULL,
+            extracted_at TEXT
+        )
+    ''')
+    # Rendered highlighted-resume fragments (zlib-compressed HTML), keyed by everything they depend on
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS highlighted_html_cache (
+            cache_key TEXT PRIMARY KEY,
+            resume_sha256 TEXT NOT NULL,
+            render_version TEXT NOT NULL,
+            matched_keywords INTEGER NOT NULL,
+            html BLOB NOT NULL,
+            created_at REAL NOT NULL
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_highlighted_html_sha256 ON highlighted_html_cache (resume_sha256)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_highlighted_html_created_at ON highlighted_html_cache (created_at)")
+    # Fragments rendered under older markup or scoring rules can never be hit again
+    cursor.execute("DELETE FROM highlighted_html_cache WHERE render_version != ?",
+                   (f"{HIGHLIGHTED_HTML_VERSION}.{ATS_SCORING_VERSION}",))
+    # Persistent background job queue
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            app_id TEXT,
+            payload TEXT,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 5,
+            run_after REAL NOT NULL,
+            locked_at REAL,
+            last_error TEXT,
+            created_at TEXT,
+            updated_at TEXT
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs (status, run_after)")
+    # Progress of bulk re-extraction/rescoring runs, checkpointed per chunk
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rescore_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            status TEXT NOT NULL,
+            reextract INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0,
+            processed INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            last_app_id TEXT,
+            last_error TEXT,
+            started_at TEXT,
+            updated_at TEXT,
+            finished_at TEXT
+        )
+    ''')
+    # Heartbeat of the process working on a run, so only one process runs it at a time
+    try:
+        cursor.execute("ALTER TABLE rescore_runs ADD COLUMN locked_at REAL")
+    except Exception:
+        pass
+    # Excel export freshness: version is bumped by edits, built_version is the version last written
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS export_state (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 1,
+            built_version INTEGER NOT NULL DEFAULT 0,
+            built_at TEXT
+        )
+    ''')
+    cursor.execute("INSERT OR IGNORE INTO export_state (name) VALUES ('excel')")
+    # When the first edit not yet picked up by a rebuild happened (NULL when clean)
+    try:
+        cursor.execute("ALTER TABLE export_state ADD COLUMN dirty_since REAL")
+    except Exception:
+        pass
+    # Outbound email, delivered by the outbox workers; dedupe_key makes enqueueing idempotent
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            app_id TEXT,
+            template TEXT,
+            dedupe_key TEXT UNIQUE,
+            recipient TEXT NOT NULL,
+            subject TEXT,
+            message TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 6,
+            run_after REAL NOT NULL,
+            locked_at REAL,
+            provider TEXT,
+            attempted_at REAL,
+            sent_at REAL,
+            last_error TEXT,
+            created_at TEXT,
+            updated_at TEXT
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_email_outbox_status_run_after ON email_outbox (status, run_after)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_email_outbox_provider_attempted ON email_outbox (provider, attempted_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_email_outbox_app_id ON email_outbox (app_id)")
+    # Editable email templates (Jinja); version is bumped on every edit
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS email_templates (
+            name TEXT PRIMARY KEY,
+            subject TEXT NOT NULL,
+            text_body TEXT NOT NULL,
+            html_body TEXT,
+            version INTEGER NOT NULL DEFAULT 1,
+            updated_at TEXT
+        )
+    ''')
+    # Resumable (chunked) resume uploads in progress; bytes live in UPLOAD_TMP_FOLDER
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS upload_sessions (
+            id TEXT PRIMARY KEY,
+            app_id TEXT NOT NULL,
+            file_name TEXT NOT NULL,
+            total_bytes INTEGER NOT NULL,
+            received_bytes INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT DEFAULT (datetime('now')),
+            updated_at TEXT DEFAULT (datetime('now'))
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_upload_sessions_updated_at ON upload_sessions (updated_at)")
+    # Hot applicant fields extracted from applicant_data (kept as the raw record) for indexed lookups
+    for column in ("email TEXT COLLATE NOCASE", "first_name TEXT", "last_name TEXT",
+                   "source TEXT COLLATE NOCASE", "fields_synced_at TEXT"):
+        try:
+            cursor.execute(f"ALTER TABLE applications ADD COLUMN {column}")
+        except Exception:
+            pass
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_applications_email ON applications (email)")
+    # job_title predates the extracted columns and has no NOCASE declaration, so its index carries the collation
+    cursor.execute("DROP INDEX IF EXISTS idx_applications_job_title")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_applications_job_title_nocase ON applications (job_title COLLATE NOCASE)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_applications_source ON applications (source)")
+    # Rows written before updated_at existed count as changed now, so the next delta sync includes them
+    cursor.execute("UPDATE applications SET updated_at = datetime('now') WHERE updated_at IS NULL")
+    cursor.execute("UPDATE invites SET updated_at = datetime('now') WHERE updated_at IS NULL")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_applications_updated_at ON applications (updated_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_invites_updated_at ON invites (updated_at)")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS application_education (
+            app_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            degree TEXT COLLATE NOCASE,
+            branch TEXT COLLATE NOCASE,
+            institution TEXT COLLATE NOCASE,
+            grade TEXT,
+            start_date TEXT,
+            end_date TEXT,
+            PRIMARY KEY (app_id, position)
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_application_education_degree ON application_education (degree, app_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_application_education_branch ON application_education (branch, app_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_application_education_institution ON application_education (institution, app_id)")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS application_work (
+            app_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            company TEXT COLLATE NOCASE,
+            title TEXT COLLATE NOCASE,
+            start_date TEXT,
+            end_date TEXT,
+            PRIMARY KEY (app_id, position)
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_application_work_company ON application_work (company, app_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_application_work_title ON application_work (title, app_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_invites_rsvp_token ON invites (rsvp_token)")
     conn.commit()
     conn.close()
+    application_store.init_schema()
+    backfilled = application_store.backfill_fields()
+    if backfilled:
+        print(f"Extracted applicant fields for {backfilled} application(s).")
     print(f"Database initialized: {DATABASE}")
 
+class _PooledConnection:
+    """
+    sqlite3 connection borrowed from the pool. Behaves like the connection;
+    close() rolls back anything uncommitted and returns it to the pool.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc_info):
+        return self._conn.__exit__(*exc_info)
+
+    @property
+    def closed(self):
+        return self._conn is None
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            _release_db_connection(conn)
+
+    def __del__(self):
+        # Dropped without close(): a cursor may still use the connection, so
+        # leave it to be closed by garbage collection instead of pooling it
+        if self._conn is not None:
+            with _db_pool_lock:
+                _db_pool_stats['in_use'] -= 1
+                _db_pool_stats['leaked'] += 1
+
+_db_pool = queue.LifoQueue()
+_db_pool_pid = os.getpid()
+_db_pool_lock = threading.Lock()
+_db_pool_stats = {'created': 0, 'checkouts': 0, 'reused': 0, 'released': 0, 'discarded': 0, 'leaked': 0, 'in_use': 0}
+
+def _open_db_connection():
+    """Opens a new connection with the pool's pragmas applied."""
+    conn = sqlite3.connect(DATABASE, timeout=DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+    conn.execute(f"PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA mmap_size = {DB_MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size = -{DB_CACHE_SIZE_KB}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+def _reset_db_pool_after_fork():
+    """Drops connections inherited from a parent process (e.g. gunicorn preload)."""
+    global _db_pool, _db_pool_pid
+    if os.getpid() != _db_pool_pid:
+        with _db_pool_lock:
+            if os.getpid() != _db_pool_pid:
+                _db_pool = queue.LifoQueue()
+                _db_pool_pid = os.getpid()
+                for key in _db_pool_stats:
+                    _db_pool_stats[key] = 0
+
+def _release_db_connection(conn):
+    """Returns a connection to the pool, or closes it when the pool is full or it is unusable."""
+    with _db_pool_lock:
+        _db_pool_stats['in_use'] -= 1
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = sqlite3.Row
+        if os.getpid() == _db_pool_pid and _db_pool.qsize() < DB_POOL_SIZE:
+            _db_pool.put_nowait(conn)
+            with _db_pool_lock:
+                _db_pool_stats['released'] += 1
+            return
+    except sqlite3.Error:
+        pass
+    with _db_pool_lock:
+        _db_pool_stats['discarded'] += 1
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
 def get_db_connection():
-    """Returns a connection object to the database."""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row 
+    """Returns a pooled connection object to the database; close() returns it to the pool."""
+    _reset_db_pool_after_fork()
+    try:
+        conn = _db_pool.get_nowait()
+        reused = True
+    except queue.Empty:
+        conn = _open_db_connection()
+        reused = False
+    conn.row_factory = sqlite3.Row
+    with _db_pool_lock:
+        _db_pool_stats['checkouts'] += 1
+        _db_pool_stats['in_use'] += 1
+        _db_pool_stats['reused' if reused else 'created'] += 1
+    return _PooledConnection(conn)
+
+def get_request_db():
+    """
+    Returns the connection for the current request, borrowed from the pool on
+    first use and released automatically when the request ends.
+    """
+    conn = g.get('_db_conn')
+    if conn is None or conn.closed:
+        conn = g._db_conn = get_db_connection()
     return conn
 
-# Initialize the database on startup
-with app.app_context():
-    init_db()
+@app.teardown_appcontext
+def _release_request_db(exc):
+    conn = g.pop('_db_conn', None)
+    if conn is not None:
+        conn.close()
 
-# --- EMAIL AND DATA PROCESSING UTILITIES ---
+def db_pool_stats():
+    """Returns connection pool counters for this process."""
+    with _db_pool_lock:
+        return dict(_db_pool_stats, idle=_db_pool.qsize(), max_idle=DB_POOL_SIZE, pid=_db_pool_pid)
+
+# --- APPLICATION STORE ---
+# The applications and invites tables (with the extracted applicant fields and
+# their child tables) are accessed only through an ApplicationStore, so they can
+# live in PostgreSQL (DATABASE_URL=postgresql://...) instead of the local file.
+# PostgreSQL mode is still single-node: the resume index and blobs, the email
+# outbox and templates, upload sessions, export state, jobs and rescore runs are
+# primary data kept only in the local SQLite DATABASE and resumes/ folder, so
+# every process serving requests must run on the same host. Only ats_scores and
+# the resume text and highlight caches are derived and can be rebuilt.
+# applicant_data stays the full JSON record; the fields recruiters search and
+# filter on are also written to columns and child tables on every save.
+
+APPLICATION_SEARCH_FIELDS = ('email', 'job_title', 'source', 'degree', 'branch', 'institution', 'company', 'work_title')
+INVITE_UPDATE_COLUMNS = ('recruiter', 'interviewer', 'source', 'phone_status', 'inperson_status', 'application_status')
+
+def _field_text(value):
+    """Stripped string for a JSON field value, or None when empty."""
+    value = str(value).strip() if value is not None else ''
+    return value or None
+
+def _application_field_rows(app_id, applicant_data):
+    """Returns (column values, education rows, work rows) extracted from applicant_data."""
+    data = applicant_data if isinstance(applicant_data, dict) else {}
+    personal = data.get('personal') if isinstance(data.get('personal'), dict) else {}
+    communication = data.get('communication') if isinstance(data.get('communication'), dict) else {}
+    columns = (_field_text(communication.get('email')), _field_text(personal.get('firstName')),
+               _field_text(personal.get('lastName')), _field_text(data.get('source') or data.get('referralSource')))
+    education = data.get('education') if isinstance(data.get('education'), list) else []
+    education_rows = [
+        (app_id, i, _field_text(e.get('degree')), _field_text(e.get('branch')), _field_text(e.get('institution')),
+         _field_text(e.get('grade')), _field_text(e.get('startDate')), _field_text(e.get('endDate')))
+        for i, e in enumerate(education) if isinstance(e, dict)
+    ]
+    work = data.get('work') if isinstance(data.get('work'), list) else []
+    work_rows = [
+        (app_id, i, _field_text(w.get('company')), _field_text(w.get('title')),
+         _field_text(w.get('startDate')), _field_text(w.get('endDate')))
+        for i, w in enumerate(work) if isinstance(w, dict)
+    ]
+    return columns, education_rows, work_rows
 
-def allowed_file(filename):
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def _smtp_send_message(msg):
-    """Sends an email message using env SMTP settings with robust fallbacks.
-    Tries STARTTLS on 587 first, then SSL on 465. Returns True on success, else False.
+class ApplicationStore(abc.ABC):
+    """
+    Queries for the applications and invites tables. SQL is written once with
+    '?' placeholders and {now} for the current UTC timestamp; subclasses
+    provide connections and the dialect differences.
     """
-    sender_email = os.getenv("EMAIL_HOST_USER")
-    sender_password = os.getenv("EMAIL_HOST_PASSWORD")
-    smtp_host = os.getenv("EMAIL_HOST")
-    smtp_port = int(os.getenv("EMAIL_PORT", 587))
 
-    if not smtp_host or not sender_email or not sender_password:
-        print("SMTP missing configuration: EMAIL_HOST/EMAIL_HOST_USER/EMAIL_HOST_PASSWORD")
-        return False
+    NOW_SQL = None
+    # search field -> (table, column); every column compares case-insensitively
+    SEARCH_COLUMNS = {
+        'email': ('applications', 'email'),
+        'job_title': ('applications', 'job_title'),
+        'source': ('applications', 'source'),
+        'degree': ('application_education', 'degree'),
+        'branch': ('application_education', 'branch'),
+        'institution': ('application_education', 'institution'),
+        'company': ('application_work', 'company'),
+        'work_title': ('application_work', 'title'),
+    }
+    SCHEDULE_FILTERS = {
+        # query parameter -> (column, value shown in the schedule when the column is NULL)
+        'recruiter': ('i.recruiter', ''),
+        'interviewer': ('i.interviewer', ''),
+        'status': ('i.application_status', 'Open'),
+    }
 
-    # Attempt STARTTLS (default 587)
-    try:
-        import smtplib as _s
-        port = smtp_port or 587
-        with _s.SMTP(smtp_host, port, timeout=15) as server:
-            server.ehlo()
-            server.starttls()
-            server.ehlo()
-            server.login(sender_email, sender_password)
-            server.send_message(msg)
-        return True
-    except Exception as e1:
-        # Try SSL 465
+    @abc.abstractmethod
+    def _connection(self):
+        """Context manager yielding a connection; commits on success, rolls back on error."""
+
+    def _sql(self, query):
+        return query.replace('{now}', self.NOW_SQL)
+
+    @abc.abstractmethod
+    def _ci_equals(self, column):
+        """Case-insensitive equality condition for an indexed text column."""
+
+    def _execute(self, conn, query, params=()):
+        cursor = self._cursor(conn)
+        cursor.execute(self._sql(query), params)
+        return cursor
+
+    def _cursor(self, conn):
+        return conn.cursor()
+
+    def _fetchall(self, query, params=()):
+        with self._connection() as conn:
+            return [dict(r) for r in self._execute(conn, query, params).fetchall()]
+
+    def _fetchone(self, query, params=()):
+        with self._connection() as conn:
+            row = self._execute(conn, query, params).fetchone()
+            return dict(row) if row else None
+
+    @abc.abstractmethod
+    def _iter_rows(self, query, params=(), batch_size=500):
+        """Yields rows of a large result as dicts without loading it all at once."""
+
+    @abc.abstractmethod
+    def init_schema(self):
+        """Creates the tables and indexes if they do not exist."""
+
+    # Applications
+
+    def _write_application_fields(self, conn, app_id, applicant_data):
+        columns, education_rows, work_rows = _application_field_rows(app_id, applicant_data)
+        self._execute(conn, '''
+            UPDATE applications
+            SET email = ?, first_name = ?, last_name = ?, source = ?, fields_synced_at = {now}
+            WHERE app_id = ?
+        ''', columns + (app_id,))
+        self._execute(conn, "DELETE FROM application_education WHERE app_id = ?", (app_id,))
+        if education_rows:
+            self._cursor(conn).executemany(self._sql(
+                "INSERT INTO application_education (app_id, position, degree, branch, institution, grade, start_date, end_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+            ), education_rows)
+        self._execute(conn, "DELETE FROM application_work WHERE app_id = ?", (app_id,))
+        if work_rows:
+            self._cursor(conn).executemany(self._sql(
+                "INSERT INTO application_work (app_id, position, company, title, start_date, end_date) VALUES (?, ?, ?, ?, ?, ?)"
+            ), work_rows)
+
+    def create_application(self, app_id, job_title, applicant_data):
+        """Stores a new application: the raw JSON plus its extracted fields."""
+        with self._connection() as conn:
+            self._execute(conn, "INSERT INTO applications (app_id, job_title, applicant_data, updated_at) VALUES (?, ?, ?, {now})",
+                          (app_id, job_title, json.dumps(applicant_data)))
+            self._write_application_fields(conn, app_id, applicant_data)
+
+    def backfill_fields(self):
+        """Extracts fields for applications saved before the columns existed. Returns the number of rows synced."""
+        rows = self._fetchall("SELECT app_id, applicant_data FROM applications WHERE fields_synced_at IS NULL")
+        for row in rows:
+            try:
+                applicant_data = json.loads(row['applicant_data']) if row['applicant_data'] else {}
+            except json.JSONDecodeError:
+                print(f"Skipping field extraction for {row['app_id']}: applicant_data is not valid JSON")
+                applicant_data = {}
+            with self._connection() as conn:
+                self._write_application_fields(conn, row['app_id'], applicant_data)
+        return len(rows)
+
+    def get_application(self, app_id):
+        """Returns the application row as a dict, or None."""
+        return self._fetchone('''
+            SELECT app_id, job_title, applicant_data, email, first_name, last_name, source
+            FROM applications WHERE app_id = ?
+        ''', (app_id,))
+
+    def get_applications(self, app_ids):
+        """Returns application rows (app_id, job_title, applicant_data) for app_ids, in app_id order."""
+        app_ids = list(app_ids)
+        rows = []
+        for start in range(0, len(app_ids), 500):
+            chunk = app_ids[start:start + 500]
+            rows.extend(self._fetchall(
+                f"SELECT app_id, job_title, applicant_data FROM applications WHERE app_id IN ({', '.join('?' * len(chunk))})",
+                tuple(chunk)
+            ))
+        return sorted(rows, key=lambda r: r['app_id'])
+
+    def list_applications(self, after='', limit=200):
+        """Returns up to limit application rows with app_id > after, in app_id order."""
+        return self._fetchall('''
+            SELECT app_id, job_title, applicant_data FROM applications
+            WHERE app_id > ? ORDER BY app_id LIMIT ?
+        ''', (after or '', limit))
+
+    def iter_applications(self):
+        """Yields every application row (app_id, job_title, applicant_data) in app_id order."""
+        return self._iter_rows("SELECT app_id, job_title, applicant_data FROM applications ORDER BY app_id")
+
+    def iter_export_rows(self, updated_since=None):
+        """
+        Yields every application with its invite fields (NULL when not invited),
+        in app_id order. With updated_since ('YYYY-MM-DD HH:MM:SS' UTC), only
+        applications whose row or invite was written at or after it.
+        """
+        where_sql, params = "", ()
+        if updated_since:
+            where_sql = '''WHERE a.app_id IN (
+                SELECT app_id FROM applications WHERE updated_at >= ?
+                UNION SELECT app_id FROM invites WHERE updated_at >= ?)'''
+            params = (updated_since, updated_since)
+        return self._iter_rows(f'''
+            SELECT a.app_id, a.job_title, a.applicant_data,
+                   i.recruiter, i.interviewer, i.source AS invite_source, i.phone_status,
+                   i.inperson_status, i.application_status, i.invited_at, i.rsvp_status,
+                   a.updated_at, i.updated_at AS invite_updated_at
+            FROM applications a LEFT JOIN invites i ON i.app_id = a.app_id
+            {where_sql}
+            ORDER BY a.app_id
+        ''', params)
+
+    def count_applications(self):
+        return self._fetchone("SELECT COUNT(*) AS n FROM applications")['n']
+
+    def application_updates_since(self, updated_since):
+        """Returns (app_id, updated_at) rows for applications written at or after updated_since."""
+        return self._fetchall(
+            "SELECT app_id, updated_at FROM applications WHERE updated_at >= ? ORDER BY updated_at",
+            (updated_since,)
+        )
+
+    def search_applications(self, filters, after=None, limit=100):
+        """
+        Finds applications matching every field in filters (see SEARCH_COLUMNS).
+        Returns up to limit rows with app_id > after, in app_id order.
+        """
+        clauses, params = [], []
+        for name, value in filters.items():
+            table, column = self.SEARCH_COLUMNS[name]
+            if table == 'applications':
+                clauses.append(self._ci_equals(f"a.{column}"))
+            else:
+                clauses.append(f"a.app_id IN (SELECT app_id FROM {table} WHERE {self._ci_equals(column)})")
+            params.append(value)
+        if after:
+            clauses.append("a.app_id > ?")
+            params.append(after)
+        return self._fetchall(f'''
+            SELECT a.app_id, a.job_title, a.email, a.first_name, a.last_name, a.source
+            FROM applications a
+            WHERE {' AND '.join(clauses)}
+            ORDER BY a.app_id
+            LIMIT ?
+        ''', tuple(params) + (limit,))
+
+    # Invites
+
+    def get_invite(self, app_id):
+        return self._fetchone("SELECT * FROM invites WHERE app_id = ?", (app_id,))
+
+    def list_invites(self):
+        return self._fetchall('''
+            SELECT app_id, phone_status, inperson_status, recruiter, interviewer, source,
+                   application_status, invited_at, rsvp_status
+            FROM invites
+        ''')
+
+    def invite_statuses(self, app_ids):
+        """Returns {app_id: application_status} for the invites of app_ids whose status is set."""
+        app_ids = list(app_ids)
+        statuses = {}
+        for start in range(0, len(app_ids), 500):
+            chunk = app_ids[start:start + 500]
+            rows = self._fetchall(
+                f"SELECT app_id, application_status FROM invites WHERE app_id IN ({', '.join('?' * len(chunk))}) AND application_status IS NOT NULL",
+                tuple(chunk)
+            )
+            statuses.update((r['app_id'], r['application_status']) for r in rows)
+        return statuses
+
+    def invite_statuses_since(self, updated_since):
+        """Returns (app_id, application_status, updated_at) rows for invites written at or after updated_since."""
+        return self._fetchall(
+            "SELECT app_id, application_status, updated_at FROM invites WHERE updated_at >= ? ORDER BY updated_at",
+            (updated_since,)
+        )
+
+    def record_invite_sent(self, app_id, recruiter, job_title, source):
+        """Creates the invite row for a sent interview invite, or updates recruiter and job title."""
+        self.record_invites_sent([(app_id, recruiter, job_title, source)])
+
+    def record_invites_sent(self, invites):
+        """Upserts invite rows for sent invites given as (app_id, recruiter, job_title, source) tuples."""
+        if not invites:
+            return
+        with self._connection() as conn:
+            self._cursor(conn).executemany(self._sql('''
+                INSERT INTO invites (app_id, recruiter, interviewer, job_title, source, resume_status, phone_status, inperson_status, invited_at, updated_at)
+                VALUES (?, ?, '', ?, ?, 'Go', 'Pending', 'Pending', {now}, {now})
+                ON CONFLICT(app_id) DO UPDATE SET
+                    recruiter=excluded.recruiter,
+                    job_title=excluded.job_title,
+                    updated_at=excluded.updated_at
+            '''), list(invites))
+
+    def _ensure_invite(self, conn, app_id, job_title=None):
+        self._execute(conn, '''
+            INSERT INTO invites (app_id, recruiter, interviewer, job_title, source, resume_status, phone_status, inperson_status, invited_at, application_status, updated_at)
+            VALUES (?, '', '', COALESCE(?, (SELECT job_title FROM applications WHERE app_id = ?)), '', 'Pending', 'Pending', 'Pending', {now}, 'Open', {now})
+            ON CONFLICT(app_id) DO NOTHING
+        ''', (app_id, job_title, app_id))
+
+    def update_invite(self, app_id, fields):
+        """
+        Sets the given INVITE_UPDATE_COLUMNS on the invite for app_id, creating
+        a default row first if needed. Returns the number of rows updated.
+        """
+        columns = [c for c in fields if c in INVITE_UPDATE_COLUMNS]
+        if not columns:
+            return 0
+        with self._connection() as conn:
+            self._ensure_invite(conn, app_id)
+            cursor = self._execute(conn, f"UPDATE invites SET {', '.join(f'{c} = ?' for c in columns)}, updated_at = {{now}} WHERE app_id = ?",
+                                   tuple(fields[c] for c in columns) + (app_id,))
+            return cursor.rowcount
+
+    def ensure_rsvp_token(self, app_id, job_title):
+        """Returns the invite's RSVP token, creating the invite and token if needed."""
+        with self._connection() as conn:
+            self._ensure_invite(conn, app_id, job_title)
+            row = self._execute(conn, "SELECT rsvp_token FROM invites WHERE app_id = ?", (app_id,)).fetchone()
+            token = row['rsvp_token'] if row else None
+            if not token:
+                token = os.urandom(16).hex()
+                self._execute(conn, "UPDATE invites SET rsvp_token = ?, invited_at = {now}, updated_at = {now} WHERE app_id = ?", (token, app_id))
+            return token
+
+    def record_rsvp(self, token, status):
+        """Stores an RSVP response. Returns the invite's app_id, or None for an unknown token."""
+        with self._connection() as conn:
+            row = self._execute(conn, "SELECT app_id FROM invites WHERE rsvp_token = ?", (token,)).fetchone()
+            if not row:
+                return None
+            self._execute(conn, "UPDATE invites SET rsvp_status = ?, rsvp_response_at = {now}, updated_at = {now} WHERE app_id = ?", (status, row['app_id']))
+            return row['app_id']
+
+    def _schedule_conditions(self, filters):
+        """WHERE clauses and parameters for SCHEDULE_FILTERS; plain comparisons so the invite indexes apply."""
+        clauses, params = [], []
+        for name, value in filters.items():
+            column, default = self.SCHEDULE_FILTERS[name]
+            # NULL is shown as the default value, so only a filter on the default matches it
+            clauses.append(f"({column} = ? OR {column} IS NULL)" if value == default else f"{column} = ?")
+            params.append(value)
+        return clauses, params
+
+    def list_schedule(self, filters, after=None, limit=None):
+        """
+        Returns (rows, total) for the recruiter schedule: every application with
+        its invite fields and email, most recently invited first, then the
+        applications that were never invited. filters uses SCHEDULE_FILTERS
+        keys; after is the (invited_at, app_id) of the previous page's last row,
+        with invited_at '' for a row that was never invited. total is only
+        counted when limit is given.
+        """
+        clauses, params = self._schedule_conditions(filters)
+        select_sql = '''
+            SELECT a.app_id,
+                   COALESCE(i.recruiter, '') AS recruiter,
+                   COALESCE(i.interviewer, '') AS interviewer,
+                   COALESCE(i.job_title, a.job_title) AS job_title,
+                   COALESCE(i.source, '') AS source,
+                   COALESCE(i.phone_status, 'Pending') AS phone_status,
+                   COALESCE(i.inperson_status, 'Pending') AS inperson_status,
+                   COALESCE(i.invited_at, '') AS invited_at,
+                   COALESCE(i.application_status, 'Open') AS application_status,
+                   COALESCE(i.rsvp_status, 'Pending') AS rsvp_status,
+                   COALESCE(a.email, '') AS email
+        '''
+        rows, total = [], None
+        with self._connection() as conn:
+            if limit is not None:
+                where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+                total = self._execute(conn, f"SELECT COUNT(*) AS n FROM applications a LEFT JOIN invites i ON i.app_id = a.app_id {where_sql}",
+                                      tuple(params)).fetchone()['n']
+
+            # Invited applications, read backwards along the (invited_at, app_id) indexes
+            if after is None or after[0] != '':
+                page_clauses, page_params = clauses + ["i.invited_at IS NOT NULL"], list(params)
+                if after is not None:
+                    page_clauses.append("(i.invited_at < ? OR (i.invited_at = ? AND i.app_id < ?))")
+                    page_params.extend([after[0], after[0], after[1]])
+                query = f'''{select_sql}
+                    FROM invites i JOIN applications a ON a.app_id = i.app_id
+                    WHERE {' AND '.join(page_clauses)}
+                    ORDER BY i.invited_at DESC, i.app_id DESC
+                '''
+                if limit is not None:
+                    query += " LIMIT ?"
+                    page_params.append(limit)
+                rows = [dict(r) for r in self._execute(conn, query, tuple(page_params)).fetchall()]
+
+            # Then the applications never invited, by app_id. Only rows with an invite
+            # can match a non-default filter, so those are read from its index instead
+            if limit is None or len(rows) < limit:
+                if any(value != self.SCHEDULE_FILTERS[name][1] for name, value in filters.items()):
+                    from_sql, order_column = "FROM invites i JOIN applications a ON a.app_id = i.app_id", "i.app_id"
+                else:
+                    from_sql, order_column = "FROM applications a LEFT JOIN invites i ON i.app_id = a.app_id", "a.app_id"
+                page_clauses, page_params = clauses + ["i.invited_at IS NULL"], list(params)
+                if after is not None and after[0] == '':
+                    page_clauses.append(f"{order_column} < ?")
+                    page_params.append(after[1])
+                query = f'''{select_sql}
+                    {from_sql}
+                    WHERE {' AND '.join(page_clauses)}
+                    ORDER BY {order_column} DESC
+                '''
+                if limit is not None:
+                    query += " LIMIT ?"
+                    page_params.append(limit - len(rows))
+                rows.extend(dict(r) for r in self._execute(conn, query, tuple(page_params)).fetchall())
+        return rows, total
+
+
+class SQLiteApplicationStore(ApplicationStore):
+    """Store in the local SQLite DATABASE; its tables are created by init_db."""
+
+    NOW_SQL = "datetime('now')"
+
+    @contextlib.contextmanager
+    def _connection(self):
+        conn = get_db_connection()
         try:
-            with smtplib.SMTP_SSL(smtp_host, 465, timeout=15) as server:
-                server.ehlo()
-                server.login(sender_email, sender_password)
-                server.send_message(msg)
-            return True
-        except Exception as e2:
-            print(f"SMTP errors -> starttls:{e1} | ssl:{e2}")
-            return False
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
 
+    def _ci_equals(self, column):
+        # Matches the NOCASE indexes: declared on the extracted columns, explicit on job_title
+        return f"{column} = ? COLLATE NOCASE"
 
-def send_confirmation_email(recipient_email, applicant_name, job_title, app_id):
-    """Sends a confirmation email to the applicant."""
-    sender_email = os.getenv("EMAIL_HOST_USER")
-    sender_password = os.getenv("EMAIL_HOST_PASSWORD")
-    smtp_host = os.getenv("EMAIL_HOST")
-    smtp_port = int(os.getenv("EMAIL_PORT", 587))
+    def _iter_rows(self, query, params=(), batch_size=500):
+        with self._connection() as conn:
+            cursor = self._execute(conn, query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
 
-    # Fast-fail if SMTP creds are not configured in the environment
-    if not smtp_host or not sender_email or not sender_password:
-        print("Email disabled or SMTP credentials missing; skipping confirmation email.")
-        return False
+    def init_schema(self):
+        # The tables live in the local database and are created by init_db
+        pass
 
-    subject = f"Medquest Application Confirmed: {job_title} - {applicant_name}"
-    body = f"""
-    Dear {applicant_name},
 
-    Thank you for applying for the {job_title} position at Medquest.
+class PostgresApplicationStore(ApplicationStore):
+    """Store in PostgreSQL; the rest of the data stays on this host (see APPLICATION STORE)."""
+
+    NOW_SQL = "to_char(timezone('UTC', now()), 'YYYY-MM-DD HH24:MI:SS')"
+
+    def __init__(self, dsn, max_connections=10):
+        if not POSTGRES_AVAILABLE:
+            raise RuntimeError("DATABASE_URL points at PostgreSQL but psycopg2 is not installed (pip install psycopg2-binary).")
+        self.dsn = dsn
+        self.max_connections = max_connections
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self):
+        # One pool per process: connections must not be shared across a fork
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = psycopg2.pool.ThreadedConnectionPool(1, self.max_connections, self.dsn)
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    @contextlib.contextmanager
+    def _connection(self):
+        pool = self._get_pool()
+        conn = pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            pool.putconn(conn)
+
+    def _sql(self, query):
+        return super()._sql(query).replace('?', '%s')
+
+    def _cursor(self, conn):
+        return conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+    def _ci_equals(self, column):
+        # Matches the lower(column) expression indexes created in init_schema
+        return f"lower({column}) = lower(?)"
+
+    def _iter_rows(self, query, params=(), batch_size=500):
+        # Named (server-side) cursor: rows are fetched from the server batch_size at a time
+        with self._connection() as conn:
+            cursor = conn.cursor(name=f"iter_{os.urandom(6).hex()}", cursor_factory=psycopg2.extras.RealDictCursor)
+            cursor.itersize = batch_size
+            cursor.execute(self._sql(query), params)
+            try:
+                for row in cursor:
+                    yield dict(row)
+            finally:
+                cursor.close()
+
+    def init_schema(self):
+        statements = [
+            '''CREATE TABLE IF NOT EXISTS applications (
+                app_id TEXT PRIMARY KEY,
+                job_title TEXT NOT NULL,
+                applicant_data TEXT NOT NULL,
+                email TEXT,
+                first_name TEXT,
+                last_name TEXT,
+                source TEXT,
+                fields_synced_at TEXT,
+                updated_at TEXT
+            )''',
+            '''CREATE TABLE IF NOT EXISTS invites (
+                app_id TEXT PRIMARY KEY,
+                recruiter TEXT,
+                interviewer TEXT,
+                job_title TEXT,
+                source TEXT,
+                resume_status TEXT,
+                phone_status TEXT,
+                inperson_status TEXT,
+                invited_at TEXT,
+                application_status TEXT,
+                rsvp_token TEXT,
+                rsvp_status TEXT,
+                rsvp_response_at TEXT,
+                updated_at TEXT
+            )''',
+            "ALTER TABLE applications ADD COLUMN IF NOT EXISTS updated_at TEXT",
+            "ALTER TABLE invites ADD COLUMN IF NOT EXISTS updated_at TEXT",
+            self._sql("UPDATE applications SET updated_at = {now} WHERE updated_at IS NULL"),
+            self._sql("UPDATE invites SET updated_at = {now} WHERE updated_at IS NULL"),
+            '''CREATE TABLE IF NOT EXISTS application_education (
+                app_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                degree TEXT,
+                branch TEXT,
+                institution TEXT,
+                grade TEXT,
+                start_date TEXT,
+                end_date TEXT,
+                PRIMARY KEY (app_id, position)
+            )''',
+            '''CREATE TABLE IF NOT EXISTS application_work (
+                app_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                company TEXT,
+                title TEXT,
+                start_date TEXT,
+                end_date TEXT,
+                PRIMARY KEY (app_id, position)
+            )''',
+            "CREATE INDEX IF NOT EXISTS idx_applications_email ON applications (lower(email))",
+            "DROP INDEX IF EXISTS idx_applications_job_title",
+            "CREATE INDEX IF NOT EXISTS idx_applications_job_title_lower ON applications (lower(job_title))",
+            "CREATE INDEX IF NOT EXISTS idx_applications_source ON applications (lower(source))",
+            "CREATE INDEX IF NOT EXISTS idx_application_education_degree ON application_education (lower(degree), app_id)",
+            "CREATE INDEX IF NOT EXISTS idx_application_education_branch ON application_education (lower(branch), app_id)",
+            "CREATE INDEX IF NOT EXISTS idx_application_education_institution ON application_education (lower(institution), app_id)",
+            "CREATE INDEX IF NOT EXISTS idx_application_work_company ON application_work (lower(company), app_id)",
+            "CREATE INDEX IF NOT EXISTS idx_application_work_title ON application_work (lower(title), app_id)",
+            "CREATE INDEX IF NOT EXISTS idx_invites_invited_at ON invites (invited_at, app_id)",
+            "DROP INDEX IF EXISTS idx_invites_recruiter",
+            "DROP INDEX IF EXISTS idx_invites_interviewer",
+            "DROP INDEX IF EXISTS idx_invites_application_status",
+            "CREATE INDEX IF NOT EXISTS idx_invites_recruiter_keyset ON invites (recruiter, invited_at, app_id)",
+            "CREATE INDEX IF NOT EXISTS idx_invites_interviewer_keyset ON invites (interviewer, invited_at, app_id)",
+            "CREATE INDEX IF NOT EXISTS idx_invites_application_status_keyset ON invites (application_status, invited_at, app_id)",
+            "CREATE INDEX IF NOT EXISTS idx_invites_rsvp_token ON invites (rsvp_token)",
+            "CREATE INDEX IF NOT EXISTS idx_applications_updated_at ON applications (updated_at)",
+            "CREATE INDEX IF NOT EXISTS idx_invites_updated_at ON invites (updated_at)",
+        ]
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            for statement in statements:
+                cursor.execute(statement)
 
-    Your application has been successfully received and assigned the ID: {app_id}.
 
-    We will review your details and resume, and you should hear from our HR team within the next 2-4 weeks.
+def create_application_store(database_url):
+    """Returns the store for DATABASE_URL: PostgreSQL for postgres:// URLs, else the local SQLite DATABASE."""
+    if database_url.startswith(('postgres://', 'postgresql://')):
+        return PostgresApplicationStore(database_url, PG_POOL_MAX)
+    return SQLiteApplicationStore()
 
-    Sincerely,
-    The Medquest Careers Team
-    """
+application_store = create_application_store(DATABASE_URL)
 
-    msg = MIMEText(body)
-    msg['Subject'] = subject
-    msg['From'] = sender_email
-    msg['To'] = recipient_email
+# Processes started through multiprocessing (the spawn-based bulk rescore pool)
+# import this module only to run pure functions such as _rescore_task, so they
+# skip database and email template setup
+_IN_POOL_CHILD = multiprocessing.current_process().name != 'MainProcess'
 
-    # Use robust sender
-    ok = _smtp_send_message(msg)
-    if ok:
-        print(f"Confirmation email sent to {recipient_email}")
-        return True
-    else:
-        print("Error sending confirmation email (see logs above for SMTP details)")
-        return False
-        
-def send_interview_invite(recipient_email, applicant_name, job_title):
-    """Sends an interview invitation email to the applicant."""
-    sender_email = os.getenv("EMAIL_HOST_USER")
-    sender_password = os.getenv("EMAIL_HOST_PASSWORD")
-    smtp_host = os.getenv("EMAIL_HOST")
-    smtp_port = int(os.getenv("EMAIL_PORT", 587))
+# Initialize the database on startup
+if not _IN_POOL_CHILD:
+    with app.app_context():
+        init_db()
 
-    if not smtp_host or not sender_email or not sender_password:
-        print("Email disabled or SMTP credentials missing; skipping invite email.")
-        return False
+# --- EMAIL AND DATA PROCESSING UTILITIES ---
 
-    subject = f"Your Resume is Shortlisted: Interview Invitation for {job_title}"
-    body = f"""
-    Dear {applicant_name},
+def allowed_file(filename):
+    return '.' in filename and \
+           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-    We are pleased to inform you that your resume for the {job_title} position has been shortlisted for the next stage.
+def _smtp_configured():
+    return bool(os.getenv("EMAIL_HOST") and os.getenv("EMAIL_HOST_USER") and os.getenv("EMAIL_HOST_PASSWORD"))
+
+# --- SMTP SESSION POOL ---
+# Logged-in SMTP sessions are kept per process and reused by every sender, so
+# a message normally costs one round trip instead of connect + TLS + login.
+# The transport that last connected (STARTTLS or SSL) is tried first, so a
+# blocked port only costs its timeout once. Counters are served at /api/smtp_pool.
+
+_smtp_pool = queue.LifoQueue()
+_smtp_pool_pid = os.getpid()
+_smtp_pool_lock = threading.Lock()
+_smtp_transport = None  # 'starttls' or 'ssl'
+_smtp_pool_stats = {'connects': 0, 'connect_failures': 0, 'reused': 0, 'expired': 0, 'reconnects': 0,
+                    'discarded': 0, 'sent': 0, 'failed': 0, 'send_ms_total': 0.0, 'send_ms_max': 0.0,
+                    'last_error': None}
+
+def _smtp_connect(transport):
+    """Opens and logs in one SMTP session over 'starttls' (EMAIL_PORT, default 587) or 'ssl' (465)."""
+    smtp_host = os.getenv("EMAIL_HOST")
+    server = None
+    try:
+        if transport == 'ssl':
+            server = smtplib.SMTP_SSL(smtp_host, 465, timeout=SMTP_TIMEOUT_SECONDS)
+            server.ehlo()
+        else:
+            server = smtplib.SMTP(smtp_host, int(os.getenv("EMAIL_PORT", 587)) or 587, timeout=SMTP_TIMEOUT_SECONDS)
+            server.ehlo()
+            server.starttls()
+            server.ehlo()
+        server.login(os.getenv("EMAIL_HOST_USER"), os.getenv("EMAIL_HOST_PASSWORD"))
+        return server
+    except Exception:
+        _close_smtp_session(server)
+        raise
 
-    You will be having an interview call with our HR team within the next week. Please keep your phone lines open.
+def _open_smtp_session():
+    """Connects and logs in to the env SMTP server, trying the transport that
+    worked last first (STARTTLS before SSL initially). Returns the server; raises on failure.
+    """
+    global _smtp_transport
+    if not _smtp_configured():
+        raise RuntimeError("SMTP missing configuration: EMAIL_HOST/EMAIL_HOST_USER/EMAIL_HOST_PASSWORD")
+    order = ('ssl', 'starttls') if _smtp_transport == 'ssl' else ('starttls', 'ssl')
+    errors = []
+    for transport in order:
+        try:
+            server = _smtp_connect(transport)
+        except Exception as e:
+            errors.append(f"{transport}:{e}")
+            continue
+        with _smtp_pool_lock:
+            _smtp_transport = transport
+            _smtp_pool_stats['connects'] += 1
+        return server
+    with _smtp_pool_lock:
+        _smtp_pool_stats['connect_failures'] += 1
+    raise RuntimeError(f"SMTP errors -> {' | '.join(errors)}")
+
+def _close_smtp_session(server):
+    if server is None:
+        return
+    try:
+        server.quit()
+    except Exception:
+        try:
+            server.close()
+        except Exception:
+            pass
+
+def _reset_smtp_pool_after_fork():
+    """Drops sessions inherited from a parent process; their sockets belong to it."""
+    global _smtp_pool, _smtp_pool_pid
+    if os.getpid() != _smtp_pool_pid:
+        with _smtp_pool_lock:
+            if os.getpid() != _smtp_pool_pid:
+                _smtp_pool = queue.LifoQueue()
+                _smtp_pool_pid = os.getpid()
+
+def _checkout_smtp_session():
+    """Returns (server, reused): an idle pooled session, or a newly opened one."""
+    _reset_smtp_pool_after_fork()
+    while True:
+        try:
+            server, idle_since = _smtp_pool.get_nowait()
+        except queue.Empty:
+            return _open_smtp_session(), False
+        if time.time() - idle_since <= SMTP_IDLE_SECONDS:
+            with _smtp_pool_lock:
+                _smtp_pool_stats['reused'] += 1
+            return server, True
+        # Servers drop idle connections; do not spend a send finding out
+        with _smtp_pool_lock:
+            _smtp_pool_stats['expired'] += 1
+        _close_smtp_session(server)
+
+def _return_smtp_session(server):
+    if os.getpid() == _smtp_pool_pid and _smtp_pool.qsize() < SMTP_POOL_SIZE:
+        _smtp_pool.put_nowait((server, time.time()))
+        return
+    with _smtp_pool_lock:
+        _smtp_pool_stats['discarded'] += 1
+    _close_smtp_session(server)
+
+def send_pooled_message(msg):
+    """
+    Sends msg over a pooled SMTP session. A reused session that turns out to be
+    dead is replaced and the message retried once. Raises on failure.
+    """
+    started = time.perf_counter()
+    try:
+        for attempt in (1, 2):
+            server, reused = _checkout_smtp_session()
+            try:
+                server.send_message(msg)
+            except smtplib.SMTPResponseException:
+                # The server answered (e.g. refused the sender or data); the session is still usable
+                _return_smtp_session(server)
+                raise
+            except smtplib.SMTPRecipientsRefused:
+                _return_smtp_session(server)
+                raise
+            except Exception:
+                _close_smtp_session(server)
+                with _smtp_pool_lock:
+                    _smtp_pool_stats['discarded'] += 1
+                if attempt == 2 or not reused:
+                    raise
+                with _smtp_pool_lock:
+                    _smtp_pool_stats['reconnects'] += 1
+                continue
+            _return_smtp_session(server)
+            break
+    except Exception as e:
+        with _smtp_pool_lock:
+            _smtp_pool_stats['failed'] += 1
+            _smtp_pool_stats['last_error'] = f"{type(e).__name__}: {e}"
+        raise
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with _smtp_pool_lock:
+        _smtp_pool_stats['sent'] += 1
+        _smtp_pool_stats['send_ms_total'] += elapsed_ms
+        _smtp_pool_stats['send_ms_max'] = max(_smtp_pool_stats['send_ms_max'], elapsed_ms)
+
+def smtp_pool_stats():
+    """Returns SMTP session pool counters and send latency for this process."""
+    with _smtp_pool_lock:
+        stats = dict(_smtp_pool_stats)
+        sent = stats['sent']
+        stats.update(idle=_smtp_pool.qsize(), max_idle=SMTP_POOL_SIZE, transport=_smtp_transport, pid=_smtp_pool_pid,
+                     send_ms_avg=round(stats['send_ms_total'] / sent, 1) if sent else None)
+        stats['send_ms_total'] = round(stats['send_ms_total'], 1)
+        stats['send_ms_max'] = round(stats['send_ms_max'], 1)
+    return stats
+
+# --- EMAIL TEMPLATES ---
+# Subjects and bodies are Jinja templates stored in email_templates and
+# editable at /api/email_templates. Each template is compiled once per edit
+# (its version) and cached per process; render_email_batch renders any number
+# of recipients from one compiled template. The HTML part is optional.
+
+DEFAULT_EMAIL_TEMPLATES = {
+    'confirmation': {
+        'subject': "Medquest Application Confirmed: {{ job_title }} - {{ applicant_name }}",
+        'text_body': """
+    Dear {{ applicant_name }},
+
+    Thank you for applying for the {{ job_title }} position at Medquest.
+
+    Your application has been successfully received and assigned the ID: {{ app_id }}.
 
-    We look forward to speaking with you.
+    We will review your details and resume, and you should hear from our HR team within the next 2-4 weeks.
 
     Sincerely,
     The Medquest Careers Team
-    """
+    """,
+        'html_body': None,
+    },
+    'interview_invite': {
+        'subject': "Your Resume is Shortlisted: Interview Invitation for {{ job_title }}",
+        'text_body': """
+    Dear {{ applicant_name }},
 
-    msg = MIMEText(body)
-    msg['Subject'] = subject
-    msg['From'] = sender_email
-    msg['To'] = recipient_email
+    We are pleased to inform you that your resume for the {{ job_title }} position has been shortlisted for the next stage.
 
-    ok = _smtp_send_message(msg)
-    if ok:
-        print(f"Interview invite sent to {recipient_email} for {job_title}")
-        return True
-    else:
-        print(f"Error sending invite email to {recipient_email} (see logs above)")
-        return False
+    You will be having an interview call with our HR team within the next week. Please keep your phone lines open.
 
-def send_status_email(recipient_email, applicant_name, job_title, app_id, process_status, interview_date, interview_time, additional_notes=None, rsvp_token=None):
-    """Sends a status email to the applicant with interview details and confirmation request."""
-    sender_email = os.getenv("EMAIL_HOST_USER")
-    sender_password = os.getenv("EMAIL_HOST_PASSWORD")
-    smtp_host = os.getenv("EMAIL_HOST")
-    smtp_port = int(os.getenv("EMAIL_PORT", 587))
+    We look forward to speaking with you.
 
-    if not smtp_host or not sender_email or not sender_password:
-        print("Email disabled or SMTP credentials missing; skipping status email.")
-        return False
-    
-    # Format date and time
-    from datetime import datetime
-    try:
-        date_obj = datetime.strptime(interview_date, "%Y-%m-%d")
-        formatted_date = date_obj.strftime("%B %d, %Y")
-        time_obj = datetime.strptime(interview_time, "%H:%M")
-        formatted_time = time_obj.strftime("%I:%M %p")
-    except:
-        formatted_date = interview_date
-        formatted_time = interview_time
-
-    subject = f"Application Update - {job_title} - {app_id}"
-    
-    body = f"""
-Dear {applicant_name},
+    Sincerely,
+    The Medquest Careers Team
+    """,
+        'html_body': None,
+    },
+    'status': {
+        'subject': "Application Update - {{ job_title }} - {{ app_id }}",
+        'text_body': """
+Dear {{ applicant_name }},
 
-Thank you for your interest in the {job_title} position at Medquest.
+Thank you for your interest in the {{ job_title }} position at Medquest.
 
-{process_status}
+{{ process_status }}
 
 Interview Details:
-- Date: {formatted_date}
-- Time: {formatted_time}
+- Date: {{ interview_date|long_date }}
+- Time: {{ interview_time|clock_time }}
 
 Please confirm your availability for the scheduled interview by choosing one of the options below:
 
-Accept: {PUBLIC_BASE_URL}/rsvp/{rsvp_token or 'TOKEN'}?response=accept
-Decline: {PUBLIC_BASE_URL}/rsvp/{rsvp_token or 'TOKEN'}?response=decline
+Accept: {{ public_base_url }}/rsvp/{{ rsvp_token or 'TOKEN' }}?response=accept
+Decline: {{ public_base_url }}/rsvp/{{ rsvp_token or 'TOKEN' }}?response=decline
 Suggest another time: You can reply to this email with preferred slots.
 
-{additional_notes if additional_notes else ''}
+{{ additional_notes or '' }}
 
 We look forward to hearing from you and potentially welcoming you to our team.
 
 Best regards,
 The Medquest Careers Team
+    """,
+        'html_body': None,
+    },
+}
+# Variables available to every template (values used by the preview endpoint)
+EMAIL_TEMPLATE_SAMPLE_CONTEXT = {
+    'applicant_name': 'Asha',
+    'job_title': 'Data Scientist',
+    'app_id': 'MQ-1a2b3c4d',
+    'process_status': 'You have been shortlisted for the technical interview.',
+    'interview_date': '2025-01-15',
+    'interview_time': '14:30',
+    'additional_notes': '',
+    'rsvp_token': 'TOKEN',
+    'public_base_url': PUBLIC_BASE_URL,
+}
+
+CompiledEmailTemplate = namedtuple('CompiledEmailTemplate', ['name', 'version', 'subject', 'text', 'html'])
+RenderedEmail = namedtuple('RenderedEmail', ['subject', 'text', 'html'])
+
+def _long_date(value):
+    """'2025-01-15' -> 'January 15, 2025'; other values are returned unchanged."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%B %d, %Y")
+    except (TypeError, ValueError):
+        return value
+
+def _clock_time(value):
+    """'14:30' -> '02:30 PM'; other values are returned unchanged."""
+    try:
+        return datetime.strptime(value, "%H:%M").strftime("%I:%M %p")
+    except (TypeError, ValueError):
+        return value
+
+# Template source is edited over the API, so both environments are sandboxed:
+# no access to dunder/internal attributes and no mutation of passed-in objects
+_email_text_env = jinja2.sandbox.ImmutableSandboxedEnvironment(keep_trailing_newline=True, autoescape=False)
+_email_html_env = jinja2.sandbox.ImmutableSandboxedEnvironment(keep_trailing_newline=True, autoescape=True)
+for _env in (_email_text_env, _email_html_env):
+    _env.filters['long_date'] = _long_date
+    _env.filters['clock_time'] = _clock_time
+
+_compiled_email_templates = {}
+_email_templates_lock = threading.Lock()
+
+def compile_email_template(name, subject, text_body, html_body=None, version=0):
+    """Compiles a template's parts; raises jinja2.TemplateSyntaxError on invalid syntax."""
+    return CompiledEmailTemplate(
+        name, version,
+        _email_text_env.from_string(subject),
+        _email_text_env.from_string(text_body),
+        _email_html_env.from_string(html_body) if html_body else None,
+    )
+
+def load_email_templates():
+    """Stores any missing default templates and compiles every template. Run once at startup."""
+    conn = get_db_connection()
+    try:
+        for name, template in DEFAULT_EMAIL_TEMPLATES.items():
+            conn.execute(
+                "INSERT OR IGNORE INTO email_templates (name, subject, text_body, html_body, version, updated_at) VALUES (?, ?, ?, ?, 1, datetime('now'))",
+                (name, template['subject'], template['text_body'], template['html_body'])
+            )
+        conn.commit()
+        rows = conn.execute("SELECT * FROM email_templates").fetchall()
+    finally:
+        conn.close()
+    for row in rows:
+        try:
+            _cache_email_template(row)
+        except jinja2.TemplateSyntaxError as e:
+            print(f"Warning: email template '{row['name']}' does not compile: {e}")
+
+def _cache_email_template(row):
+    compiled = compile_email_template(row['name'], row['subject'], row['text_body'], row['html_body'], row['version'])
+    with _email_templates_lock:
+        _compiled_email_templates[row['name']] = compiled
+    return compiled
+
+def get_email_template(name):
+    """
+    Returns the compiled template, recompiling only when its stored version
+    changed (e.g. edited by another process). Raises KeyError for unknown names.
     """
+    conn = get_db_connection()
+    try:
+        version = conn.execute("SELECT version FROM email_templates WHERE name = ?", (name,)).fetchone()
+        if version is None:
+            raise KeyError(name)
+        compiled = _compiled_email_templates.get(name)
+        if compiled is not None and compiled.version == version['version']:
+            return compiled
+        row = conn.execute("SELECT * FROM email_templates WHERE name = ?", (name,)).fetchone()
+    finally:
+        conn.close()
+    return _cache_email_template(row)
 
-    msg = MIMEText(body)
-    msg['Subject'] = subject
+def render_email_batch(template, contexts):
+    """
+    Renders a template (name or CompiledEmailTemplate) for each per-recipient
+    context dict. Returns a list of RenderedEmail; html is None without an HTML part.
+    """
+    if isinstance(template, str):
+        template = get_email_template(template)
+    rendered = []
+    for context in contexts:
+        context = {'public_base_url': PUBLIC_BASE_URL, **context}
+        rendered.append(RenderedEmail(
+            ' '.join(template.subject.render(context).split()),
+            template.text.render(context),
+            template.html.render(context) if template.html is not None else None,
+        ))
+    return rendered
+
+def email_message(rendered, recipient_email, reply_to=None):
+    """Builds the MIME message for a RenderedEmail: plain text, or text plus HTML alternatives."""
+    sender_email = os.getenv("EMAIL_HOST_USER")
+    if rendered.html is None:
+        msg = MIMEText(rendered.text)
+    else:
+        msg = MIMEMultipart('alternative')
+        msg.attach(MIMEText(rendered.text, 'plain'))
+        msg.attach(MIMEText(rendered.html, 'html'))
+    msg['Subject'] = rendered.subject
     msg['From'] = sender_email
     msg['To'] = recipient_email
-    msg['Reply-To'] = sender_email  # Enable reply functionality
+    if reply_to:
+        msg['Reply-To'] = reply_to
+    return msg
+
+def build_confirmation_email(recipient_email, applicant_name, job_title, app_id):
+    """Returns the application confirmation message for an applicant."""
+    context = {'applicant_name': applicant_name, 'job_title': job_title, 'app_id': app_id}
+    return email_message(render_email_batch('confirmation', [context])[0], recipient_email)
+
+def build_interview_invite(recipient_email, applicant_name, job_title, app_id=None):
+    """Returns the interview invitation message for an applicant."""
+    context = {'applicant_name': applicant_name, 'job_title': job_title, 'app_id': app_id}
+    return email_message(render_email_batch('interview_invite', [context])[0], recipient_email)
+
+def status_email_context(applicant_name, job_title, app_id, process_status, interview_date, interview_time, additional_notes=None, rsvp_token=None):
+    """Template variables for the status email (interview details and RSVP links)."""
+    return {
+        'applicant_name': applicant_name, 'job_title': job_title, 'app_id': app_id,
+        'process_status': process_status, 'interview_date': interview_date, 'interview_time': interview_time,
+        'additional_notes': additional_notes, 'rsvp_token': rsvp_token,
+    }
 
-    ok = _smtp_send_message(msg)
-    if ok:
-        print(f"Status email sent to {recipient_email} for {job_title} - {app_id}")
-        return True
-    else:
-        print(f"Error sending status email to {recipient_email} (see logs above)")
-        return False
+if not _IN_POOL_CHILD:
+    load_email_templates()
 
-def flatten_application_data(data, app_id):
-    """
-    Flattens the nested application data dictionary into a single-level dictionary
-    for use in a DataFrame row.
-    """
-    flat_data = {'App_ID': app_id, 'Job_Title': data.get('jobTitle', 'N/A')}
+# --- EMAIL OUTBOX ---
+# Request handlers only enqueue messages here (same SQLite DB, committed with
+# the caller's transaction). Outbox workers deliver them over the SMTP session
+# pool, retry transient failures with exponential backoff and keep each
+# provider under its rate limits, counted in the table so every process and
+# worker shares them.
 
-    # 1. Flatten main sections
-    for section_name in ['personal', 'communication', 'financial', 'onboarding']:
-        for key, value in data.get(section_name, {}).items():
-            flat_data[f"{section_name.capitalize()}_{key.capitalize()}"] = value
+_email_wakeup = threading.Event()
+_email_workers_started = False
+_email_workers_lock = threading.Lock()
 
-    # 2. Handle Education (Complex nested array)
-    education_list = data.get('education', [])
-    if isinstance(education_list, list) and education_list:
-        edu_summary = []
-        for i, entry in enumerate(education_list, 1):
-            summary = (
-                f"[{i}] Degree: {entry.get('degree', 'N/A')}, "
-                f"Branch: {entry.get('branch', 'N/A')}, " 
-                f"Institution: {entry.get('institution', 'N/A')}, "
+def enqueue_email(conn, msg, app_id=None, template=None, dedupe_key=None):
+    """
+    Adds msg to the outbox (caller commits). A message whose dedupe_key was
+    already queued or sent is not added again; one that failed for good is
+    queued again. Returns (outbox id, True if queued by this call).
+    """
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO email_outbox (app_id, template, dedupe_key, recipient, subject, message, status,
+                                  attempts, max_attempts, run_after, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, 'queued', 0, ?, ?, datetime('now'), datetime('now'))
+        ON CONFLICT(dedupe_key) DO UPDATE SET
+            recipient = excluded.recipient, subject = excluded.subject, message = excluded.message,
+            status = 'queued', attempts = 0, run_after = excluded.run_after, last_error = NULL,
+            updated_at = excluded.updated_at
+        WHERE email_outbox.status = 'failed'
+    ''', (app_id, template, dedupe_key, msg['To'], msg['Subject'], msg.as_string(), EMAIL_MAX_ATTEMPTS, time.time()))
+    queued = cursor.rowcount > 0
+    if dedupe_key is None:
+        email_id = cursor.lastrowid
+    else:
+        email_id = cursor.execute("SELECT id FROM email_outbox WHERE dedupe_key = ?", (dedupe_key,)).fetchone()['id']
+    if queued:
+        _email_wakeup.set()
+    return email_id, queued
+
+def _email_rate_limits(provider):
+    """(per minute, per day) caps for provider; EMAIL_RATE_PER_MINUTE/EMAIL_RATE_PER_DAY override them (0 = no cap)."""
+    per_minute, per_day = EMAIL_PROVIDER_RATE_LIMITS.get(provider, EMAIL_DEFAULT_RATE_LIMITS)
+    if os.getenv('EMAIL_RATE_PER_MINUTE'):
+        per_minute = int(os.getenv('EMAIL_RATE_PER_MINUTE')) or None
+    if os.getenv('EMAIL_RATE_PER_DAY'):
+        per_day = int(os.getenv('EMAIL_RATE_PER_DAY')) or None
+    return per_minute, per_day
+
+def _claim_next_email():
+    """
+    Atomically marks the next due email as sending and returns (email, 0).
+    Returns (None, seconds to wait) when nothing is due or the provider's rate
+    limit is used up.
+    """
+    provider = (os.getenv('EMAIL_HOST') or '').strip().lower()
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        now = time.time()
+        cursor = conn.cursor()
+        for window, limit in zip((60, 86400), _email_rate_limits(provider)):
+            if not limit:
+                continue
+            cursor.execute(
+                "SELECT COUNT(*) AS n, MIN(attempted_at) AS oldest FROM email_outbox WHERE provider = ? AND attempted_at >= ?",
+                (provider, now - window)
+            )
+            usage = cursor.fetchone()
+            if usage['n'] >= limit:
+                conn.rollback()
+                return None, max(usage['oldest'] + window - now, 0.1)
+        cursor.execute('''
+            SELECT * FROM email_outbox
+            WHERE (status = 'queued' AND run_after <= ?)
+               OR (status = 'sending' AND locked_at < ?)
+            ORDER BY run_after, id
+            LIMIT 1
+        ''', (now, now - EMAIL_LEASE_SECONDS))
+        email = cursor.fetchone()
+        if email is None:
+            conn.rollback()
+            return None, EMAIL_POLL_SECONDS
+        cursor.execute('''
+            UPDATE email_outbox
+            SET status = 'sending', attempts = attempts + 1, locked_at = ?, attempted_at = ?, provider = ?, updated_at = datetime('now')
+            WHERE id = ?
+        ''', (now, now, provider, email['id']))
+        conn.commit()
+        email = dict(email)
+        email['attempts'] += 1
+        return email, 0
+    finally:
+        conn.close()
+
+def _finish_email(email, error=None, retryable=True):
+    """Marks an email sent, or schedules a retry with exponential backoff, or marks it failed."""
+    conn = get_db_connection()
+    try:
+        if error is None:
+            conn.execute("UPDATE email_outbox SET status = 'sent', sent_at = ?, last_error = NULL, updated_at = datetime('now') WHERE id = ?",
+                         (time.time(), email['id']))
+        elif retryable and email['attempts'] < email['max_attempts']:
+            retry_at = time.time() + EMAIL_RETRY_BASE_SECONDS * (2 ** (email['attempts'] - 1))
+            conn.execute("UPDATE email_outbox SET status = 'queued', run_after = ?, last_error = ?, updated_at = datetime('now') WHERE id = ?",
+                         (retry_at, str(error), email['id']))
+        else:
+            conn.execute("UPDATE email_outbox SET status = 'failed', last_error = ?, updated_at = datetime('now') WHERE id = ?",
+                         (str(error), email['id']))
+        conn.commit()
+    finally:
+        conn.close()
+
+def _deliver_email(email):
+    """Sends one claimed outbox row and records the outcome."""
+    try:
+        send_pooled_message(message_from_string(email['message']))
+    except smtplib.SMTPRecipientsRefused as e:
+        print(f"Email {email['id']} ({email['template']}) to {email['recipient']} refused: {e}")
+        _finish_email(email, f"Recipient refused: {e}", retryable=False)
+    except smtplib.SMTPResponseException as e:
+        print(f"Email {email['id']} ({email['template']}) attempt {email['attempts']} failed: {e}")
+        # 5xx replies are permanent; 4xx (e.g. rate limited by the server) are worth retrying
+        _finish_email(email, e, retryable=e.smtp_code < 500)
+    except Exception as e:
+        print(f"Email {email['id']} ({email['template']}) attempt {email['attempts']} failed: {e}")
+        _finish_email(email, e)
+    else:
+        print(f"Email {email['id']} ({email['template']}) sent to {email['recipient']}")
+        _finish_email(email)
+
+def run_pending_emails(limit=None):
+    """Delivers due emails in the calling thread until none are due, the rate limit is hit or limit is reached. Returns the count attempted."""
+    ran = 0
+    while limit is None or ran < limit:
+        email, _ = _claim_next_email()
+        if email is None:
+            break
+        _deliver_email(email)
+        ran += 1
+    return ran
+
+def _email_worker_loop():
+    while True:
+        try:
+            email, wait = _claim_next_email()
+            if email is None:
+                _email_wakeup.wait(wait)
+                _email_wakeup.clear()
+                continue
+            _deliver_email(email)
+        except Exception as e:
+            print(f"Email worker error: {e}")
+            time.sleep(EMAIL_POLL_SECONDS)
+
+def start_email_workers(count=None):
+    """Starts the in-process outbox delivery threads once per process (see start_job_workers)."""
+    global _email_workers_started
+    count = EMAIL_WORKERS if count is None else count
+    with _email_workers_lock:
+        if _email_workers_started or count <= 0:
+            return
+        for i in range(count):
+            threading.Thread(target=_email_worker_loop, name=f"email-worker-{i}", daemon=True).start()
+        _email_workers_started = True
+
+def email_outbox_row(row):
+    """Public fields of an outbox row for the status API."""
+    def iso(ts):
+        return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ') if ts else None
+    return {
+        'id': row['id'],
+        'app_id': row['app_id'],
+        'template': row['template'],
+        'recipient': row['recipient'],
+        'subject': row['subject'],
+        'status': row['status'],
+        'attempts': row['attempts'],
+        'max_attempts': row['max_attempts'],
+        'next_attempt_at': iso(row['run_after']) if row['status'] == 'queued' else None,
+        'sent_at': iso(row['sent_at']),
+        'last_error': row['last_error'],
+        'created_at': row['created_at'],
+    }
+
+def flatten_application_data(data, app_id):
+    """
+    Flattens the nested application data dictionary into a single-level dictionary
+    for use in a DataFrame row.
+    """
+    flat_data = {'App_ID': app_id, 'Job_Title': data.get('jobTitle', 'N/A')}
+
+    # 1. Flatten main sections
+    for section_name in ['personal', 'communication', 'financial', 'onboarding']:
+        for key, value in data.get(section_name, {}).items():
+            flat_data[f"{section_name.capitalize()}_{key.capitalize()}"] = value
+
+    # 2. Handle Education (Complex nested array)
+    education_list = data.get('education', [])
+    if isinstance(education_list, list) and education_list:
+        edu_summary = []
+        for i, entry in enumerate(education_list, 1):
+            summary = (
+                f"[{i}] Degree: {entry.get('degree', 'N/A')}, "
+                f"Branch: {entry.get('branch', 'N/A')}, " 
+                f"Institution: {entry.get('institution', 'N/A')}, "
                 f"Grade: {entry.get('grade', 'N/A')}"
             )
             edu_summary.append(summary)
@@ -375,78 +1831,205 @@ def flatten_application_data(data, app_id):
 
     return flat_data
 
-# NEW: ATS Simulation Function with Detailed Breakdown
-def simulate_ats_scoring(job_title, job_description, applicant_data=None, resume_file_path=None, resume_filename=None, return_details=False):
-    """
-    Multi-factor heuristic ATS score (0-100):
-    - Seniority/role alignment
-    - Keyword overlap between job description and candidate signals (work titles, education fields)
-    - Work experience count
-    - Education relevance to role family
-    - Resume type bonus (pdf preferred)
-    
-    If return_details=True, returns dict with score breakdown and suggestions.
-    Otherwise returns just the score.
-    """
-    import re
-
+# --- JOB REQUIREMENTS CACHE ---
+# Everything scoring and highlighting derive from a job posting alone, computed
+# once per (job_title, job_description, vocabulary version) and kept in an LRU.
+
+# Canonical skill keywords. Bump ATS_SKILL_VOCABULARY_VERSION (and
+# ATS_SCORING_VERSION) when editing the vocabulary.
+ATS_SKILL_KEYWORDS = frozenset({
+    "react","redux","typescript","javascript","node","express","rest","api","microservices",
+    "postgres","postgresql","mysql","mongodb","sql","nosql",
+    "aws","azure","gcp","docker","kubernetes","ci","cd","testing","jest","pytest",
+    "python","pandas","numpy","scikit-learn","sklearn","ml","machine","learning","data",
+    "figma","sketch","ui","ux","design","wireframes","prototyping"
+})
+ATS_SKILL_VOCABULARY_VERSION = 1
+ATS_STOP_WORDS = frozenset({"and","or","the","to","for","of","in","with","a","an","on","is","are","will","be","our","your","we","you"})
+ATS_TOKEN_PATTERN = re.compile(r"[a-zA-Z][a-zA-Z+.#/-]{1,}")
+JOB_REQUIREMENTS_CACHE_SIZE = int(os.getenv('JOB_REQUIREMENTS_CACHE_SIZE', 1024))
+
+JobRequirements = namedtuple('JobRequirements', [
+    'key',                   # hash of (job_title, job_description, vocabulary version)
+    'normalized_title',
+    'target_skills',         # frozenset of skill keywords named in the description
+    'seniority_bonus',
+    'role_family_bonus',
+    'education_terms',       # degree/branch terms earning the education bonus, () if none
+    'highlight_education',   # (terms, labels) used by find_highlighted_sections, or None
+    'project_keywords',      # terms marking a relevant project section in the highlighted view
+])
+
+_job_requirements_cache = OrderedDict()
+_job_requirements_lock = threading.Lock()
+_job_requirements_stats = {'hits': 0, 'misses': 0}
+
+def job_requirements_key(job_title, job_description):
+    """Stable cache key for a job posting under the current skill vocabulary."""
+    raw = f"{ATS_SKILL_VOCABULARY_VERSION}\x1f{job_title or ''}\x1f{job_description or ''}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+def get_job_requirements(job_title, job_description):
+    """Returns the cached JobRequirements for a posting, building them on a miss."""
+    key = job_requirements_key(job_title, job_description)
+    with _job_requirements_lock:
+        cached = _job_requirements_cache.get(key)
+        if cached is not None:
+            _job_requirements_cache.move_to_end(key)
+            _job_requirements_stats['hits'] += 1
+            return cached
+        _job_requirements_stats['misses'] += 1
+
+    requirements = _build_job_requirements(key, job_title, job_description)
+    with _job_requirements_lock:
+        _job_requirements_cache[key] = requirements
+        _job_requirements_cache.move_to_end(key)
+        while len(_job_requirements_cache) > JOB_REQUIREMENTS_CACHE_SIZE:
+            _job_requirements_cache.popitem(last=False)
+    return requirements
+
+def _build_job_requirements(key, job_title, job_description):
     normalized_title = (job_title or "").lower()
     normalized_desc = (job_description or "").lower()
-    data = applicant_data or {}
 
     # Tokenize description (simple) and retain likely skill words
-    tokens = set(re.findall(r"[a-zA-Z][a-zA-Z+.#/-]{1,}", normalized_desc))
-    stop = {"and","or","the","to","for","of","in","with","a","an","on","is","are","will","be","our","your","we","you"}
-    tokens = {t for t in tokens if t not in stop and len(t) >= 2}
-
-    # Canonical skill keywords
-    skill_keywords = {
-        "react","redux","typescript","javascript","node","express","rest","api","microservices",
-        "postgres","postgresql","mysql","mongodb","sql","nosql",
-        "aws","azure","gcp","docker","kubernetes","ci","cd","testing","jest","pytest",
-        "python","pandas","numpy","scikit-learn","sklearn","ml","machine","learning","data",
-        "figma","sketch","ui","ux","design","wireframes","prototyping"
-    }
-    target_skills = tokens & skill_keywords
+    tokens = set(ATS_TOKEN_PATTERN.findall(normalized_desc))
+    tokens = {t for t in tokens if t not in ATS_STOP_WORDS and len(t) >= 2}
+    target_skills = frozenset(tokens & ATS_SKILL_KEYWORDS)
 
-    # Candidate signals from application data
+    seniority_bonus = 0
+    role_family_bonus = 0
+    if any(k in normalized_title for k in ["senior","lead","principal","manager"]):
+        seniority_bonus = 15
+    if any(k in normalized_title for k in ["engineer","developer","scientist","designer","product","marketing"]):
+        role_family_bonus = 5
+
+    # Education relevance: match role family vs branch/degree
+    education_terms = ()
+    highlight_education = None
+    if any(k in normalized_title for k in ["frontend","ui","ux","designer","react","typescript","javascript"]):
+        education_terms = ("computer","cs","information","it","design","ui","ux")
+        highlight_education = (education_terms, ("Computer Science", "IT", "Design"))
+    elif any(k in normalized_title for k in ["backend","node","engineer","data","scientist"]):
+        education_terms = ("computer","cs","information","it","math","statistics","data")
+        highlight_education = (education_terms, ("Computer Science", "IT", "Mathematics", "Data Science"))
+    elif any(k in normalized_title for k in ["product","marketing"]):
+        education_terms = ("mba","business","marketing","management")
+
+    project_keywords = ()
+    if 'data' in normalized_title or 'scientist' in normalized_title:
+        project_keywords = ('python', 'machine learning', 'ml', 'data science', 'data analysis', 'pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch', 'project', 'model', 'dataset', 'prediction', 'algorithm')
+    elif 'frontend' in normalized_title or 'react' in normalized_title:
+        project_keywords = ('react', 'javascript', 'typescript', 'frontend', 'ui', 'ux', 'project', 'application', 'component', 'redux')
+    elif 'backend' in normalized_title or 'node' in normalized_title:
+        project_keywords = ('node', 'express', 'api', 'backend', 'server', 'database', 'project', 'microservice', 'rest', 'postgres', 'mongodb')
+    elif 'designer' in normalized_title or 'ux' in normalized_title:
+        project_keywords = ('design', 'ui', 'ux', 'figma', 'sketch', 'prototype', 'project', 'wireframe', 'user experience')
+
+    return JobRequirements(key, normalized_title, target_skills, seniority_bonus, role_family_bonus,
+                           education_terms, highlight_education, project_keywords)
+
+def job_requirements_cache_stats():
+    """Returns hit/miss counters and the current size of the job requirements cache."""
+    with _job_requirements_lock:
+        return dict(_job_requirements_stats, size=len(_job_requirements_cache), capacity=JOB_REQUIREMENTS_CACHE_SIZE)
+
+
+def _candidate_signals(data):
+    """
+    Collects candidate terms from work titles/companies and education fields.
+    Returns (candidate_tokens, candidate_blob).
+    """
     candidate_terms = []
-    work_titles = []
-    work_companies = []
-    education_degrees = []
-    education_branches = []
     
     # Work titles and companies
     if isinstance(data.get('work'), list):
         for w in data['work']:
-            title = str(w.get('title',''))
-            company = str(w.get('company',''))
-            work_titles.append(title)
-            work_companies.append(company)
-            candidate_terms.extend([title, company])
+            candidate_terms.extend([str(w.get('title','')), str(w.get('company',''))])
     
     # Education degrees/branches
     if isinstance(data.get('education'), list):
         for e in data['education']:
-            degree = str(e.get('degree',''))
-            branch = str(e.get('branch',''))
-            institution = str(e.get('institution',''))
-            education_degrees.append(degree)
-            education_branches.append(branch)
-            candidate_terms.extend([degree, branch, institution])
+            candidate_terms.extend([str(e.get('degree','')), str(e.get('branch','')), str(e.get('institution',''))])
 
     candidate_blob = " ".join(candidate_terms).lower()
-    candidate_tokens = set(re.findall(r"[a-zA-Z][a-zA-Z+.#/-]{1,}", candidate_blob))
+    return set(ATS_TOKEN_PATTERN.findall(candidate_blob)), candidate_blob
+
+def _ats_score_details(requirements, data, candidate_tokens, breakdown, final_score):
+    """Builds the detailed score dict (breakdown, keywords, suggestions) shared by single and batch scoring."""
+    target_skills = requirements.target_skills
+    overlap = target_skills & candidate_tokens
+    work_entries = data.get('work', [])
+
+    # Generate suggestions for improvement
+    suggestions = []
+    missing_keywords = target_skills - candidate_tokens
+    
+    if missing_keywords:
+        suggestions.append(f"Add missing keywords: {', '.join(sorted(list(missing_keywords))[:10])}")
+    
+    if breakdown['work_experience_score'] < 15:
+        suggestions.append(f"Add more work experience entries (currently {len(work_entries) if isinstance(work_entries, list) else 0} entries)")
+    
+    if breakdown['education_relevance_score'] == 0:
+        suggestions.append("Ensure education background matches the role requirements")
+    
+    if breakdown['resume_type_score'] == 0:
+        suggestions.append("Use PDF format for better compatibility")
+    
+    if final_score < 60:
+        suggestions.append("Consider highlighting more relevant skills and experience in your resume")
+
+    return {
+        'score': final_score,
+        'breakdown': breakdown,
+        'matched_keywords': sorted(list(overlap)),
+        'missing_keywords': sorted(list(missing_keywords)),
+        'target_keywords': sorted(list(target_skills)),
+        'candidate_keywords': sorted(list(candidate_tokens & ATS_SKILL_KEYWORDS)),
+        'suggestions': suggestions,
+        'work_experience_count': len(work_entries) if isinstance(work_entries, list) else 0,
+        'education_count': len(data.get('education', [])) if isinstance(data.get('education'), list) else 0
+    }
+
+def ats_jitter(app_id, mode=None):
+    """
+    Returns the score jitter (-2..2) for an application under the given jitter
+    mode (ATS_SCORING_JITTER by default). Seeded jitter is 0 without an app_id.
+    """
+    mode = mode or ATS_SCORING_JITTER
+    if mode == 'random':
+        return random.randint(-2, 2)
+    if mode == 'off' or not app_id:
+        return 0
+    digest = hashlib.sha256(f"{app_id}|{ATS_SCORING_VERSION}".encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'big') % 5 - 2
+
+# NEW: ATS Simulation Function with Detailed Breakdown
+def simulate_ats_scoring(job_title, job_description, applicant_data=None, resume_file_path=None, resume_filename=None, return_details=False, app_id=None, jitter_mode=None):
+    """
+    Multi-factor heuristic ATS score (0-100):
+    - Seniority/role alignment
+    - Keyword overlap between job description and candidate signals (work titles, education fields)
+    - Work experience count
+    - Education relevance to role family
+    - Resume type bonus (pdf preferred)
+    
+    If return_details=True, returns dict with score breakdown and suggestions.
+    Otherwise returns just the score. The jitter follows jitter_mode
+    (ATS_SCORING_JITTER by default); see ats_jitter.
+    """
+    requirements = get_job_requirements(job_title, job_description)
+    data = applicant_data or {}
+    target_skills = requirements.target_skills
+
+    # Candidate signals from application data
+    candidate_tokens, candidate_blob = _candidate_signals(data)
 
     # Base score by role seniority/family
     base_score = 30
-    seniority_bonus = 0
-    role_family_bonus = 0
-    
-    if any(k in normalized_title for k in ["senior","lead","principal","manager"]):
-        seniority_bonus = 15
-    if any(k in normalized_title for k in ["engineer","developer","scientist","designer","product","marketing"]):
-        role_family_bonus = 5
+    seniority_bonus = requirements.seniority_bonus
+    role_family_bonus = requirements.role_family_bonus
     
     score = base_score + seniority_bonus + role_family_bonus
 
@@ -460,22 +2043,12 @@ def simulate_ats_scoring(job_title, job_description, applicant_data=None, resume
     work_experience_score = 0
     if isinstance(work_entries, list):
         work_experience_score = min(len(work_entries) * 3, 15)
-    elif isinstance(work_entries, dict) and work_entries.get('status') == 'Skipped':
-        work_experience_score = 0
     score += work_experience_score
 
     # Education relevance bonus: match role family vs branch/degree
     edu_bonus = 0
-    edu_blob = " ".join(candidate_terms).lower()
-    if any(k in normalized_title for k in ["frontend","ui","ux","designer","react","typescript","javascript"]):
-        if any(k in edu_blob for k in ["computer","cs","information","it","design","ui","ux"]):
-            edu_bonus = 8
-    elif any(k in normalized_title for k in ["backend","node","engineer","data","scientist"]):
-        if any(k in edu_blob for k in ["computer","cs","information","it","math","statistics","data"]):
-            edu_bonus = 8
-    elif any(k in normalized_title for k in ["product","marketing"]):
-        if any(k in edu_blob for k in ["mba","business","marketing","management"]):
-            edu_bonus = 8
+    if any(k in candidate_blob for k in requirements.education_terms):
+        edu_bonus = 8
     score += edu_bonus
 
     # Resume type bonus
@@ -483,62 +2056,138 @@ def simulate_ats_scoring(job_title, job_description, applicant_data=None, resume
     fname = (resume_filename or (os.path.basename(resume_file_path) if resume_file_path else "")).lower()
     if fname.endswith('.pdf'):
         resume_type_score = 4
-    elif fname.endswith(('.jpg', '.jpeg')):
-        resume_type_score = 0
 
     score += resume_type_score
 
     # Clamp and small jitter
     score_before_jitter = max(0, min(score, 98))
-    jitter = random.randint(-2, 2)
-    final_score = max(0, min(score_before_jitter + jitter, 100))
+    jitter_mode = jitter_mode or ATS_SCORING_JITTER
+    jitter_value = ats_jitter(app_id, jitter_mode)
+    final_score = max(0, min(score_before_jitter + jitter_value, 100))
 
     if not return_details:
         return final_score
 
-    # Generate suggestions for improvement
-    suggestions = []
-    missing_keywords = target_skills - candidate_tokens
-    
-    if missing_keywords:
-        suggestions.append(f"Add missing keywords: {', '.join(sorted(list(missing_keywords))[:10])}")
-    
-    if work_experience_score < 15:
-        suggestions.append(f"Add more work experience entries (currently {len(work_entries) if isinstance(work_entries, list) else 0} entries)")
-    
-    if edu_bonus == 0:
-        suggestions.append("Ensure education background matches the role requirements")
-    
-    if resume_type_score == 0:
-        suggestions.append("Use PDF format for better compatibility")
-    
-    if final_score < 60:
-        suggestions.append("Consider highlighting more relevant skills and experience in your resume")
+    return _ats_score_details(requirements, data, candidate_tokens, {
+        'base_score': base_score,
+        'seniority_bonus': seniority_bonus,
+        'role_family_bonus': role_family_bonus,
+        'keyword_match_score': keyword_score,
+        'work_experience_score': work_experience_score,
+        'education_relevance_score': edu_bonus,
+        'resume_type_score': resume_type_score,
+        'jitter': jitter_value,
+        'jitter_mode': jitter_mode
+    }, final_score)
 
-    return {
-        'score': final_score,
-        'breakdown': {
+
+# --- BATCH ATS SCORING ---
+# Scores every applicant of one posting at once: candidate skills become rows of
+# a 0/1 matrix over the skill vocabulary, and all score components are computed
+# as NumPy vectors. Results equal simulate_ats_scoring per applicant.
+
+ATS_SKILL_VOCABULARY = tuple(sorted(ATS_SKILL_KEYWORDS))
+_ATS_SKILL_INDEX = {skill: i for i, skill in enumerate(ATS_SKILL_VOCABULARY)}
+
+def score_batch(job, applicants, return_details=False, jitter_mode=None):
+    """
+    Scores applicants for one job posting.
+    job: JobRequirements from get_job_requirements(job_title, job_description).
+    applicants: list of dicts with 'applicant_data' and optional 'resume_filename'
+    and 'app_id' (which seeds the jitter).
+    Returns scores (or detail dicts when return_details=True) in input order.
+    """
+    count = len(applicants)
+    if count == 0:
+        return []
+
+    # Collect per-applicant signals, then fill the arrays in one step each
+    matrix_rows, matrix_cols = [], []
+    work_counts, education_match, is_pdf = [], [], []
+    candidate_token_sets = []
+    education_terms = job.education_terms
+    for i, applicant in enumerate(applicants):
+        data = applicant.get('applicant_data') or {}
+        candidate_tokens, candidate_blob = _candidate_signals(data)
+        candidate_token_sets.append(candidate_tokens)
+        for token in candidate_tokens:
+            col = _ATS_SKILL_INDEX.get(token)
+            if col is not None:
+                matrix_rows.append(i)
+                matrix_cols.append(col)
+        work_entries = data.get('work', [])
+        work_counts.append(len(work_entries) if isinstance(work_entries, list) else 0)
+        education_match.append(any(k in candidate_blob for k in education_terms))
+        is_pdf.append((applicant.get('resume_filename') or '').lower().endswith('.pdf'))
+
+    skill_matrix = np.zeros((count, len(ATS_SKILL_VOCABULARY)), dtype=np.int32)
+    skill_matrix[matrix_rows, matrix_cols] = 1
+    work_counts = np.array(work_counts, dtype=np.int32)
+    education_match = np.array(education_match, dtype=bool)
+    is_pdf = np.array(is_pdf, dtype=bool)
+
+    target_vector = np.zeros(len(ATS_SKILL_VOCABULARY), dtype=np.int32)
+    target_vector[[_ATS_SKILL_INDEX[t] for t in job.target_skills]] = 1
+
+    keyword_scores = np.minimum((skill_matrix @ target_vector) * 4, 40)
+    work_scores = np.minimum(work_counts * 3, 15)
+    education_scores = education_match * 8
+    resume_type_scores = is_pdf * 4
+    base_score = 30
+    scores = (base_score + job.seniority_bonus + job.role_family_bonus
+              + keyword_scores + work_scores + education_scores + resume_type_scores)
+
+    # Clamp and small jitter
+    scores_before_jitter = np.clip(scores, 0, 98)
+    jitter_mode = jitter_mode or ATS_SCORING_JITTER
+    jitters = np.array([ats_jitter(a.get('app_id'), jitter_mode) for a in applicants], dtype=np.int32)
+    final_scores = np.clip(scores_before_jitter + jitters, 0, 100)
+
+    if not return_details:
+        return [int(v) for v in final_scores]
+
+    return [
+        _ats_score_details(job, applicants[i].get('applicant_data') or {}, candidate_token_sets[i], {
             'base_score': base_score,
-            'seniority_bonus': seniority_bonus,
-            'role_family_bonus': role_family_bonus,
-            'keyword_match_score': keyword_score,
-            'work_experience_score': work_experience_score,
-            'education_relevance_score': edu_bonus,
-            'resume_type_score': resume_type_score,
-            'jitter': jitter
-        },
-        'matched_keywords': sorted(list(overlap)),
-        'missing_keywords': sorted(list(missing_keywords)),
-        'target_keywords': sorted(list(target_skills)),
-        'candidate_keywords': sorted(list(candidate_tokens & skill_keywords)),
-        'suggestions': suggestions,
-        'work_experience_count': len(work_entries) if isinstance(work_entries, list) else 0,
-        'education_count': len(data.get('education', [])) if isinstance(data.get('education'), list) else 0
-    }
+            'seniority_bonus': job.seniority_bonus,
+            'role_family_bonus': job.role_family_bonus,
+            'keyword_match_score': int(keyword_scores[i]),
+            'work_experience_score': int(work_scores[i]),
+            'education_relevance_score': int(education_scores[i]),
+            'resume_type_score': int(resume_type_scores[i]),
+            'jitter': int(jitters[i]),
+            'jitter_mode': jitter_mode
+        }, int(final_scores[i]))
+        for i in range(count)
+    ]
 
 
 # --- PDF EXTRACTION AND HIGHLIGHTING UTILITIES ---
 
+def _extract_pdf_pages(file_path):
+    """
+    Extracts per-page text from a PDF file using the available library.
+    Returns a list of (page_number, text) for pages that produced text.
+    Raises on extraction errors.
+    """
+    pages = []
+    if PDF_LIBRARY == 'pdfplumber':
+        # Using pdfplumber (better for text extraction)
+        with pdfplumber.open(file_path) as pdf:
+            for number, page in enumerate(pdf.pages, 1):
+                text = page.extract_text()
+                if text:
+                    pages.append((number, text))
+    elif PDF_LIBRARY == 'PyPDF2':
+        # Using PyPDF2 (fallback)
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            for number, page in enumerate(pdf_reader.pages, 1):
+                text = page.extract_text()
+                if text:
+                    pages.append((number, text))
+    return pages
+
 def extract_text_from_pdf(file_path):
     """
     Extracts text from PDF file using available library.
@@ -548,29 +2197,104 @@ def extract_text_from_pdf(file_path):
         return None
     
     try:
-        if PDF_LIBRARY == 'pdfplumber':
-            # Using pdfplumber (better for text extraction)
-            with pdfplumber.open(file_path) as pdf:
-                text_parts = []
-                for page in pdf.pages:
-                    text = page.extract_text()
-                    if text:
-                        text_parts.append(text)
-                return "\n\n".join(text_parts)
-        elif PDF_LIBRARY == 'PyPDF2':
-            # Using PyPDF2 (fallback)
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text_parts = []
-                for page in pdf_reader.pages:
-                    text = page.extract_text()
-                    if text:
-                        text_parts.append(text)
-                return "\n\n".join(text_parts)
+        return "\n\n".join(text for _, text in _extract_pdf_pages(file_path))
     except Exception as e:
         print(f"Error extracting text from PDF {file_path}: {e}")
         return None
 
+def keyword_matcher(keywords):
+    """
+    Returns one compiled case-insensitive regex matching any of the keywords as
+    whole words (longest alternative first), or None for an empty set. Patterns
+    are cached per keyword vocabulary.
+    """
+    return _compile_keyword_matcher(tuple(sorted({k.lower() for k in keywords if k})))
+
+@functools.lru_cache(maxsize=256)
+def _compile_keyword_matcher(keywords):
+    if not keywords:
+        return None
+    alternation = '|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+    return re.compile(r'\b(?:' + alternation + r')\b', re.IGNORECASE)
+
+# Resume section headings (lowercase, inner whitespace collapsed, no trailing
+# colon) and the kind of section each one opens. Only these lines start a
+# section, so sub-headings such as 'Responsibilities:' stay inside theirs.
+RESUME_SECTION_HEADINGS = {
+    'skills': ('skills', 'skill', 'technical skills', 'technical skill', 'core skills', 'key skills',
+               'soft skills', 'skills & tools', 'skills and tools', 'technologies', 'technology',
+               'tech stack', 'core competencies', 'competencies'),
+    'experience': ('experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history', 'career history', 'internships', 'internship'),
+    'education': ('education', 'academic qualification', 'academic qualifications',
+                  'educational qualifications', 'qualifications', 'academics', 'academic background'),
+    'projects': ('projects', 'project', 'key projects', 'key project', 'notable projects', 'portfolio projects',
+                 'personal projects', 'academic projects', 'project experience'),
+    'other': ('summary', 'professional summary', 'profile', 'objective', 'career objective', 'about me',
+              'certifications', 'certification', 'certificates', 'courses', 'achievements', 'awards',
+              'honors', 'languages', 'interests', 'hobbies', 'activities', 'extracurricular activities',
+              'publications', 'references', 'contact', 'personal details', 'personal information',
+              'declaration', 'strengths', 'volunteering', 'training', 'trainings', 'workshops'),
+}
+_RESUME_HEADING_KINDS = {title: kind for kind, titles in RESUME_SECTION_HEADINGS.items() for title in titles}
+_RESUME_HEADING_MAX_CHARS = 40
+_RESUME_HEADING_DECORATION = ' \t-–—•*#|_=>'
+
+ResumeSection = namedtuple('ResumeSection', [
+    'kind',        # 'skills', 'experience', 'education', 'projects' or 'other'
+    'title',       # normalized heading text
+    'start',       # offset of the heading line
+    'body_start',  # offset where the section content begins
+    'end',         # offset just past the section's last non-blank line
+])
+
+def _resume_heading(line):
+    """
+    Classifies one resume line. Returns (kind, title, body_offset) for a heading,
+    where body_offset is where inline content after 'Heading:' starts in the
+    line (None when the heading fills the line), or None for ordinary text.
+    """
+    head, colon, rest = line.partition(':')
+    if len(head) > _RESUME_HEADING_MAX_CHARS * 2:
+        return None
+    title = ' '.join(head.split()).strip(_RESUME_HEADING_DECORATION).lower()
+    if not title or len(title) > _RESUME_HEADING_MAX_CHARS:
+        return None
+    kind = _RESUME_HEADING_KINDS.get(title)
+    if kind is None:
+        return None
+    inline = rest.lstrip()
+    if colon and inline.strip():
+        return kind, title, len(line) - len(inline)
+    return kind, title, None
+
+def segment_resume(resume_text):
+    """
+    Splits resume text into sections in a single pass over its lines, in linear
+    time. Returns ResumeSection tuples in document order with character offsets
+    into resume_text; text before the first heading belongs to no section.
+    """
+    sections = []
+    current = None
+    content_end = 0
+    position = 0
+    for line in resume_text.splitlines(keepends=True):
+        line_start = position
+        position += len(line)
+        heading = _resume_heading(line)
+        if heading is not None:
+            if current is not None:
+                sections.append(current._replace(end=content_end))
+            kind, title, body_offset = heading
+            body_start = line_start + body_offset if body_offset is not None else position
+            current = ResumeSection(kind, title, line_start, body_start, position)
+            content_end = line_start + len(line.rstrip())
+        elif current is not None and not line.isspace():
+            content_end = line_start + len(line.rstrip())
+    if current is not None:
+        sections.append(current._replace(end=content_end))
+    return sections
+
 def find_highlighted_sections(resume_text, job_title, job_description, applicant_data):
     """
     Analyzes resume text and identifies sections that contributed to ATS score.
@@ -585,36 +2309,22 @@ def find_highlighted_sections(resume_text, job_title, job_description, applicant
             'error': 'Could not extract text from resume'
         }
     
-    import re
-    
-    normalized_text = resume_text.lower()
-    normalized_title = (job_title or "").lower()
-    normalized_desc = (job_description or "").lower()
     data = applicant_data or {}
     
-    # Get target keywords from job description (same logic as ATS scoring)
-    tokens = set(re.findall(r"[a-zA-Z][a-zA-Z+.#/-]{1,}", normalized_desc))
-    stop = {"and","or","the","to","for","of","in","with","a","an","on","is","are","will","be","our","your","we","you"}
-    tokens = {t for t in tokens if t not in stop and len(t) >= 2}
-    
-    skill_keywords = {
-        "react","redux","typescript","javascript","node","express","rest","api","microservices",
-        "postgres","postgresql","mysql","mongodb","sql","nosql",
-        "aws","azure","gcp","docker","kubernetes","ci","cd","testing","jest","pytest",
-        "python","pandas","numpy","scikit-learn","sklearn","ml","machine","learning","data",
-        "figma","sketch","ui","ux","design","wireframes","prototyping"
-    }
-    target_skills = tokens & skill_keywords
+    # Get target keywords from job description (shared with ATS scoring)
+    requirements = get_job_requirements(job_title, job_description)
+    target_skills = requirements.target_skills
     
-    # Find matched keywords in resume text
+    # Find matched keywords in resume text (single scan, first occurrence of each)
     found_keywords = []
     keyword_contexts = []
     
-    for keyword in target_skills:
-        # Use case-insensitive search with word boundaries
-        pattern = re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE)
-        matches = pattern.finditer(resume_text)
-        for match in matches:
+    matcher = keyword_matcher(target_skills)
+    if matcher is not None:
+        for match in matcher.finditer(resume_text):
+            keyword = match.group(0).lower()
+            if keyword in found_keywords:
+                continue
             found_keywords.append(keyword)
             # Extract context (50 chars before and after)
             start = max(0, match.start() - 50)
@@ -625,112 +2335,90 @@ def find_highlighted_sections(resume_text, job_title, job_description, applicant
                 'context': context,
                 'position': match.start()
             })
-            break  # Only record first occurrence
+            if len(found_keywords) == len(target_skills):
+                break
     
+    # Segment the resume once; each kind uses its first section
+    sections = segment_resume(resume_text)
+    first_sections = {}
+    for section in sections:
+        first_sections.setdefault(section.kind, section)
+
     # Identify Skills Section
     skills_section = []
-    skills_patterns = [
-        r'skills?\s*[:]?\s*\n(.+?)(?=\n\n|\n[A-Z]|\n[0-9]|$)',
-        r'technical\s+skills?\s*[:]?\s*\n(.+?)(?=\n\n|\n[A-Z]|$)',
-        r'core\s+skills?\s*[:]?\s*\n(.+?)(?=\n\n|\n[A-Z]|$)',
-        r'technologies?\s*[:]?\s*\n(.+?)(?=\n\n|\n[A-Z]|$)',
-    ]
-    
-    for pattern in skills_patterns:
-        match = re.search(pattern, resume_text, re.IGNORECASE | re.DOTALL)
-        if match:
-            skills_text = match.group(1)
-            # Highlight keywords found in skills section
-            highlighted_skills = []
-            for keyword in found_keywords:
-                if keyword.lower() in skills_text.lower():
-                    highlighted_skills.append(keyword)
-            if highlighted_skills:
-                skills_section.append({
-                    'section': skills_text[:200] + ('...' if len(skills_text) > 200 else ''),
-                    'highlighted_keywords': highlighted_skills
-                })
-            break
+    section = first_sections.get('skills')
+    if section is not None:
+        skills_text = resume_text[section.body_start:section.end]
+        skills_lower = skills_text.lower()
+        # Highlight keywords found in skills section
+        highlighted_skills = [keyword for keyword in found_keywords if keyword.lower() in skills_lower]
+        if highlighted_skills:
+            skills_section.append({
+                'section': skills_text[:200] + ('...' if len(skills_text) > 200 else ''),
+                'highlighted_keywords': highlighted_skills
+            })
     
     # Identify Experience Section
     experience_section = []
-    experience_patterns = [
-        r'experience\s*[:]?\s*\n(.+?)(?=\n\n[A-Z][a-z]+\s*[:]?|\n\nEducation|\n\nSkills|$)',
-        r'work\s+experience\s*[:]?\s*\n(.+?)(?=\n\n[A-Z][a-z]+\s*[:]?|\n\nEducation|\n\nSkills|$)',
-        r'professional\s+experience\s*[:]?\s*\n(.+?)(?=\n\n[A-Z][a-z]+\s*[:]?|\n\nEducation|\n\nSkills|$)',
-    ]
-    
-    for pattern in experience_patterns:
-        match = re.search(pattern, resume_text, re.IGNORECASE | re.DOTALL)
-        if match:
-            exp_text = match.group(1)
-            # Check for work experience keywords
-            exp_keywords = []
-            for keyword in found_keywords:
-                if keyword.lower() in exp_text.lower():
-                    exp_keywords.append(keyword)
-            
-            # Extract job titles/companies mentioned
-            job_title_patterns = []
-            if isinstance(data.get('work'), list):
-                for w in data['work']:
-                    title = str(w.get('title', ''))
-                    company = str(w.get('company', ''))
-                    if title and title.lower() in exp_text.lower():
-                        job_title_patterns.append(title)
-                    if company and company.lower() in exp_text.lower():
-                        job_title_patterns.append(company)
-            
-            if exp_keywords or job_title_patterns:
-                experience_section.append({
-                    'section': exp_text[:300] + ('...' if len(exp_text) > 300 else ''),
-                    'highlighted_keywords': exp_keywords,
-                    'job_titles': job_title_patterns
-                })
-            break
+    section = first_sections.get('experience')
+    if section is not None:
+        exp_text = resume_text[section.body_start:section.end]
+        exp_lower = exp_text.lower()
+        # Check for work experience keywords
+        exp_keywords = [keyword for keyword in found_keywords if keyword.lower() in exp_lower]
+        
+        # Extract job titles/companies mentioned
+        job_title_patterns = []
+        if isinstance(data.get('work'), list):
+            for w in data['work']:
+                title = str(w.get('title', ''))
+                company = str(w.get('company', ''))
+                if title and title.lower() in exp_lower:
+                    job_title_patterns.append(title)
+                if company and company.lower() in exp_lower:
+                    job_title_patterns.append(company)
+        
+        if exp_keywords or job_title_patterns:
+            experience_section.append({
+                'section': exp_text[:300] + ('...' if len(exp_text) > 300 else ''),
+                'highlighted_keywords': exp_keywords,
+                'job_titles': job_title_patterns
+            })
     
     # Identify Education Section
     education_section = []
-    education_patterns = [
-        r'education\s*[:]?\s*\n(.+?)(?=\n\n[A-Z][a-z]+\s*[:]?|\n\nSkills|$)',
-        r'academic\s+qualification\s*[:]?\s*\n(.+?)(?=\n\n[A-Z][a-z]+\s*[:]?|\n\nSkills|$)',
-    ]
-    
-    for pattern in education_patterns:
-        match = re.search(pattern, resume_text, re.IGNORECASE | re.DOTALL)
-        if match:
-            edu_text = match.group(1)
-            # Check for education keywords
-            edu_keywords = []
-            education_terms = []
-            
-            if isinstance(data.get('education'), list):
-                for e in data['education']:
-                    degree = str(e.get('degree', ''))
-                    branch = str(e.get('branch', ''))
-                    institution = str(e.get('institution', ''))
-                    if degree and degree.lower() in edu_text.lower():
-                        education_terms.append(degree)
-                    if branch and branch.lower() in edu_text.lower():
-                        education_terms.append(branch)
-                    if institution and institution.lower() in edu_text.lower():
-                        education_terms.append(institution)
-            
-            # Check for role-relevant education terms
-            if any(k in normalized_title for k in ["frontend","ui","ux","designer","react","typescript","javascript"]):
-                if any(k in edu_text.lower() for k in ["computer","cs","information","it","design","ui","ux"]):
-                    edu_keywords.extend(["Computer Science", "IT", "Design"])
-            elif any(k in normalized_title for k in ["backend","node","engineer","data","scientist"]):
-                if any(k in edu_text.lower() for k in ["computer","cs","information","it","math","statistics","data"]):
-                    edu_keywords.extend(["Computer Science", "IT", "Mathematics", "Data Science"])
-            
-            if edu_keywords or education_terms:
-                education_section.append({
-                    'section': edu_text[:200] + ('...' if len(edu_text) > 200 else ''),
-                    'highlighted_keywords': edu_keywords,
-                    'education_terms': education_terms
-                })
-            break
+    section = first_sections.get('education')
+    if section is not None:
+        edu_text = resume_text[section.body_start:section.end]
+        edu_lower = edu_text.lower()
+        # Check for education keywords
+        edu_keywords = []
+        education_terms = []
+        
+        if isinstance(data.get('education'), list):
+            for e in data['education']:
+                degree = str(e.get('degree', ''))
+                branch = str(e.get('branch', ''))
+                institution = str(e.get('institution', ''))
+                if degree and degree.lower() in edu_lower:
+                    education_terms.append(degree)
+                if branch and branch.lower() in edu_lower:
+                    education_terms.append(branch)
+                if institution and institution.lower() in edu_lower:
+                    education_terms.append(institution)
+        
+        # Check for role-relevant education terms
+        if requirements.highlight_education:
+            terms, labels = requirements.highlight_education
+            if any(k in edu_lower for k in terms):
+                edu_keywords.extend(labels)
+        
+        if edu_keywords or education_terms:
+            education_section.append({
+                'section': edu_text[:200] + ('...' if len(edu_text) > 200 else ''),
+                'highlighted_keywords': edu_keywords,
+                'education_terms': education_terms
+            })
     
     return {
         'skills': skills_section,
@@ -738,10 +2426,973 @@ def find_highlighted_sections(resume_text, job_title, job_description, applicant
         'education': education_section,
         'keywords': keyword_contexts,
         'matched_keywords': sorted(list(set(found_keywords))),
+        'sections': [section._asdict() for section in sections],
         'resume_text_preview': resume_text[:500] + ('...' if len(resume_text) > 500 else '')
     }
 
 
+# --- RESUME BLOB STORE ---
+# Resume bytes are stored once per content hash under RESUME_BLOB_FOLDER, sharded
+# two levels deep (ab/cd/abcd...) so no directory grows past a few hundred
+# entries. resume_blobs.ref_count counts the resumes rows pointing at each blob;
+# a blob that drops to zero is kept for RESUME_BLOB_GC_GRACE_SECONDS (an upload of
+# the same file may be about to reuse it) and then removed by gc_resume_blobs.
+
+def resume_blob_path(sha256):
+    """Path (relative to the working directory) of the blob holding this content."""
+    return os.path.join(RESUME_BLOB_FOLDER, sha256[:2], sha256[2:4], sha256)
+
+def _is_blob_path(stored_path):
+    blob_root = _resume_abspath(RESUME_BLOB_FOLDER)
+    return os.path.commonpath([_resume_abspath(stored_path), blob_root]) == blob_root
+
+def put_resume_blob(conn, src_path, sha256, mime_type):
+    """
+    Moves src_path into the blob store under sha256, or deletes it if that content
+    is already stored, and returns the blob path. The resume_blobs row is written
+    first: it takes the write lock, so garbage collection cannot remove a blob that
+    is being reused before the caller commits its new reference.
+    """
+    blob_path = resume_blob_path(sha256)
+    conn.execute('''
+        INSERT INTO resume_blobs (sha256, size_bytes, mime_type, ref_count, unreferenced_at)
+        VALUES (?, ?, ?, 0, ?)
+        ON CONFLICT(sha256) DO UPDATE SET
+            unreferenced_at = CASE WHEN resume_blobs.ref_count <= 0 THEN excluded.unreferenced_at ELSE NULL END
+    ''', (sha256, os.path.getsize(src_path), mime_type, time.time()))
+    if os.path.exists(blob_path):
+        if os.path.abspath(src_path) != os.path.abspath(blob_path):
+            os.remove(src_path)
+    else:
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        os.replace(src_path, blob_path)
+    return blob_path
+
+def _change_blob_refs(conn, sha256, delta):
+    """Adjusts a blob's reference count; schedules garbage collection when it drops to zero."""
+    now = time.time()
+    conn.execute('''
+        UPDATE resume_blobs SET
+            ref_count = ref_count + ?,
+            unreferenced_at = CASE WHEN ref_count + ? <= 0 THEN ? ELSE NULL END
+        WHERE sha256 = ?
+    ''', (delta, delta, now, sha256))
+    if delta < 0:
+        row = conn.execute("SELECT ref_count FROM resume_blobs WHERE sha256 = ?", (sha256,)).fetchone()
+        if row and row['ref_count'] <= 0:
+            _schedule_blob_gc(conn)
+
+def _schedule_blob_gc(conn, delay=None):
+    """Queues a gc_resume_blobs job unless one is already waiting (caller commits)."""
+    if conn.execute("SELECT 1 FROM jobs WHERE kind = 'gc_resume_blobs' AND status = 'queued'").fetchone() is None:
+        enqueue_job(conn, 'gc_resume_blobs', delay=RESUME_BLOB_GC_GRACE_SECONDS if delay is None else delay)
+
+def gc_resume_blobs(grace_seconds=None, include_orphans=False):
+    """
+    Removes blobs that have been unreferenced for longer than the grace period.
+    include_orphans also walks the shard directories for blob files without a
+    resume_blobs row (left when a transaction rolled back after moving a file in).
+    Returns (removed, freed_bytes).
+    """
+    grace_seconds = RESUME_BLOB_GC_GRACE_SECONDS if grace_seconds is None else grace_seconds
+    cutoff = time.time() - grace_seconds
+    orphan_candidates = []
+    if include_orphans:
+        for dirpath, _dirnames, filenames in os.walk(RESUME_BLOB_FOLDER):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    if os.stat(path).st_mtime < cutoff:
+                        orphan_candidates.append((name, path))
+                except OSError:
+                    pass
+
+    removed = freed = 0
+    conn = get_db_connection()
+    try:
+        # Files are removed while the write lock is held, so no upload can start reusing them
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute(
+            "SELECT sha256, size_bytes FROM resume_blobs WHERE ref_count <= 0 AND unreferenced_at < ?",
+            (cutoff,)
+        ).fetchall()
+        for row in rows:
+            try:
+                os.remove(resume_blob_path(row['sha256']))
+            except FileNotFoundError:
+                pass
+            conn.execute("DELETE FROM resume_blobs WHERE sha256 = ?", (row['sha256'],))
+            removed += 1
+            freed += row['size_bytes'] or 0
+        for name, path in orphan_candidates:
+            if conn.execute("SELECT 1 FROM resume_blobs WHERE sha256 = ?", (name,)).fetchone() is None:
+                try:
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        # Blobs still inside their grace period get another pass once it ends
+        pending = conn.execute("SELECT MIN(unreferenced_at) AS oldest FROM resume_blobs WHERE ref_count <= 0").fetchone()
+        if pending['oldest'] is not None:
+            _schedule_blob_gc(conn, delay=max(0, pending['oldest'] + grace_seconds - time.time()) + 1)
+        conn.commit()
+    finally:
+        conn.close()
+    return removed, freed
+
+def migrate_resumes_to_blobs():
+    """
+    Moves indexed resumes that still sit flat in the upload folder into the blob
+    store, then recounts every blob's references from the resumes table.
+    Returns (moved, missing).
+    """
+    conn = get_db_connection()
+    moved = missing = 0
+    try:
+        rows = conn.execute("SELECT * FROM resumes").fetchall()
+        for resume in rows:
+            if _is_blob_path(resume['stored_path']):
+                continue
+            file_path = _resume_abspath(resume['stored_path'])
+            if not os.path.exists(file_path):
+                missing += 1
+                continue
+            sha256 = _current_resume_sha256(conn, resume)
+            blob_path = put_resume_blob(conn, file_path, sha256, resume['mime_type'])
+            st = os.stat(blob_path)
+            conn.execute(
+                "UPDATE resumes SET stored_path = ?, sha256 = ?, size_bytes = ?, mtime_ns = ? WHERE app_id = ?",
+                (blob_path, sha256, st.st_size, st.st_mtime_ns, resume['app_id'])
+            )
+            moved += 1
+            if moved % 200 == 0:
+                conn.commit()
+        conn.execute('''
+            UPDATE resume_blobs SET ref_count = (SELECT COUNT(*) FROM resumes WHERE resumes.sha256 = resume_blobs.sha256)
+        ''')
+        conn.execute('''
+            UPDATE resume_blobs SET unreferenced_at = CASE
+                WHEN ref_count > 0 THEN NULL ELSE COALESCE(unreferenced_at, ?) END
+        ''', (time.time(),))
+        conn.commit()
+    finally:
+        conn.close()
+    return moved, missing
+
+@app.cli.command('migrate-resume-blobs')
+def migrate_resume_blobs_command():
+    """Move the flat resumes/ folder into the blob store: flask --app backend migrate-resume-blobs"""
+    indexed, skipped = backfill_resume_index()
+    moved, missing = migrate_resumes_to_blobs()
+    left = [e.name for e in os.scandir(app.config['UPLOAD_FOLDER']) if e.is_file()]
+    print(f"Indexed {indexed} unindexed file(s); moved {moved} resume(s) into the blob store; {missing} indexed file(s) missing.")
+    if left:
+        print(f"{len(left)} file(s) without a known application left in {app.config['UPLOAD_FOLDER']}/.")
+
+@app.cli.command('gc-resume-blobs')
+@click.option('--grace', type=int, default=None, help='Seconds a blob must have been unreferenced (default: RESUME_BLOB_GC_GRACE_SECONDS).')
+@click.option('--orphans', is_flag=True, help='Also remove blob files with no resume_blobs row.')
+def gc_resume_blobs_command(grace, orphans):
+    """Delete unreferenced resume blobs: flask --app backend gc-resume-blobs"""
+    removed, freed = gc_resume_blobs(grace, include_orphans=orphans)
+    print(f"Removed {removed} blob(s), freed {freed} bytes.")
+
+
+# --- RESUME FILE INDEX ---
+
+def _resume_mimetype(file_name):
+    """Maps a resume filename to the mimetype it is served with."""
+    lowered = (file_name or '').lower()
+    if lowered.endswith('.pdf'):
+        return 'application/pdf'
+    if lowered.endswith(('.jpg', '.jpeg')):
+        return 'image/jpeg'
+    return 'application/octet-stream'
+
+def _sha256_file(file_path, chunk_size=1024 * 1024):
+    """Returns the hex sha256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _resume_abspath(stored_path):
+    """Resolves a stored resume path against the working directory (send_file needs absolute paths)."""
+    if os.path.isabs(stored_path):
+        return stored_path
+    return os.path.join(os.getcwd(), stored_path)
+
+def register_resume(conn, app_id, file_name, file_path, uploaded_at=None, sha256=None):
+    """
+    Records (or replaces) the resume for app_id in the resumes index, moving
+    file_path into the blob store. The previous blob loses a reference; a
+    previous file from before the blob store is removed from disk.
+    sha256 may be passed when the caller already hashed the file while writing it.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT stored_path, sha256 FROM resumes WHERE app_id = ?", (app_id,))
+    previous = cursor.fetchone()
+    sha256 = sha256 or _sha256_file(file_path)
+    mime_type = _resume_mimetype(file_name)
+    blob_path = put_resume_blob(conn, file_path, sha256, mime_type)
+    st = os.stat(blob_path)
+    cursor.execute('''
+        INSERT INTO resumes (app_id, stored_path, file_name, mime_type, size_bytes, sha256, uploaded_at, mtime_ns)
+        VALUES (?, ?, ?, ?, ?, ?, COALESCE(?, datetime('now')), ?)
+        ON CONFLICT(app_id) DO UPDATE SET
+            stored_path=excluded.stored_path,
+            file_name=excluded.file_name,
+            mime_type=excluded.mime_type,
+            size_bytes=excluded.size_bytes,
+            sha256=excluded.sha256,
+            uploaded_at=excluded.uploaded_at,
+            mtime_ns=excluded.mtime_ns
+    ''', (app_id, blob_path, file_name, mime_type, st.st_size, sha256, uploaded_at, st.st_mtime_ns))
+    same_blob = previous is not None and _is_blob_path(previous['stored_path']) and previous['sha256'] == sha256
+    if not same_blob:
+        _change_blob_refs(conn, sha256, 1)
+    if previous:
+        if _is_blob_path(previous['stored_path']):
+            if not same_blob:
+                _change_blob_refs(conn, previous['sha256'], -1)
+        else:
+            try:
+                os.remove(_resume_abspath(previous['stored_path']))
+            except OSError:
+                pass
+        _prune_resume_text_cache(conn, previous['sha256'])
+
+def get_resume_record(conn, app_id):
+    """Returns the resumes row for app_id, or None if no file was uploaded."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM resumes WHERE app_id = ?", (app_id,))
+    return cursor.fetchone()
+
+def _prune_resume_text_cache(conn, sha256):
+    """Drops cached text and highlighted HTML for a content hash no resume references any more."""
+    if sha256:
+        conn.execute(
+            "DELETE FROM resume_text_cache WHERE sha256 = ? AND NOT EXISTS (SELECT 1 FROM resumes WHERE sha256 = ?)",
+            (sha256, sha256)
+        )
+        conn.execute(
+            "DELETE FROM highlighted_html_cache WHERE resume_sha256 = ? AND NOT EXISTS (SELECT 1 FROM resumes WHERE sha256 = ?)",
+            (sha256, sha256)
+        )
+
+def _current_resume_sha256(conn, resume):
+    """
+    Returns the content hash of an indexed resume, rehashing (and updating the
+    index) only when the file's size or mtime no longer match what was recorded.
+    """
+    try:
+        st = os.stat(_resume_abspath(resume['stored_path']))
+    except OSError:
+        # File vanished; trust the index so cached text can still be served
+        return resume['sha256']
+    if resume['sha256'] and st.st_size == resume['size_bytes'] and st.st_mtime_ns == resume['mtime_ns']:
+        return resume['sha256']
+    sha256 = _sha256_file(_resume_abspath(resume['stored_path']))
+    conn.execute(
+        "UPDATE resumes SET sha256 = ?, size_bytes = ?, mtime_ns = ? WHERE app_id = ?",
+        (sha256, st.st_size, st.st_mtime_ns, resume['app_id'])
+    )
+    if sha256 != resume['sha256']:
+        _prune_resume_text_cache(conn, resume['sha256'])
+        # The persisted score was computed against the old file
+        invalidate_ats_score(conn, resume['app_id'])
+    conn.commit()
+    return sha256
+
+def get_resume_extraction(conn, resume):
+    """
+    Returns {'sha256', 'text', 'pages'} for an indexed PDF resume, where pages is a
+    list of {'page', 'start', 'end'} character offsets into text. Extraction runs
+    at most once per file content; later calls are served from resume_text_cache.
+    Returns None if the PDF could not be read.
+    """
+    sha256 = _current_resume_sha256(conn, resume)
+    cursor = conn.cursor()
+    cursor.execute("SELECT text, pages FROM resume_text_cache WHERE sha256 = ?", (sha256,))
+    cached = cursor.fetchone()
+    if cached:
+        return {'sha256': sha256, 'text': cached['text'], 'pages': json.loads(cached['pages'])}
+
+    if not PDF_EXTRACTION_AVAILABLE:
+        return None
+    file_path = _resume_abspath(resume['stored_path'])
+    try:
+        text, pages = _join_pdf_pages(_extract_pdf_pages(file_path))
+    except Exception as e:
+        print(f"Error extracting text from PDF {file_path}: {e}")
+        return None
+
+    store_resume_extraction(conn, sha256, text, pages)
+    conn.commit()
+    return {'sha256': sha256, 'text': text, 'pages': pages}
+
+def _join_pdf_pages(page_texts):
+    """
+    Joins (page_number, text) pairs the way extract_text_from_pdf does and
+    returns (text, pages) with each page's character offsets.
+    """
+    parts = []
+    pages = []
+    offset = 0
+    for number, text in page_texts:
+        if parts:
+            offset += 2
+        pages.append({'page': number, 'start': offset, 'end': offset + len(text)})
+        parts.append(text)
+        offset += len(text)
+    return "\n\n".join(parts), pages
+
+def store_resume_extraction(conn, sha256, text, pages):
+    """Caches extracted text for a content hash (caller commits)."""
+    conn.execute(
+        "INSERT OR REPLACE INTO resume_text_cache (sha256, extractor, text, pages, extracted_at) VALUES (?, ?, ?, ?, datetime('now'))",
+        (sha256, PDF_LIBRARY, text, json.dumps(pages))
+    )
+
+def backfill_resume_index():
+    """
+    One-time indexing of files already in the upload folder, named {app_id}_{original}.
+    Files whose application is unknown or that are already indexed are skipped.
+    Returns (indexed, skipped).
+    """
+    upload_folder = app.config['UPLOAD_FOLDER']
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT app_id FROM resumes")
+        indexed_ids = {r['app_id'] for r in cursor.fetchall()}
+        indexed = skipped = 0
+        with os.scandir(upload_folder) as entries:
+            for entry in entries:
+                if not entry.is_file() or '_' not in entry.name:
+                    skipped += 1
+                    continue
+                app_id = entry.name.split('_', 1)[0]
+                app_row = application_store.get_application(app_id) if app_id not in indexed_ids else None
+                if app_row is None:
+                    skipped += 1
+                    continue
+                uploaded_at = datetime.fromtimestamp(entry.stat().st_mtime, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+                register_resume(conn, app_id, entry.name, os.path.join(upload_folder, entry.name), uploaded_at)
+                refresh_ats_score(conn, app_id, app_row['job_title'], app_row['applicant_data'])
+                indexed_ids.add(app_id)
+                indexed += 1
+                if indexed % 500 == 0:
+                    conn.commit()
+        conn.commit()
+    finally:
+        conn.close()
+    return indexed, skipped
+
+@app.cli.command('backfill-resumes')
+def backfill_resumes_command():
+    """Index existing files in the upload folder: flask --app backend backfill-resumes"""
+    indexed, skipped = backfill_resume_index()
+    print(f"Indexed {indexed} resume file(s), skipped {skipped}.")
+
+
+# --- PERSISTED ATS SCORES ---
+
+def _ats_input_hash(applicant_data_json, resume):
+    """Fingerprint of everything a score depends on besides the scoring rules."""
+    digest = hashlib.sha256((applicant_data_json or '').encode('utf-8'))
+    if resume:
+        digest.update(f"|{resume['file_name']}|{resume['sha256']}".encode('utf-8'))
+    return digest.hexdigest()
+
+def refresh_ats_score(conn, app_id, job_title, applicant_data_json):
+    """
+    Scores one application and upserts the result into ats_scores.
+    Call this whenever the application data or the resume file changes.
+    Returns the stored score details dict.
+    """
+    applicant_data = json.loads(applicant_data_json) if applicant_data_json else {}
+    job_description = applicant_data.get('jobDescription', '')
+    resume = get_resume_record(conn, app_id)
+    file_name = resume['file_name'] if resume else None
+    file_path = resume['stored_path'] if resume else None
+
+    details = simulate_ats_scoring(job_title, job_description, applicant_data, file_path, file_name, return_details=True, app_id=app_id)
+    store_ats_score(conn, app_id, job_title, applicant_data_json, resume, details)
+    return details
+
+def store_ats_score(conn, app_id, job_title, applicant_data_json, resume, details, highlights=None, application_status=None):
+    """
+    Upserts already computed score details into ats_scores. Precomputed
+    highlights are kept only while the score inputs stay the same.
+    application_status is the invite status ('Open' when not invited); it is
+    looked up in the application store when not given.
+    """
+    file_name = resume['file_name'] if resume else None
+    # Listings rank applications without a resume at 0, as before
+    listing_score = details['score'] if file_name else 0
+    if application_status is None:
+        application_status = application_store.invite_statuses([app_id]).get(app_id) or 'Open'
+
+    conn.execute('''
+        INSERT INTO ats_scores (app_id, job_title, score, has_resume, resume_file, details, input_hash, scoring_version, scored_at, application_status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), ?)
+        ON CONFLICT(app_id) DO UPDATE SET
+            job_title=excluded.job_title,
+            application_status=excluded.application_status,
+            score=excluded.score,
+            has_resume=excluded.has_resume,
+            resume_file=excluded.resume_file,
+            details=excluded.details,
+            input_hash=excluded.input_hash,
+            scoring_version=excluded.scoring_version,
+            scored_at=excluded.scored_at,
+            highlights=CASE
+                WHEN ats_scores.input_hash = excluded.input_hash AND ats_scores.scoring_version = excluded.scoring_version
+                THEN ats_scores.highlights ELSE NULL END
+    ''', (app_id, job_title, listing_score, 1 if file_name else 0, file_name,
+          json.dumps(details), _ats_input_hash(applicant_data_json, resume), ATS_SCORE_ROW_VERSION, application_status))
+    if highlights is not None:
+        conn.execute("UPDATE ats_scores SET highlights = ? WHERE app_id = ?", (json.dumps(highlights), app_id))
+    conn.execute("DELETE FROM ats_score_pending WHERE app_id = ?", (app_id,))
+
+def invalidate_ats_score(conn, app_id):
+    """Drops the stored score of an application whose inputs changed and queues it for rescoring (caller commits)."""
+    conn.execute("DELETE FROM ats_scores WHERE app_id = ?", (app_id,))
+    conn.execute("INSERT OR IGNORE INTO ats_score_pending (app_id) VALUES (?)", (app_id,))
+
+def score_applications(rows, resumes):
+    """
+    Scores application rows (app_id, job_title, applicant_data) with score_batch,
+    one batch per distinct job title and description. resumes maps app_id to its
+    resume record or None. Returns {app_id: details}.
+    """
+    groups = {}
+    for row in rows:
+        applicant_data = json.loads(row['applicant_data']) if row['applicant_data'] else {}
+        resume = resumes.get(row['app_id'])
+        key = (row['job_title'], applicant_data.get('jobDescription', ''))
+        groups.setdefault(key, []).append({
+            'app_id': row['app_id'],
+            'applicant_data': applicant_data,
+            'resume_filename': resume['file_name'] if resume else None
+        })
+
+    details_by_id = {}
+    for (job_title, job_description), applicants in groups.items():
+        job = get_job_requirements(job_title, job_description)
+        for applicant, details in zip(applicants, score_batch(job, applicants, return_details=True)):
+            details_by_id[applicant['app_id']] = details
+    return details_by_id
+
+# Rows written this long before the last synced timestamp are read again, for
+# writes that committed after a later one (timestamps have one-second resolution)
+STORE_SYNC_OVERLAP_SECONDS = 60
+
+def _sync_state_since(conn, name):
+    """Returns the updated_at to read the application store from for sync_state name ('' before the first sync)."""
+    row = conn.execute("SELECT synced_until FROM sync_state WHERE name = ?", (name,)).fetchone()
+    if not row:
+        return ''
+    return (datetime.strptime(row['synced_until'], '%Y-%m-%d %H:%M:%S')
+            - timedelta(seconds=STORE_SYNC_OVERLAP_SECONDS)).strftime('%Y-%m-%d %H:%M:%S')
+
+def _advance_sync_state(conn, name, synced_until):
+    conn.execute(
+        "INSERT INTO sync_state (name, synced_until) VALUES (?, ?) "
+        "ON CONFLICT(name) DO UPDATE SET synced_until = MAX(synced_until, excluded.synced_until)",
+        (name, synced_until)
+    )
+
+def refresh_stale_ats_scores(conn):
+    """
+    Scores applications whose ats_scores row is missing, was scored with an
+    older ATS_SCORING_VERSION or jitter mode, or has an input_hash that no
+    longer matches the application and resume. Only candidates are checked,
+    all read through indexes: applications written since the last refresh
+    (applications.updated_at), ids queued in ats_score_pending and rows with
+    another scoring_version. Returns the number of rows recomputed.
+    """
+    changed = application_store.application_updates_since(_sync_state_since(conn, 'ats_scores'))
+    candidates = {r['app_id'] for r in changed}
+    candidates.update(r['app_id'] for r in conn.execute("SELECT app_id FROM ats_score_pending"))
+    candidates.update(r['app_id'] for r in conn.execute(
+        "SELECT app_id FROM ats_scores WHERE scoring_version != ?", (ATS_SCORE_ROW_VERSION,)))
+
+    stored_hashes = {}
+    ids = list(candidates)
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        stored_hashes.update((r['app_id'], r['input_hash']) for r in conn.execute(
+            f"SELECT app_id, input_hash FROM ats_scores WHERE app_id IN ({', '.join('?' * len(chunk))}) AND scoring_version = ?",
+            chunk + [ATS_SCORE_ROW_VERSION]
+        ))
+    rows = application_store.get_applications(candidates)
+    resumes = {row['app_id']: get_resume_record(conn, row['app_id']) for row in rows}
+    stale = [row for row in rows
+             if stored_hashes.get(row['app_id']) != _ats_input_hash(row['applicant_data'], resumes[row['app_id']])]
+    details_by_id = score_applications(stale, resumes)
+    statuses = application_store.invite_statuses(row['app_id'] for row in stale)
+    for row in stale:
+        store_ats_score(conn, row['app_id'], row['job_title'], row['applicant_data'], resumes[row['app_id']],
+                        details_by_id[row['app_id']], application_status=statuses.get(row['app_id']) or 'Open')
+    # Queued ids the application store does not know have nothing to score
+    gone = candidates - set(resumes)
+    conn.executemany("DELETE FROM ats_score_pending WHERE app_id = ?", [(app_id,) for app_id in gone])
+    if changed:
+        _advance_sync_state(conn, 'ats_scores', changed[-1]['updated_at'])
+    conn.commit()
+    return len(stale)
+
+def sync_ats_application_statuses(conn):
+    """
+    Copies invite status changes from the application store onto
+    ats_scores.application_status. Only invites written since the last sync are
+    read (indexed by invites.updated_at). Returns the number of invites read.
+    """
+    invites = application_store.invite_statuses_since(_sync_state_since(conn, 'invite_statuses'))
+    if not invites:
+        return 0
+    conn.executemany(
+        "UPDATE ats_scores SET application_status = ? WHERE app_id = ? AND application_status != ?",
+        [(r['application_status'] or 'Open', r['app_id'], r['application_status'] or 'Open') for r in invites]
+    )
+    _advance_sync_state(conn, 'invite_statuses', invites[-1]['updated_at'])
+    conn.commit()
+    return len(invites)
+
+def get_ats_score_details(conn, app_id, job_title, applicant_data_json):
+    """Returns persisted score details for app_id, rescoring first if the row is missing or stale."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT details, scoring_version FROM ats_scores WHERE app_id = ?", (app_id,))
+    row = cursor.fetchone()
+    if row and row['details'] and row['scoring_version'] == ATS_SCORE_ROW_VERSION:
+        return json.loads(row['details'])
+    details = refresh_ats_score(conn, app_id, job_title, applicant_data_json)
+    conn.commit()
+    return details
+
+def get_cached_highlights(conn, app_id, applicant_data_json, resume):
+    """Returns highlights precomputed by the job worker if they still match the current inputs, else None."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT highlights, input_hash, scoring_version FROM ats_scores WHERE app_id = ?", (app_id,))
+    row = cursor.fetchone()
+    if (row and row['highlights'] and row['scoring_version'] == ATS_SCORE_ROW_VERSION
+            and row['input_hash'] == _ats_input_hash(applicant_data_json, resume)):
+        highlights = json.loads(row['highlights'])
+        # Highlights stored before the section segmenter are recomputed
+        if 'sections' in highlights:
+            return highlights
+    return None
+
+
+# --- BACKGROUND JOB QUEUE ---
+# Jobs live in the jobs table so they survive restarts and can be picked up by
+# any worker process. Handlers raise to signal a retryable failure.
+
+JOB_HANDLERS = {}
+_job_wakeup = threading.Event()
+_job_workers_started = False
+_job_workers_lock = threading.Lock()
+
+def job_handler(kind):
+    """Registers a function as the handler for jobs of the given kind."""
+    def decorator(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return decorator
+
+def enqueue_job(conn, kind, app_id=None, payload=None, delay=0, max_attempts=None):
+    """Adds a job to the queue (caller commits). Returns the job id."""
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO jobs (kind, app_id, payload, status, attempts, max_attempts, run_after, created_at, updated_at)
+        VALUES (?, ?, ?, 'queued', 0, ?, ?, datetime('now'), datetime('now'))
+    ''', (kind, app_id, json.dumps(payload or {}), max_attempts or JOB_MAX_ATTEMPTS, time.time() + delay))
+    _job_wakeup.set()
+    return cursor.lastrowid
+
+def _claim_next_job():
+    """Atomically marks the next due job as running and returns it, or None."""
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        now = time.time()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT * FROM jobs
+            WHERE (status = 'queued' AND run_after <= ?)
+               OR (status = 'running' AND locked_at < ?)
+            ORDER BY run_after, id
+            LIMIT 1
+        ''', (now, now - JOB_LEASE_SECONDS))
+        job = cursor.fetchone()
+        if job is None:
+            conn.rollback()
+            return None
+        cursor.execute(
+            "UPDATE jobs SET status = 'running', attempts = attempts + 1, locked_at = ?, updated_at = datetime('now') WHERE id = ?",
+            (now, job['id'])
+        )
+        conn.commit()
+        job = dict(job)
+        job['attempts'] += 1
+        return job
+    finally:
+        conn.close()
+
+def _finish_job(job, error=None):
+    """Marks a job done, or schedules a retry with exponential backoff."""
+    conn = get_db_connection()
+    try:
+        if error is None:
+            conn.execute("UPDATE jobs SET status = 'done', last_error = NULL, updated_at = datetime('now') WHERE id = ?", (job['id'],))
+        elif job['attempts'] < job['max_attempts']:
+            retry_at = time.time() + JOB_RETRY_BASE_SECONDS * (2 ** (job['attempts'] - 1))
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', run_after = ?, last_error = ?, updated_at = datetime('now') WHERE id = ?",
+                (retry_at, str(error), job['id'])
+            )
+        else:
+            conn.execute("UPDATE jobs SET status = 'failed', last_error = ?, updated_at = datetime('now') WHERE id = ?", (str(error), job['id']))
+        conn.commit()
+    finally:
+        conn.close()
+
+def run_pending_jobs(limit=None):
+    """Runs due jobs in the calling thread until none are left (or limit is reached). Returns the count run."""
+    ran = 0
+    while limit is None or ran < limit:
+        job = _claim_next_job()
+        if job is None:
+            break
+        handler = JOB_HANDLERS.get(job['kind'])
+        try:
+            if handler is None:
+                raise RuntimeError(f"No handler registered for job kind '{job['kind']}'")
+            handler(job['app_id'], json.loads(job['payload'] or '{}'))
+            _finish_job(job)
+        except Exception as e:
+            print(f"Job {job['id']} ({job['kind']}) attempt {job['attempts']} failed: {e}")
+            _finish_job(job, e)
+        ran += 1
+    return ran
+
+def _job_worker_loop():
+    while True:
+        try:
+            if run_pending_jobs() == 0:
+                _job_wakeup.wait(JOB_POLL_SECONDS)
+                _job_wakeup.clear()
+        except Exception as e:
+            print(f"Job worker error: {e}")
+            time.sleep(JOB_POLL_SECONDS)
+
+def start_job_workers(count=None):
+    """
+    Starts the in-process worker threads once per process. Called by the
+    serving entry points (python backend.py, gunicorn.conf.py, run-workers),
+    never on import.
+    """
+    global _job_workers_started
+    count = JOB_WORKERS if count is None else count
+    with _job_workers_lock:
+        if _job_workers_started or count <= 0:
+            return
+        for i in range(count):
+            threading.Thread(target=_job_worker_loop, name=f"job-worker-{i}", daemon=True).start()
+        _job_workers_started = True
+
+@job_handler('process_resume')
+def _process_resume_job(app_id, payload):
+    """Extracts resume text, precomputes highlights and refreshes the ATS score for a new upload."""
+    conn = get_db_connection()
+    try:
+        row = application_store.get_application(app_id)
+        resume = get_resume_record(conn, app_id)
+        if row is None or resume is None:
+            return
+        refresh_ats_score(conn, app_id, row['job_title'], row['applicant_data'])
+        conn.commit()
+        if not resume['file_name'].lower().endswith('.pdf') or not PDF_EXTRACTION_AVAILABLE:
+            return
+        extraction = get_resume_extraction(conn, resume)
+        if extraction is None:
+            raise RuntimeError(f"Could not extract text from resume for {app_id}")
+        if not extraction['text']:
+            return
+        applicant_data = json.loads(row['applicant_data']) if row['applicant_data'] else {}
+        job_description = applicant_data.get('jobDescription', '')
+        highlights = find_highlighted_sections(extraction['text'], row['job_title'], job_description, applicant_data)
+        conn.execute(
+            "UPDATE ats_scores SET highlights = ? WHERE app_id = ? AND input_hash = ?",
+            (json.dumps(highlights), app_id, _ats_input_hash(row['applicant_data'], get_resume_record(conn, app_id)))
+        )
+        # Warm the highlighted view so the first recruiter to open it gets a cache hit
+        fragment_key = highlighted_fragment_key(extraction['sha256'], row['job_title'], job_description, applicant_data)
+        if get_highlighted_fragment(conn, fragment_key) is None:
+            store_highlighted_fragment(conn, fragment_key, extraction['sha256'],
+                                       *render_highlighted_fragment(extraction['text'], row['job_title'], job_description, highlights))
+        conn.commit()
+    finally:
+        conn.close()
+
+@job_handler('send_confirmation_email')
+def _send_confirmation_email_job(app_id, payload):
+    """Moves confirmation jobs queued before the email outbox existed into the outbox."""
+    if not _smtp_configured():
+        print("Email disabled or SMTP credentials missing; skipping confirmation email.")
+        return
+    conn = get_db_connection()
+    try:
+        enqueue_email(conn, build_confirmation_email(payload['email'], payload['name'], payload['job_title'], app_id),
+                      app_id, 'confirmation', f"{app_id}:confirmation")
+        conn.commit()
+    finally:
+        conn.close()
+
+@job_handler('gc_resume_blobs')
+def _gc_resume_blobs_job(app_id, payload):
+    """Removes resume blobs whose grace period has passed since their last reference went away."""
+    removed, freed = gc_resume_blobs()
+    if removed:
+        print(f"Removed {removed} unreferenced resume blob(s), freed {freed} bytes.")
+
+
+# --- BULK RESCORING ---
+# Re-extracts and rescores every stored application across a process pool,
+# e.g. after changing ATS_SCORING_VERSION. Progress is checkpointed in
+# rescore_runs after every chunk, so an interrupted run resumes where it stopped.
+# The pool uses the spawn start method: the caller may be a threaded server
+# process, whose locks a forked child would inherit in whatever state they are in.
+# POST /api/rescore only queues a bulk_rescore job; the run itself happens in
+# whichever process runs jobs (or in the rescore-all CLI command), and
+# rescore_runs.locked_at keeps two processes from working on the same run.
+
+def _rescore_task(task):
+    """
+    Pool worker: extracts (when no cached text is supplied) and highlights one
+    application. Runs in a child process and must not touch the database.
+    Scoring happens in the parent, batched per chunk.
+    """
+    app_id, job_title, applicant_data_json, file_path, file_name, cached_text = task
+    result = {'app_id': app_id, 'extraction': None, 'highlights': None, 'error': None}
+    try:
+        applicant_data = json.loads(applicant_data_json) if applicant_data_json else {}
+        job_description = applicant_data.get('jobDescription', '')
+        text = cached_text
+        if file_path and file_name.lower().endswith('.pdf') and PDF_EXTRACTION_AVAILABLE:
+            if text is None:
+                text, pages = _join_pdf_pages(_extract_pdf_pages(file_path))
+                result['extraction'] = {'text': text, 'pages': pages}
+            if text:
+                result['highlights'] = find_highlighted_sections(text, job_title, job_description, applicant_data)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+def create_rescore_run(reextract=False, conn=None):
+    """Creates a new queued rescore run covering all current applications. Returns its id."""
+    total = application_store.count_applications()
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO rescore_runs (status, reextract, total, started_at, updated_at) VALUES ('queued', ?, ?, datetime('now'), datetime('now'))",
+            (1 if reextract else 0, total)
+        )
+        if own_conn:
+            conn.commit()
+        return cursor.lastrowid
+    finally:
+        if own_conn:
+            conn.close()
+
+def _rescore_run_active(run):
+    """True while a run is queued or being worked on by a live process."""
+    if run['status'] == 'queued':
+        return True
+    return (run['status'] == 'running' and run['locked_at'] is not None
+            and run['locked_at'] >= time.time() - RESCORE_LEASE_SECONDS)
+
+def queue_rescore_run(reextract=False, restart=False, workers=None, chunk_size=RESCORE_CHUNK_SIZE):
+    """
+    Queues a bulk_rescore job for the latest unfinished run (or a new one when
+    there is none or restart is set). Returns (run, queued); queued is False
+    when a run is already queued or in progress, in any process.
+    """
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        run = conn.execute("SELECT * FROM rescore_runs ORDER BY id DESC LIMIT 1").fetchone()
+        if run and _rescore_run_active(run):
+            conn.rollback()
+            return dict(run), False
+        if run and run['status'] != 'done' and not restart:
+            run_id = run['id']
+            conn.execute("UPDATE rescore_runs SET status = 'queued', updated_at = datetime('now') WHERE id = ?", (run_id,))
+        else:
+            run_id = create_rescore_run(reextract, conn)
+        enqueue_job(conn, 'bulk_rescore', payload={'run_id': run_id, 'workers': workers, 'chunk_size': chunk_size})
+        conn.commit()
+    finally:
+        conn.close()
+    return get_rescore_run(run_id), True
+
+@job_handler('bulk_rescore')
+def _bulk_rescore_job(app_id, payload):
+    """Works through a rescore run queued by POST /api/rescore."""
+    if not run_bulk_rescore(payload['run_id'], workers=payload.get('workers'), chunk_size=payload.get('chunk_size') or RESCORE_CHUNK_SIZE):
+        print(f"Rescore run {payload['run_id']} is already being processed by another worker.")
+
+def get_rescore_run(run_id=None):
+    """Returns a rescore run as a dict (the latest one if run_id is None), or None."""
+    conn = get_db_connection()
+    try:
+        if run_id is None:
+            row = conn.execute("SELECT * FROM rescore_runs ORDER BY id DESC LIMIT 1").fetchone()
+        else:
+            row = conn.execute("SELECT * FROM rescore_runs WHERE id = ?", (run_id,)).fetchone()
+    finally:
+        conn.close()
+    return dict(row) if row else None
+
+def _claim_rescore_run(run_id):
+    """Marks a run as running in this process. Returns its row, or None when another live process holds it."""
+    conn = get_db_connection()
+    try:
+        run = conn.execute("SELECT * FROM rescore_runs WHERE id = ?", (run_id,)).fetchone()
+        if run is None:
+            raise ValueError(f"Unknown rescore run {run_id}")
+        now = time.time()
+        cursor = conn.execute(
+            "UPDATE rescore_runs SET status = 'running', locked_at = ?, updated_at = datetime('now') "
+            "WHERE id = ? AND (status != 'running' OR locked_at IS NULL OR locked_at < ?)",
+            (now, run_id, now - RESCORE_LEASE_SECONDS)
+        )
+        conn.commit()
+        return run if cursor.rowcount else None
+    finally:
+        conn.close()
+
+def run_bulk_rescore(run_id, workers=None, chunk_size=RESCORE_CHUNK_SIZE, progress=print):
+    """
+    Processes a rescore run chunk by chunk in app_id order, starting after the
+    run's checkpoint. Text already cached for a file's content hash is reused
+    unless the run was created with reextract. Returns False without doing
+    anything when another process is working on the run, else True.
+    """
+    run = _claim_rescore_run(run_id)
+    if run is None:
+        return False
+    last_app_id = run['last_app_id'] or ''
+    processed, failed = run['processed'], run['failed']
+
+    workers = workers or os.cpu_count() or 1
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            while True:
+                rows = application_store.list_applications(last_app_id, chunk_size)
+                if not rows:
+                    break
+
+                resumes = {}
+                tasks = []
+                for row in rows:
+                    resume = get_resume_record(conn, row['app_id'])
+                    cached_text = None
+                    file_path = file_name = None
+                    if resume:
+                        if _current_resume_sha256(conn, resume) != resume['sha256']:
+                            resume = get_resume_record(conn, row['app_id'])
+                        file_path = _resume_abspath(resume['stored_path'])
+                        file_name = resume['file_name']
+                        if not run['reextract']:
+                            cursor.execute("SELECT text FROM resume_text_cache WHERE sha256 = ?", (resume['sha256'],))
+                            hit = cursor.fetchone()
+                            cached_text = hit['text'] if hit else None
+                    resumes[row['app_id']] = resume
+                    tasks.append((row['app_id'], row['job_title'], row['applicant_data'], file_path, file_name, cached_text))
+
+                chunk_failed = 0
+                by_id = {r['app_id']: r for r in rows}
+                details_by_id = score_applications(rows, resumes)
+                statuses = application_store.invite_statuses(by_id)
+                for result in pool.map(_rescore_task, tasks, chunksize=max(1, len(tasks) // (workers * 4))):
+                    if result['error']:
+                        chunk_failed += 1
+                        print(f"Rescore of {result['app_id']} failed: {result['error']}")
+                        continue
+                    row = by_id[result['app_id']]
+                    resume = resumes[result['app_id']]
+                    if result['extraction'] is not None:
+                        store_resume_extraction(conn, resume['sha256'], result['extraction']['text'], result['extraction']['pages'])
+                    store_ats_score(conn, row['app_id'], row['job_title'], row['applicant_data'], resume, details_by_id[row['app_id']],
+                                    result['highlights'], statuses.get(row['app_id']) or 'Open')
+
+                last_app_id = rows[-1]['app_id']
+                processed += len(rows)
+                failed += chunk_failed
+                cursor.execute(
+                    "UPDATE rescore_runs SET processed = ?, failed = ?, last_app_id = ?, locked_at = ?, updated_at = datetime('now') WHERE id = ?",
+                    (processed, failed, last_app_id, time.time(), run_id)
+                )
+                conn.commit()
+                progress(f"Rescore run {run_id}: {processed}/{run['total']} processed, {failed} failed")
+
+        cursor.execute("UPDATE rescore_runs SET status = 'done', locked_at = NULL, finished_at = datetime('now'), updated_at = datetime('now') WHERE id = ?", (run_id,))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        cursor.execute("UPDATE rescore_runs SET status = 'failed', locked_at = NULL, last_error = ?, updated_at = datetime('now') WHERE id = ?", (str(e), run_id))
+        conn.commit()
+        raise
+    finally:
+        conn.close()
+    return True
+
+@app.cli.command('rescore-all')
+@click.option('--workers', type=int, default=None, help='Pool processes (default: CPU count).')
+@click.option('--chunk-size', type=int, default=RESCORE_CHUNK_SIZE, help='Applications per checkpointed chunk.')
+@click.option('--reextract', is_flag=True, help='Ignore cached resume text and run PDF extraction again.')
+@click.option('--restart', is_flag=True, help='Start a new run instead of resuming an unfinished one.')
+def rescore_all_command(workers, chunk_size, reextract, restart):
+    """Re-extract and rescore all applications: flask --app backend rescore-all"""
+    run = get_rescore_run()
+    if run and run['status'] != 'done' and not restart:
+        run_id = run['id']
+        print(f"Resuming rescore run {run_id} after {run['last_app_id'] or 'start'} ({run['processed']}/{run['total']})")
+    else:
+        run_id = create_rescore_run(reextract)
+        print(f"Started rescore run {run_id}")
+    if not run_bulk_rescore(run_id, workers=workers, chunk_size=chunk_size):
+        raise click.ClickException(f"Rescore run {run_id} is already being processed by another process.")
+    print(f"Rescore run {run_id} complete.")
+
+@app.cli.command('run-workers')
+@click.option('--jobs', type=int, default=None, help='Job worker threads (default: JOB_WORKERS).')
+@click.option('--emails', type=int, default=None, help='Email outbox threads (default: EMAIL_WORKERS).')
+def run_workers_command(jobs, emails):
+    """Run background job and email workers without serving HTTP: flask --app backend run-workers"""
+    jobs = JOB_WORKERS if jobs is None else jobs
+    emails = EMAIL_WORKERS if emails is None else emails
+    if jobs <= 0 and emails <= 0:
+        raise click.UsageError('Nothing to run: --jobs and --emails are both 0.')
+    start_job_workers(jobs)
+    start_email_workers(emails)
+    print(f"Running {jobs} job worker(s) and {emails} email worker(s); Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
 # --- API ENDPOINTS ---
 
 @app.route('/api/save_details', methods=['POST'])
@@ -755,14 +3406,14 @@ def save_details():
         data_json = json.dumps(data)
         
         # Save to database
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO applications (app_id, job_title, applicant_data) VALUES (?, ?, ?)",
-            (app_id, job_title, data_json)
-        )
+        application_store.create_application(app_id, job_title, data)
+        conn = get_request_db()
+        refresh_ats_score(conn, app_id, job_title, data_json)
         conn.commit()
-        conn.close()
+        try:
+            mark_export_dirty()
+        except Exception as _e:
+            print(f"Warning: failed to schedule Excel rebuild for {app_id}: {_e}")
         
         print(f"Details saved to DB for Application ID: {app_id}")
         return jsonify({'status': 'success', 'application_id': app_id}), 200
@@ -772,13 +3423,8 @@ def save_details():
 
 @app.route('/api/get_application/<app_id>', methods=['GET'])
 def get_application(app_id):
-    """Retrieves structured application data from the SQLite database."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT applicant_data FROM applications WHERE app_id = ?", (app_id,))
-    row = cursor.fetchone()
-    conn.close()
+    """Retrieves structured application data from the application store."""
+    row = application_store.get_application(app_id)
 
     if row is None:
         return jsonify({'status': 'error', 'message': 'Application ID not found in database.'}), 404
@@ -792,52 +3438,442 @@ def get_application(app_id):
 
 @app.route('/api/submit_application/<app_id>', methods=['POST'])
 def submit_application(app_id):
-    """Receives the final file upload and triggers the email confirmation."""
+    """
+    Receives the final file upload and queues background processing: text
+    extraction, highlights, ATS scoring and the confirmation email.
+    """
     
     # 1. Retrieve saved applicant data from DB
+    row = application_store.get_application(app_id)
+
+    if row is None:
+        return jsonify({'status': 'error', 'message': 'Application ID not found.'}), 404
+        
+    applicant_data = json.loads(row['applicant_data'])
+
+    # 2. Handle File Upload
+    if 'resume' not in request.files:
+        return jsonify({'status': 'error', 'message': 'No file part in the request.'}), 400
+
+    file = request.files['resume']
+
+    if not (file and allowed_file(file.filename)):
+        return jsonify({'status': 'error', 'message': 'File type not allowed.'}), 400
+    upload = file.stream
+    if upload.mime_type != _resume_mimetype(file.filename):
+        return jsonify({'status': 'error', 'message': 'File content does not match its type.'}), 400
+
+    # 3. Store the streamed upload (already hashed while it arrived), index it
+    #    and queue the processing and confirmation jobs
+    filename = _upload_name(app_id, file.filename)
+    try:
+        email_queued = finalize_resume_upload(app_id, applicant_data, filename, upload.commit(), upload.sha256)
+    except Exception as e:
+        print(f"Error saving resume for {app_id}: {e}")
+        return jsonify({'status': 'error', 'message': 'Failed to save resume. Please try again.'}), 500
+
+    # 4. Final response
+    return jsonify({
+        'status': 'complete', 
+        'message': 'Application and resume saved successfully.',
+        'email_queued': email_queued,
+        'application_id': app_id
+    }), 200
+
+
+# --- STREAMING UPLOADS ---
+# Multipart file parts are written straight into UPLOAD_TMP_FOLDER in the chunks
+# Werkzeug reads off the socket, hashed and sniffed on the way, and renamed into
+# place once accepted, so a resume is never spooled and copied a second time.
+# Bodies over MAX_CONTENT_LENGTH are refused before a byte is read; parts without
+# a Content-Length are cut off as soon as they pass RESUME_MAX_BYTES.
+
+UPLOAD_CHUNK_BYTES = 64 * 1024
+# Leading bytes that identify each accepted resume type
+RESUME_SIGNATURES = (
+    (b'%PDF-', 'application/pdf'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+)
+
+def sniff_resume_mimetype(head):
+    """Returns the mimetype implied by a file's first bytes, or None if it is not an accepted type."""
+    for signature, mime_type in RESUME_SIGNATURES:
+        if head.startswith(signature):
+            return mime_type
+    return None
+
+def _upload_name(app_id, file_name):
+    """Filename a resume is indexed (and downloaded) under."""
+    safe_name = secure_filename(file_name or '')
+    if not safe_name or '.' not in safe_name:
+        safe_name = f"resume.{file_name.rsplit('.', 1)[-1].lower()}"
+    return f"{app_id}_{safe_name}"
+
+class ResumeUploadFile:
+    """
+    Temporary file in UPLOAD_TMP_FOLDER that tracks size, sha256 and the leading
+    bytes as it is written. commit() keeps it for the blob store to move into
+    place; close() without a commit deletes it.
+    """
+
+    def __init__(self, max_bytes=RESUME_MAX_BYTES):
+        fd, self.temp_path = tempfile.mkstemp(dir=UPLOAD_TMP_FOLDER, suffix='.part')
+        self._fh = os.fdopen(fd, 'w+b')
+        self._digest = hashlib.sha256()
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.head = b''
+        self.committed = False
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise RequestEntityTooLarge(f"Resume exceeds the {self.max_bytes} byte limit.")
+        if len(self.head) < 16:
+            self.head += bytes(data[:16 - len(self.head)])
+        self._digest.update(data)
+        return self._fh.write(data)
+
+    def __getattr__(self, name):
+        # read/seek/tell/flush for the multipart parser and FileStorage
+        return getattr(self._fh, name)
+
+    @property
+    def sha256(self):
+        return self._digest.hexdigest()
+
+    @property
+    def mime_type(self):
+        return sniff_resume_mimetype(self.head)
+
+    def commit(self):
+        """Flushes the upload to disk and hands over temp_path (close() no longer deletes it)."""
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._fh.close()
+        self.committed = True
+        return self.temp_path
+
+    def close(self):
+        self._fh.close()
+        if not self.committed:
+            try:
+                os.remove(self.temp_path)
+            except OSError:
+                pass
+
+class StreamingUploadRequest(Request):
+    """Request whose multipart file parts stream into ResumeUploadFile instead of a spooled temp file."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        upload = ResumeUploadFile()
+        # Kept here too so a part aborted mid-parse (413) is still cleaned up in close()
+        self.__dict__.setdefault('_resume_uploads', []).append(upload)
+        return upload
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            for upload in self.__dict__.pop('_resume_uploads', []):
+                upload.close()
+
+app.request_class = StreamingUploadRequest
+
+@app.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    return jsonify({'status': 'error', 'message': f'File too large. Resumes are limited to {RESUME_MAX_BYTES // (1024 * 1024)} MB.'}), 413
+
+def finalize_resume_upload(app_id, applicant_data, filename, file_path, sha256):
+    """
+    Moves a fully received upload into the blob store, indexes it and queues text
+    extraction, rescoring and the confirmation email in one transaction.
+    Returns whether an email was queued; raises if the resume could not be stored.
+    """
+    applicant_email = applicant_data.get('communication', {}).get('email')
+    applicant_name = applicant_data.get('personal', {}).get('firstName', 'Applicant')
+    job_title = applicant_data.get('jobTitle', 'Unknown Job')
+
+    email_queued = False
     conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT applicant_data FROM applications WHERE app_id = ?", (app_id,))
-    row = cursor.fetchone()
-    conn.close()
+    try:
+        register_resume(conn, app_id, filename, file_path, sha256=sha256)
+        # Resume changed: the stored score is stale until the worker rescores it
+        invalidate_ats_score(conn, app_id)
+        enqueue_job(conn, 'process_resume', app_id)
+        if applicant_email and _smtp_configured():
+            enqueue_email(conn, build_confirmation_email(applicant_email, applicant_name, job_title, app_id),
+                          app_id, 'confirmation', f"{app_id}:confirmation")
+            email_queued = True
+        conn.commit()
+    except Exception:
+        # Nothing was recorded; drop the upload if it was not moved into the store yet
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+        raise
+    finally:
+        conn.close()
+    return email_queued
+
+
+# --- RESUMABLE UPLOADS ---
+# init/append/complete for clients on flaky connections: POST /api/uploads opens a
+# session, PATCH appends raw bytes at the Upload-Offset the server reports (bytes
+# that arrived before a dropped connection are kept), and complete verifies the
+# file and hands it to the same path as a single-request upload. Appends can land
+# on any worker, so the hash is computed once at completion rather than per chunk.
+
+def _upload_session_path(upload_id):
+    return os.path.join(UPLOAD_TMP_FOLDER, f"{upload_id}.part")
+
+def _get_upload_session(conn, upload_id):
+    return conn.execute("SELECT * FROM upload_sessions WHERE id = ?", (upload_id,)).fetchone()
+
+def _upload_session_json(session):
+    return {
+        'upload_id': session['id'],
+        'application_id': session['app_id'],
+        'offset': session['received_bytes'],
+        'size': session['total_bytes'],
+        'complete': session['received_bytes'] >= session['total_bytes'],
+    }
 
-    if row is None:
+def purge_stale_uploads(conn):
+    """Drops upload sessions idle past UPLOAD_SESSION_TTL_SECONDS and stray partial files."""
+    cutoff = time.time() - UPLOAD_SESSION_TTL_SECONDS
+    conn.execute("DELETE FROM upload_sessions WHERE updated_at < datetime(?, 'unixepoch')", (int(cutoff),))
+    for entry in os.scandir(UPLOAD_TMP_FOLDER):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+@app.route('/api/uploads', methods=['POST'])
+def create_upload_session():
+    """Opens a resumable upload. Body: {app_id, file_name, size}."""
+    data = request.get_json(silent=True) or {}
+    app_id = data.get('app_id')
+    file_name = data.get('file_name') or ''
+    try:
+        size = int(data.get('size'))
+    except (TypeError, ValueError):
+        return jsonify({'status': 'error', 'message': 'size (bytes) is required.'}), 400
+
+    if not app_id or application_store.get_application(app_id) is None:
         return jsonify({'status': 'error', 'message': 'Application ID not found.'}), 404
-        
-    applicant_data = json.loads(row['applicant_data'])
+    if not allowed_file(file_name):
+        return jsonify({'status': 'error', 'message': 'File type not allowed.'}), 400
+    if size <= 0 or size > RESUME_MAX_BYTES:
+        return jsonify({'status': 'error', 'message': f'File too large. Resumes are limited to {RESUME_MAX_BYTES // (1024 * 1024)} MB.'}), 413
+
+    upload_id = base64.urlsafe_b64encode(os.urandom(18)).decode('ascii')
+    conn = get_request_db()
+    purge_stale_uploads(conn)
+    open(_upload_session_path(upload_id), 'wb').close()
+    conn.execute(
+        "INSERT INTO upload_sessions (id, app_id, file_name, total_bytes) VALUES (?, ?, ?, ?)",
+        (upload_id, app_id, file_name, size)
+    )
+    conn.commit()
+    session = _get_upload_session(conn, upload_id)
+    return jsonify({'status': 'success', **_upload_session_json(session)}), 201
 
-    # 2. Handle File Upload
-    if 'resume' not in request.files:
-        return jsonify({'status': 'error', 'message': 'No file part in the request.'}), 400
+@app.route('/api/uploads/<upload_id>', methods=['GET', 'PATCH', 'DELETE'])
+def upload_session(upload_id):
+    """
+    GET reports the committed offset. PATCH appends the raw request body at the
+    Upload-Offset header (which must equal the committed offset). DELETE aborts.
+    """
+    conn = get_request_db()
+    session = _get_upload_session(conn, upload_id)
+    if session is None:
+        return jsonify({'status': 'error', 'message': 'Upload not found or expired.'}), 404
 
-    file = request.files['resume']
-    
-    if file and allowed_file(file.filename):
-        filename = f"{app_id}_{file.filename}"
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
-    else:
-        return jsonify({'status': 'error', 'message': 'File type not allowed.'}), 400
+    if request.method == 'GET':
+        return jsonify({'status': 'success', **_upload_session_json(session)}), 200, {'Upload-Offset': str(session['received_bytes'])}
 
-    # 3. Extract necessary details for the email
-    applicant_email = applicant_data.get('communication', {}).get('email')
-    applicant_name = applicant_data.get('personal', {}).get('firstName', 'Applicant')
-    job_title = applicant_data.get('jobTitle', 'Unknown Job')
-    
-    # 4. Trigger Email Confirmation
-    email_success = False
-    if applicant_email:
-        email_success = send_confirmation_email(applicant_email, applicant_name, job_title, app_id)
+    part_path = _upload_session_path(upload_id)
+    if request.method == 'DELETE':
+        conn.execute("DELETE FROM upload_sessions WHERE id = ?", (upload_id,))
+        conn.commit()
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
+        return jsonify({'status': 'success', 'message': 'Upload aborted.'}), 200
+
+    offset = request.headers.get('Upload-Offset', request.args.get('offset'))
+    if offset is None or not str(offset).isdigit():
+        return jsonify({'status': 'error', 'message': 'Upload-Offset header is required.'}), 400
+    offset = int(offset)
+    if offset != session['received_bytes']:
+        return jsonify({'status': 'error', 'message': 'Offset does not match the uploaded size.', **_upload_session_json(session)}), 409, {'Upload-Offset': str(session['received_bytes'])}
+
+    remaining = session['total_bytes'] - offset
+    written = 0
+    too_large = False
+    with open(part_path, 'r+b') as fh:
+        # Drop any bytes past the committed offset left by an interrupted append
+        fh.seek(offset)
+        fh.truncate()
+        try:
+            for chunk in iter(lambda: request.stream.read(UPLOAD_CHUNK_BYTES), b''):
+                if written + len(chunk) > remaining:
+                    too_large = True
+                    break
+                fh.write(chunk)
+                written += len(chunk)
+        except ClientDisconnected:
+            print(f"Upload {upload_id} disconnected after {written} bytes; keeping them for resume.")
+        if too_large:
+            fh.seek(offset)
+            fh.truncate()
+            written = 0
+        fh.flush()
+        os.fsync(fh.fileno())
+
+    cursor = conn.execute(
+        "UPDATE upload_sessions SET received_bytes = ?, updated_at = datetime('now') WHERE id = ? AND received_bytes = ?",
+        (offset + written, upload_id, offset)
+    )
+    conn.commit()
+    if cursor.rowcount == 0:
+        return jsonify({'status': 'error', 'message': 'Concurrent append to the same upload.'}), 409
+    if too_large:
+        return jsonify({'status': 'error', 'message': 'Chunk runs past the declared upload size.'}), 413
+    session = _get_upload_session(conn, upload_id)
+    return jsonify({'status': 'success', **_upload_session_json(session)}), 200, {'Upload-Offset': str(session['received_bytes'])}
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+def complete_upload_session(upload_id):
+    """
+    Verifies a fully uploaded file (type, and the optional sha256 the client sends)
+    and submits it as the application's resume, exactly like /api/submit_application.
+    """
+    data = request.get_json(silent=True) or {}
+    conn = get_request_db()
+    session = _get_upload_session(conn, upload_id)
+    if session is None:
+        return jsonify({'status': 'error', 'message': 'Upload not found or expired.'}), 404
+    if session['received_bytes'] < session['total_bytes']:
+        return jsonify({'status': 'error', 'message': 'Upload is incomplete.', **_upload_session_json(session)}), 409
+
+    row = application_store.get_application(session['app_id'])
+    if row is None:
+        return jsonify({'status': 'error', 'message': 'Application ID not found.'}), 404
 
-    # 5. Final response
+    part_path = _upload_session_path(upload_id)
+    try:
+        with open(part_path, 'rb') as fh:
+            head = fh.read(16)
+        sha256 = _sha256_file(part_path)
+    except OSError:
+        return jsonify({'status': 'error', 'message': 'Upload data is missing; please start again.'}), 410
+    if data.get('sha256') and data['sha256'].lower() != sha256:
+        return jsonify({'status': 'error', 'message': 'Checksum mismatch; please upload the file again.'}), 422
+    if sniff_resume_mimetype(head) != _resume_mimetype(session['file_name']):
+        return jsonify({'status': 'error', 'message': 'File content does not match its type.'}), 400
+
+    app_id = session['app_id']
+    filename = _upload_name(app_id, session['file_name'])
+    try:
+        email_queued = finalize_resume_upload(app_id, json.loads(row['applicant_data']), filename, part_path, sha256)
+    except Exception as e:
+        print(f"Error saving resume for {app_id}: {e}")
+        return jsonify({'status': 'error', 'message': 'Failed to save resume. Please try again.'}), 500
+    conn.execute("DELETE FROM upload_sessions WHERE id = ?", (upload_id,))
+    conn.commit()
     return jsonify({
-        'status': 'complete', 
+        'status': 'complete',
         'message': 'Application and resume saved successfully.',
-        'email_sent': email_success,
+        'email_queued': email_queued,
         'application_id': app_id
     }), 200
 
 
+# --- EXCEL EXPORT ---
+# The workbook is streamed row by row into openpyxl's write-only mode, so memory
+# stays flat however many applications exist. Edits bump export_state.version
+# and queue a debounced rebuild_excel job; the download only rebuilds inline
+# when the file on disk is older than the latest edit.
+
+# Form fields per applicant_data section, in export column order (see consent.html)
+EXPORT_SECTION_FIELDS = (
+    ('personal', ('firstName', 'middleName', 'lastName', 'dob', 'gender', 'bloodGroup', 'maritalStatus', 'smokerStatus')),
+    ('communication', ('email', 'altEmail', 'phone', 'altPhone', 'tempAddress', 'permAddress')),
+    ('financial', ('pan', 'aadhaar', 'bankName', 'accountNumber', 'ifscCode')),
+    ('onboarding', ('address', 'laptopType', 'assetAcknowledgement')),
+)
+EXPORT_INVITE_COLUMNS = (
+    ('Recruiter', 'recruiter', ''),
+    ('Interviewer', 'interviewer', ''),
+    ('Source', 'invite_source', ''),
+    ('Phone_Status', 'phone_status', 'Pending'),
+    ('Inperson_Status', 'inperson_status', 'Pending'),
+    ('Application_Status', 'application_status', 'Open'),
+    ('Invited_At', 'invited_at', ''),
+    ('Rsvp_Status', 'rsvp_status', 'Pending'),
+)
+# Column headers: fields outside EXPORT_SECTION_FIELDS are kept as JSON in Other_Fields
+EXPORT_COLUMNS = (
+    ['App_ID', 'Job_Title']
+    + [f"{section.capitalize()}_{key.capitalize()}" for section, keys in EXPORT_SECTION_FIELDS for key in keys]
+    + ['Education_Summary', 'Work_Experience_Summary', 'Other_Fields']
+    + [name for name, _, _ in EXPORT_INVITE_COLUMNS]
+)
+EXPORT_SHEETS = ('All Applications', 'Shortlisted', 'No go', 'Selected', 'Rejected (Final)')
+
+_excel_build_lock = threading.Lock()
+
+def _norm_stage(s):
+    val = (s or '').strip().lower()
+    if val in ('no go', 'nogo', 'no-go'): return 'No go'
+    if val == 'go': return 'Go'
+    return 'Pending'
+
+def _norm_final(s):
+    val = (s or '').strip().lower()
+    if val == 'selected': return 'Selected'
+    if val == 'rejected': return 'Rejected'
+    return (s or 'Open')
+
+def export_row(row):
+    """Flattens an iter_export_rows() row into a dict keyed by EXPORT_COLUMNS."""
+    try:
+        applicant_data = json.loads(row['applicant_data']) if row['applicant_data'] else {}
+    except json.JSONDecodeError:
+        applicant_data = {}
+    flat_row = flatten_application_data(applicant_data, row['app_id'])
+    flat_row['Job_Title'] = row['job_title']
+    for name, column, default in EXPORT_INVITE_COLUMNS:
+        flat_row[name] = row[column] or default
+    other = {k: v for k, v in flat_row.items() if k not in EXPORT_COLUMNS}
+    flat_row['Other_Fields'] = json.dumps(other, default=str) if other else ''
+    return flat_row
+
+def _export_sheets_for(flat_row):
+    """Names of the EXPORT_SHEETS a flattened row belongs on."""
+    sheets = ['All Applications']
+    stages = (_norm_stage(flat_row['Phone_Status']), _norm_stage(flat_row['Inperson_Status']))
+    if 'Go' in stages:
+        sheets.append('Shortlisted')
+    if 'No go' in stages:
+        sheets.append('No go')
+    final = _norm_final(flat_row['Application_Status'])
+    if final == 'Selected':
+        sheets.append('Selected')
+    elif final == 'Rejected':
+        sheets.append('Rejected (Final)')
+    return sheets
+
+def _excel_cell(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return json.dumps(value, default=str)
+
 def _generate_and_write_excel():
     """
     Internal: Regenerates the Excel workbook with multiple sheets from DB state.
@@ -847,111 +3883,109 @@ def _generate_and_write_excel():
       - No go (any interview status marked "No go")
       - Selected (Application_Status == "Selected")
       - Rejected (Final) (Application_Status == "Rejected")
+    All sheets are filled in a single pass over the applications. The file is
+    written next to EXCEL_FILE and moved into place when complete.
     Returns absolute excel_path on success, raises on error.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    if not application_store.count_applications():
+        raise RuntimeError('No applications found in the database.')
 
-    # Fetch applications
-    cursor.execute("SELECT app_id, job_title, applicant_data FROM applications")
-    all_rows = cursor.fetchall()
-
-    # Fetch invites (statuses)
-    invites_map = {}
-    try:
-        c2 = conn.cursor()
-        c2.execute("SELECT app_id, phone_status, inperson_status, recruiter, interviewer, source, application_status, invited_at, rsvp_status FROM invites")
-        for r in c2.fetchall():
-            invites_map[r['app_id']] = {
-                'Recruiter': r['recruiter'] or '',
-                'Interviewer': r['interviewer'] or '',
-                'Source': r['source'] or '',
-                'Phone_Status': r['phone_status'] or 'Pending',
-                'Inperson_Status': r['inperson_status'] or 'Pending',
-                'Application_Status': r['application_status'] or 'Open',
-                'Invited_At': r['invited_at'] or '',
-                'Rsvp_Status': r['rsvp_status'] or 'Pending'
-            }
-    except Exception:
-        invites_map = {}
+    excel_path = os.path.join(os.getcwd(), EXCEL_FILE)
+    tmp_path = f"{excel_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    workbook = openpyxl.Workbook(write_only=True)
+    sheets = {name: workbook.create_sheet(name) for name in EXPORT_SHEETS}
+    for sheet in sheets.values():
+        sheet.append(EXPORT_COLUMNS)
+
+    try:
+        for row in application_store.iter_export_rows():
+            flat_row = export_row(row)
+            values = [_excel_cell(flat_row.get(column)) for column in EXPORT_COLUMNS]
+            for name in _export_sheets_for(flat_row):
+                sheets[name].append(values)
+        workbook.save(tmp_path)
+        os.replace(tmp_path, excel_path)
     finally:
-        conn.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return excel_path
 
-    if not all_rows:
-        raise RuntimeError('No applications found in the database.')
+def mark_export_dirty():
+    """
+    Records that the export no longer matches the database and (re)schedules a
+    rebuild EXCEL_REBUILD_DELAY_SECONDS from now, so a burst of edits costs one
+    rebuild. The rebuild is never pushed past EXCEL_REBUILD_MAX_WAIT_SECONDS
+    after the first edit it has not picked up yet.
+    """
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        now = time.time()
+        conn.execute(
+            "UPDATE export_state SET version = version + 1, dirty_since = COALESCE(dirty_since, ?) WHERE name = 'excel'",
+            (now,)
+        )
+        dirty_since = conn.execute("SELECT dirty_since FROM export_state WHERE name = 'excel'").fetchone()['dirty_since']
+        run_after = min(now + EXCEL_REBUILD_DELAY_SECONDS, dirty_since + EXCEL_REBUILD_MAX_WAIT_SECONDS)
+        cursor = conn.execute(
+            "UPDATE jobs SET run_after = ?, updated_at = datetime('now') WHERE kind = 'rebuild_excel' AND status = 'queued'",
+            (run_after,)
+        )
+        if cursor.rowcount == 0:
+            enqueue_job(conn, 'rebuild_excel', delay=run_after - now)
+        conn.commit()
+    finally:
+        conn.close()
 
-    # Process data
-    flattened_data_list = []
-    for row in all_rows:
-        app_id = row['app_id']
-        applicant_data = json.loads(row['applicant_data']) if row['applicant_data'] else {}
-        flat_row = flatten_application_data(applicant_data, app_id)
-        # Enrich with job title and schedule/invite statuses
-        flat_row['Job_Title'] = row['job_title']
-        invite = invites_map.get(app_id, {})
-        flat_row.update({
-            'Recruiter': invite.get('Recruiter', ''),
-            'Interviewer': invite.get('Interviewer', ''),
-            'Source': invite.get('Source', ''),
-            'Phone_Status': invite.get('Phone_Status', 'Pending'),
-            'Inperson_Status': invite.get('Inperson_Status', 'Pending'),
-            'Application_Status': invite.get('Application_Status', 'Open'),
-            'Invited_At': invite.get('Invited_At', ''),
-            'Rsvp_Status': invite.get('Rsvp_Status', 'Pending')
-        })
-        flattened_data_list.append(flat_row)
-
-    # Create DataFrames
-    df_all = pd.DataFrame(flattened_data_list)
-
-    # Helpers to normalize status strings
-    def _norm_stage(s):
-        val = (s or '').strip().lower()
-        if val in ('no go', 'nogo', 'no-go'): return 'No go'
-        if val == 'go': return 'Go'
-        return 'Pending'
-
-    def _norm_final(s):
-        val = (s or '').strip().lower()
-        if val == 'selected': return 'Selected'
-        if val == 'rejected': return 'Rejected'
-        return (s or 'Open')
-
-    # Shortlisted by stage statuses
-    df_shortlisted = df_all[
-        (df_all['Phone_Status'].apply(_norm_stage) == 'Go') |
-        (df_all['Inperson_Status'].apply(_norm_stage) == 'Go')
-    ].copy()
-
-    # No-go by stage statuses
-    df_nogo = df_all[
-        (df_all['Phone_Status'].apply(_norm_stage) == 'No go') |
-        (df_all['Inperson_Status'].apply(_norm_stage) == 'No go')
-    ].copy()
-
-    # Final outcomes from Application_Status
-    df_selected = df_all[df_all['Application_Status'].apply(_norm_final) == 'Selected'].copy()
-    df_rejected_final = df_all[df_all['Application_Status'].apply(_norm_final) == 'Rejected'].copy()
-
-    # Write workbook
+def rebuild_excel_export(force=False):
+    """
+    Rebuilds the workbook unless it is already current (or force is set).
+    Returns the absolute excel_path.
+    """
     excel_path = os.path.join(os.getcwd(), EXCEL_FILE)
-    with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-        df_all.to_excel(writer, index=False, sheet_name='All Applications')
-        df_shortlisted.to_excel(writer, index=False, sheet_name='Shortlisted')
-        df_nogo.to_excel(writer, index=False, sheet_name='No go')
-        df_selected.to_excel(writer, index=False, sheet_name='Selected')
-        df_rejected_final.to_excel(writer, index=False, sheet_name='Rejected (Final)')
-
+    with _excel_build_lock:
+        conn = get_db_connection()
+        try:
+            state = conn.execute("SELECT version, built_version FROM export_state WHERE name = 'excel'").fetchone()
+            if force or state['built_version'] < state['version'] or not os.path.exists(excel_path):
+                # This build covers every edit so far; later edits start a new max-wait window
+                conn.execute("UPDATE export_state SET dirty_since = NULL WHERE name = 'excel'")
+                conn.commit()
+        finally:
+            conn.close()
+        if not force and state['built_version'] >= state['version'] and os.path.exists(excel_path):
+            return excel_path
+        _generate_and_write_excel()
+        conn = get_db_connection()
+        try:
+            # Edits made during the build bumped version past what was read, so they stay dirty
+            conn.execute(
+                "UPDATE export_state SET built_version = MAX(built_version, ?), built_at = datetime('now') WHERE name = 'excel'",
+                (state['version'],)
+            )
+            conn.commit()
+        finally:
+            conn.close()
     return excel_path
 
+@job_handler('rebuild_excel')
+def _rebuild_excel_job(app_id, payload):
+    """Rebuilds the Excel export after edits have settled."""
+    try:
+        rebuild_excel_export()
+    except RuntimeError as e:
+        # Nothing to export yet; the next edit schedules another rebuild
+        print(f"Skipping Excel rebuild: {e}")
+
 
 @app.route('/api/export_to_excel', methods=['GET'])
 def export_to_excel():
     """
-    Regenerates and downloads the Excel file with all sheets. Always current.
+    Downloads the Excel file with all sheets, rebuilding it first if any edit
+    happened since the last build. Always current.
     """
     try:
-        excel_path = _generate_and_write_excel()
+        excel_path = rebuild_excel_export()
         return send_file(
             excel_path,
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
@@ -963,6 +3997,138 @@ def export_to_excel():
         return jsonify({'status': 'error', 'message': f'Failed to generate Excel file: {str(e)}'}), 500
 
 
+# --- CSV / PARQUET EXPORT ---
+# Same rows as the Excel export, streamed for analytics syncs. filter picks one
+# of the Excel sheets; updated_since (ISO 8601, UTC when no offset is given)
+# limits the export to applications or invites written since then. Deleted
+# rows are not reported. X-Export-As-Of is the value to pass as updated_since
+# on the next sync.
+
+EXPORT_FILTERS = {
+    'shortlisted': 'Shortlisted',
+    'no_go': 'No go',
+    'selected': 'Selected',
+    'rejected': 'Rejected (Final)',
+}
+STREAM_EXPORT_COLUMNS = EXPORT_COLUMNS + ['Updated_At']
+EXPORT_STREAM_BATCH_ROWS = 1000
+
+def _export_query_args():
+    """Returns (sheet, updated_since) from the request arguments; raises ValueError on bad input."""
+    name = (request.args.get('filter') or '').strip().lower().replace('-', '_')
+    if name and name not in EXPORT_FILTERS:
+        raise ValueError(f"filter must be one of: {', '.join(EXPORT_FILTERS)}")
+    updated_since = (request.args.get('updated_since') or '').strip()
+    if updated_since:
+        try:
+            since = datetime.fromisoformat(updated_since.replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError('updated_since must be an ISO 8601 timestamp')
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        updated_since = since.strftime('%Y-%m-%d %H:%M:%S')
+    return EXPORT_FILTERS.get(name), updated_since or None
+
+def _export_as_of():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def iter_export_records(sheet=None, updated_since=None):
+    """Yields export rows as lists ordered like STREAM_EXPORT_COLUMNS."""
+    for row in application_store.iter_export_rows(updated_since):
+        flat_row = export_row(row)
+        if sheet and sheet not in _export_sheets_for(flat_row):
+            continue
+        flat_row['Updated_At'] = max(row['updated_at'] or '', row['invite_updated_at'] or '')
+        yield [_excel_cell(flat_row.get(column)) for column in STREAM_EXPORT_COLUMNS]
+
+
+@app.route('/api/export.csv', methods=['GET', 'OPTIONS'])
+def export_csv():
+    """Streams the applications export as CSV without buffering it in memory."""
+    if request.method == 'OPTIONS':
+        return jsonify({'status': 'ok'}), 200
+
+    provided_key = request.headers.get('X-Recruiter-Key')
+    if not RECRUITER_KEY or provided_key != RECRUITER_KEY:
+        return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
+
+    try:
+        sheet, updated_since = _export_query_args()
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    as_of = _export_as_of()
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(STREAM_EXPORT_COLUMNS)
+        pending = 0
+        for values in iter_export_records(sheet, updated_since):
+            writer.writerow(values)
+            pending += 1
+            if pending >= EXPORT_STREAM_BATCH_ROWS:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+                pending = 0
+        yield buffer.getvalue()
+
+    return Response(stream_with_context(generate()), mimetype='text/csv', headers={
+        'Content-Disposition': 'attachment; filename=applications.csv',
+        'X-Export-As-Of': as_of,
+    })
+
+
+@app.route('/api/export.parquet', methods=['GET', 'OPTIONS'])
+def export_parquet():
+    """Exports applications as a zstd-compressed Parquet file (string columns)."""
+    if request.method == 'OPTIONS':
+        return jsonify({'status': 'ok'}), 200
+
+    provided_key = request.headers.get('X-Recruiter-Key')
+    if not RECRUITER_KEY or provided_key != RECRUITER_KEY:
+        return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
+
+    if not PARQUET_AVAILABLE:
+        return jsonify({'status': 'error', 'message': 'Parquet export requires pyarrow (pip install pyarrow).'}), 501
+    try:
+        sheet, updated_since = _export_query_args()
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    as_of = _export_as_of()
+
+    schema = pyarrow.schema([(column, pyarrow.string()) for column in STREAM_EXPORT_COLUMNS])
+
+    def write_batch(writer, batch):
+        columns = [[None if v is None else str(v) for v in column] for column in zip(*batch)]
+        writer.write_table(pyarrow.Table.from_arrays([pyarrow.array(c, type=pyarrow.string()) for c in columns], schema=schema))
+
+    # Row groups are written as they fill, so only one batch is held in memory;
+    # the file is spooled to disk because Parquet's footer is written last
+    spool = tempfile.TemporaryFile()
+    try:
+        writer = pyarrow.parquet.ParquetWriter(spool, schema, compression='zstd')
+        batch = []
+        for values in iter_export_records(sheet, updated_since):
+            batch.append(values)
+            if len(batch) >= EXPORT_STREAM_BATCH_ROWS:
+                write_batch(writer, batch)
+                batch = []
+        if batch:
+            write_batch(writer, batch)
+        writer.close()
+        spool.seek(0)
+    except Exception as e:
+        spool.close()
+        print(f"Error during Parquet export: {e}")
+        return jsonify({'status': 'error', 'message': f'Failed to generate Parquet file: {str(e)}'}), 500
+
+    response = send_file(spool, mimetype='application/vnd.apache.parquet', as_attachment=True,
+                         download_name='applications.parquet')
+    response.headers['X-Export-As-Of'] = as_of
+    return response
+
+
 # --- NEW: Detailed ATS Score Breakdown Endpoint ---
 @app.route('/api/score_details/<app_id>', methods=['GET', 'OPTIONS'])
 def get_score_details(app_id):
@@ -975,38 +4141,23 @@ def get_score_details(app_id):
         return jsonify({'status': 'error', 'message': 'Access Denied'}), 401
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT app_id, job_title, applicant_data FROM applications WHERE app_id = ?", (app_id,))
-        row = cursor.fetchone()
-        conn.close()
-
+        row = application_store.get_application(app_id)
         if row is None:
             return jsonify({'status': 'error', 'message': 'Application ID not found'}), 404
 
+        conn = get_request_db()
+        cursor = conn.cursor()
+
         app_id_found = row['app_id']
         job_title = row['job_title']
-        applicant_data = json.loads(row['applicant_data']) if row['applicant_data'] else {}
-        job_description = applicant_data.get('jobDescription', '')
-
-        target_prefix = f"{app_id}_"
-        file_name = None
-        for name in os.listdir(app.config['UPLOAD_FOLDER']):
-            if name.startswith(target_prefix):
-                file_name = name
-                break
 
-        if file_name:
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], file_name)
-            score_details = simulate_ats_scoring(job_title, job_description, applicant_data, file_path, file_name, return_details=True)
-        else:
-            # No resume file - return basic details
-            score_details = simulate_ats_scoring(job_title, job_description, applicant_data, None, None, return_details=True)
-            score_details['has_resume'] = False
+        score_details = get_ats_score_details(conn, app_id_found, job_title, row['applicant_data'])
+        cursor.execute("SELECT has_resume FROM ats_scores WHERE app_id = ?", (app_id_found,))
+        score_row = cursor.fetchone()
 
         score_details['job_title'] = job_title
         score_details['application_id'] = app_id_found
-        score_details['has_resume'] = file_name is not None
+        score_details['has_resume'] = bool(score_row and score_row['has_resume'])
 
         return jsonify({'status': 'success', 'score_details': score_details}), 200
 
@@ -1020,7 +4171,7 @@ def get_score_details(app_id):
 # --- NEW: Diagnostic endpoint to list all resume files ---
 @app.route('/api/list_resume_files', methods=['GET', 'OPTIONS'])
 def list_resume_files():
-    """Lists all resume files in the upload folder for debugging."""
+    """Lists indexed resume files and blob store usage for debugging."""
     if request.method == 'OPTIONS':
         return jsonify({'status': 'ok'}), 200
 
@@ -1029,44 +4180,83 @@ def list_resume_files():
         return jsonify({'status': 'error', 'message': 'Access Denied'}), 401
 
     try:
-        upload_folder = app.config['UPLOAD_FOLDER']
-        if not os.path.isabs(upload_folder):
-            upload_folder = os.path.join(os.getcwd(), upload_folder)
-        
-        if not os.path.exists(upload_folder):
-            return jsonify({
-                'status': 'error',
-                'message': f'Upload folder does not exist: {upload_folder}',
-                'current_directory': os.getcwd()
-            }), 500
-        
-        files = [f for f in os.listdir(upload_folder) if os.path.isfile(os.path.join(upload_folder, f))]
-        files.sort()
-        
-        # Extract Application IDs from filenames
-        app_ids_from_files = set()
-        for f in files:
-            if f.startswith('MQ-') and '_' in f:
-                app_id = f.split('_')[0]
-                app_ids_from_files.add(app_id)
-        
+        conn = get_request_db()
+        resumes = conn.execute("SELECT app_id, file_name FROM resumes ORDER BY file_name").fetchall()
+        blobs = conn.execute(
+            "SELECT COUNT(*) AS n, COALESCE(SUM(size_bytes), 0) AS bytes, COALESCE(SUM(ref_count <= 0), 0) AS unreferenced FROM resume_blobs"
+        ).fetchone()
+        # Files still waiting for migrate-resume-blobs
+        flat_files = sorted(e.name for e in os.scandir(app.config['UPLOAD_FOLDER']) if e.is_file())
+
         return jsonify({
             'status': 'success',
-            'upload_folder': upload_folder,
+            'upload_folder': os.path.abspath(app.config['UPLOAD_FOLDER']),
+            'blob_folder': os.path.abspath(RESUME_BLOB_FOLDER),
             'current_directory': os.getcwd(),
-            'total_files': len(files),
-            'files': files[:50],  # Limit to first 50 for response size
-            'application_ids_found': sorted(list(app_ids_from_files))
+            'total_files': len(resumes),
+            'files': [r['file_name'] for r in resumes[:50]],  # Limit to first 50 for response size
+            'application_ids_found': sorted(r['app_id'] for r in resumes),
+            'blobs': {'count': blobs['n'], 'bytes': blobs['bytes'], 'unreferenced': blobs['unreferenced']},
+            'unmigrated_files': flat_files[:50]
         }), 200
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
+# --- RESUME DELIVERY ---
+# Resumes are served with a strong ETag (the content sha256) and "private,
+# no-cache": browsers revalidate every preview and a 304 is answered from the
+# resumes index alone. Full and Range requests go through send_file with
+# conditional handling (If-Range/Range for progressive PDF viewers), or are
+# handed to the front server with X-Sendfile or X-Accel-Redirect.
+
+def send_resume(resume, as_attachment=False):
+    """Builds the response for an indexed resume, honouring If-None-Match and Range."""
+    file_name = resume['file_name']
+    mimetype = resume['mime_type'] or _resume_mimetype(file_name)
+    etag = resume['sha256']
+    file_path = _resume_abspath(resume['stored_path'])
+
+    if etag and request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+    elif not os.path.exists(file_path):
+        return None
+    elif RESUME_ACCEL_REDIRECT_PREFIX and _is_blob_path(resume['stored_path']):
+        # nginx serves the bytes (and Range requests) from its internal location
+        blob_rel = os.path.relpath(file_path, _resume_abspath(RESUME_BLOB_FOLDER)).replace(os.sep, '/')
+        response = Response(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = f"{RESUME_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{blob_rel}"
+        response.headers.set('Content-Disposition', 'attachment' if as_attachment else 'inline', filename=file_name)
+        response.set_etag(etag)
+    else:
+        # USE_X_SENDFILE is applied by send_file itself
+        response = send_file(
+            file_path,
+            mimetype=mimetype,
+            as_attachment=as_attachment,
+            download_name=file_name,
+            conditional=True,
+            etag=etag or True
+        )
+    return _revalidate_privately(response)
+
+def _revalidate_privately(response):
+    """Marks a recruiter-only response cacheable by the browser only, revalidated on every use."""
+    response.cache_control.no_cache = True
+    response.cache_control.private = True
+    response.cache_control.public = False
+    response.cache_control.max_age = None
+    response.vary.add('X-Recruiter-Key')
+    return response
+
+
 # --- NEW: Authenticated Resume View Endpoint (CORS Fix) ---
 @app.route('/api/view_resume/<app_id>', methods=['GET', 'OPTIONS'])
 def view_resume(app_id):
     """
     Retrieves the applicant's uploaded resume file from the server, restricted to recruiters.
+    Supports If-None-Match (304) and Range requests.
     """
     # CORS FIX: Allow preflight OPTIONS request to pass without authentication
     if request.method == 'OPTIONS':
@@ -1079,75 +4269,24 @@ def view_resume(app_id):
         return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
     
     try:
-        # 2. Look up application existence
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT app_id FROM applications WHERE app_id = ?", (app_id,))
-        row = cursor.fetchone()
-        conn.close()
-
-        if row is None:
-            return jsonify({'status': 'error', 'message': f'Application ID {app_id} not found.'}), 404
-
-        # 3. Determine the filename by prefix
-        target_prefix = f"{app_id}_"
-        file_name = None
-        
-        # Debug: List all files in the upload folder
-        try:
-            upload_folder = app.config['UPLOAD_FOLDER']
-            # Ensure we're using absolute path
-            if not os.path.isabs(upload_folder):
-                upload_folder = os.path.join(os.getcwd(), upload_folder)
-            
-            # Verify folder exists
-            if not os.path.exists(upload_folder):
-                error_msg = f'Upload folder does not exist: {upload_folder}. Current working directory: {os.getcwd()}'
-                print(f"ERROR: {error_msg}")
-                return jsonify({'status': 'error', 'message': error_msg}), 500
-            
-            all_files = os.listdir(upload_folder)
-            print(f"Looking for resume with prefix: {target_prefix}")
-            print(f"Upload folder (absolute): {upload_folder}")
-            print(f"Files in upload folder: {all_files}")
-            
-            for name in all_files:
-                if name.startswith(target_prefix):
-                    file_name = name
-                    print(f"Found matching file: {file_name}")
-                    break
-            
-            if not file_name:
-                # Provide helpful error message with available files
-                matching_files = [f for f in all_files if app_id.lower() in f.lower()]
-                error_msg = f'Resume file not found for Application ID: {app_id}. '
-                if matching_files:
-                    error_msg += f'Found similar files: {matching_files}. '
-                error_msg += f'Upload folder: {upload_folder}, Looking for prefix: {target_prefix}'
-                print(f"ERROR: {error_msg}")
-                return jsonify({'status': 'error', 'message': error_msg}), 404
-        except Exception as folder_error:
-            print(f"Error listing upload folder: {folder_error}")
-            import traceback
-            traceback.print_exc()
-            return jsonify({'status': 'error', 'message': f'Cannot access upload folder: {str(folder_error)}'}), 500
-            
-        file_path = os.path.join(upload_folder, file_name)
-
-        # 4. Determine mimetype and serve the file inline
-        if file_name.lower().endswith('.pdf'):
-            mimetype = 'application/pdf'
-        elif file_name.lower().endswith(('.jpg', '.jpeg')):
-            mimetype = 'image/jpeg'
-        else:
-            mimetype = 'application/octet-stream'
-
-        return send_file(
-            file_path,
-            mimetype=mimetype,
-            as_attachment=False, 
-            download_name=file_name
-        )
+        # 2. Look up the indexed resume (the application only matters for the 404 message)
+        conn = get_request_db()
+        resume = get_resume_record(conn, app_id)
+
+        if resume is None:
+            if application_store.get_application(app_id) is None:
+                return jsonify({'status': 'error', 'message': f'Application ID {app_id} not found.'}), 404
+            error_msg = f'Resume file not found for Application ID: {app_id}.'
+            print(f"ERROR: {error_msg}")
+            return jsonify({'status': 'error', 'message': error_msg}), 404
+
+        # 3. Serve it inline with its recorded mimetype
+        response = send_resume(resume)
+        if response is None:
+            error_msg = f'Resume file for Application ID {app_id} is indexed but missing on disk: {resume["stored_path"]}'
+            print(f"ERROR: {error_msg}")
+            return jsonify({'status': 'error', 'message': error_msg}), 404
+        return response
 
     except Exception as e:
         print(f"Error viewing resume for {app_id}: {e}")
@@ -1171,12 +4310,10 @@ def get_resume_highlights(app_id):
         return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
 
     try:
-        # Get application data
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT app_id, job_title, applicant_data FROM applications WHERE app_id = ?", (app_id,))
-        row = cursor.fetchone()
-        conn.close()
+        # Get application data and its indexed resume
+        row = application_store.get_application(app_id)
+        conn = get_request_db()
+        resume = get_resume_record(conn, app_id) if row else None
 
         if row is None:
             return jsonify({'status': 'error', 'message': 'Application ID not found'}), 404
@@ -1186,25 +4323,10 @@ def get_resume_highlights(app_id):
         applicant_data = json.loads(row['applicant_data']) if row['applicant_data'] else {}
         job_description = applicant_data.get('jobDescription', '')
 
-        # Find resume file
-        target_prefix = f"{app_id}_"
-        file_name = None
-        upload_folder = app.config['UPLOAD_FOLDER']
-        if not os.path.isabs(upload_folder):
-            upload_folder = os.path.join(os.getcwd(), upload_folder)
-        
-        if not os.path.exists(upload_folder):
-            return jsonify({'status': 'error', 'message': 'Upload folder does not exist'}), 500
-        
-        for name in os.listdir(upload_folder):
-            if name.startswith(target_prefix):
-                file_name = name
-                break
-
-        if not file_name:
+        if resume is None:
             return jsonify({'status': 'error', 'message': 'Resume file not found'}), 404
 
-        file_path = os.path.join(upload_folder, file_name)
+        file_name = resume['file_name']
 
         # Extract text from PDF
         if not file_name.lower().endswith('.pdf'):
@@ -1213,13 +4335,28 @@ def get_resume_highlights(app_id):
                 'message': 'Resume highlighting is only available for PDF files. Image files (JPG) are not supported for text extraction.'
             }), 400
 
+        # Serve highlights precomputed by the background worker when still current
+        highlights = get_cached_highlights(conn, app_id_found, row['applicant_data'], resume)
+        if highlights is not None:
+            score_details = get_ats_score_details(conn, app_id_found, job_title, row['applicant_data'])
+            return jsonify({
+                'status': 'success',
+                'application_id': app_id_found,
+                'job_title': job_title,
+                'highlights': highlights,
+                'ats_score': score_details.get('score', 0),
+                'matched_keywords_count': len(highlights.get('matched_keywords', [])),
+                'pdf_extraction_available': True
+            }), 200
+
         if not PDF_EXTRACTION_AVAILABLE:
             return jsonify({
                 'status': 'error',
                 'message': 'PDF extraction library not available. Please install pdfplumber or PyPDF2: pip install pdfplumber'
             }), 500
 
-        resume_text = extract_text_from_pdf(file_path)
+        extraction = get_resume_extraction(conn, resume)
+        resume_text = extraction['text'] if extraction else None
 
         if not resume_text:
             return jsonify({
@@ -1231,7 +4368,7 @@ def get_resume_highlights(app_id):
         highlights = find_highlighted_sections(resume_text, job_title, job_description, applicant_data)
 
         # Get ATS score details for context
-        score_details = simulate_ats_scoring(job_title, job_description, applicant_data, file_path, file_name, return_details=True)
+        score_details = get_ats_score_details(conn, app_id_found, job_title, row['applicant_data'])
 
         return jsonify({
             'status': 'success',
@@ -1250,12 +4387,60 @@ def get_resume_highlights(app_id):
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
+# --- HIGHLIGHTED RESUME CACHE ---
+# The expensive part of the highlighted view (extraction, section analysis and
+# keyword markup) is cached as a zlib-compressed fragment keyed by the resume
+# content hash, the job requirements key, the work/education entries the
+# highlights read, and the scoring and markup versions. Fragments are shared by
+# every application with the same inputs; the page around them (ID, title,
+# score) is cheap and rebuilt per request. The page ETag covers both, so a
+# repeat view is a 304 that never touches the fragment.
+
+def highlighted_fragment_key(resume_sha256, job_title, job_description, applicant_data):
+    """Cache key for the highlighted resume fragment of these inputs."""
+    requirements = get_job_requirements(job_title, job_description)
+    data = applicant_data or {}
+    highlight_inputs = json.dumps([data.get('work'), data.get('education')], sort_keys=True, default=str)
+    raw = (f"{HIGHLIGHTED_HTML_VERSION}\x1f{ATS_SCORING_VERSION}\x1f{resume_sha256}"
+           f"\x1f{requirements.key}\x1f{highlight_inputs}")
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+def get_highlighted_fragment(conn, cache_key):
+    """Returns (html, matched_keyword_count) for a cached fragment, or None."""
+    row = conn.execute(
+        "SELECT html, matched_keywords FROM highlighted_html_cache WHERE cache_key = ?", (cache_key,)
+    ).fetchone()
+    if row is None:
+        return None
+    return zlib.decompress(row['html']).decode('utf-8'), row['matched_keywords']
+
+def store_highlighted_fragment(conn, cache_key, resume_sha256, html_fragment, matched_keywords):
+    """Caches a rendered fragment, evicting the oldest beyond HIGHLIGHTED_HTML_CACHE_MAX_ENTRIES (caller commits)."""
+    conn.execute(
+        "INSERT OR REPLACE INTO highlighted_html_cache (cache_key, resume_sha256, render_version, matched_keywords, html, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (cache_key, resume_sha256, f"{HIGHLIGHTED_HTML_VERSION}.{ATS_SCORING_VERSION}", matched_keywords,
+         zlib.compress(html_fragment.encode('utf-8'), 6), time.time())
+    )
+    conn.execute(
+        "DELETE FROM highlighted_html_cache WHERE cache_key IN "
+        "(SELECT cache_key FROM highlighted_html_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+        (HIGHLIGHTED_HTML_CACHE_MAX_ENTRIES,)
+    )
+
+def render_highlighted_fragment(resume_text, job_title, job_description, highlights):
+    """Renders the highlighted resume body. Returns (html, matched_keyword_count)."""
+    matched_keywords = highlights.get('matched_keywords', [])
+    return highlight_text_in_resume(resume_text, matched_keywords, highlights, job_title, job_description), len(matched_keywords)
+
+
 # --- NEW: Highlighted Resume HTML Endpoint ---
 @app.route('/api/view_resume_highlighted/<app_id>', methods=['GET', 'OPTIONS'])
 def view_resume_highlighted(app_id):
     """
     Returns an HTML version of the resume with highlighted keywords and sections
-    that contributed to the ATS score.
+    that contributed to the ATS score. Served from highlighted_html_cache with
+    ETag/304 support; the fragment is only rebuilt when its inputs change.
     """
     # CORS preflight
     if request.method == 'OPTIONS':
@@ -1267,12 +4452,10 @@ def view_resume_highlighted(app_id):
         return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
 
     try:
-        # Get application data
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT app_id, job_title, applicant_data FROM applications WHERE app_id = ?", (app_id,))
-        row = cursor.fetchone()
-        conn.close()
+        # Get application data and its indexed resume
+        row = application_store.get_application(app_id)
+        conn = get_request_db()
+        resume = get_resume_record(conn, app_id) if row else None
 
         if row is None:
             return jsonify({'status': 'error', 'message': 'Application ID not found'}), 404
@@ -1282,57 +4465,55 @@ def view_resume_highlighted(app_id):
         applicant_data = json.loads(row['applicant_data']) if row['applicant_data'] else {}
         job_description = applicant_data.get('jobDescription', '')
 
-        # Find resume file
-        target_prefix = f"{app_id}_"
-        file_name = None
-        upload_folder = app.config['UPLOAD_FOLDER']
-        if not os.path.isabs(upload_folder):
-            upload_folder = os.path.join(os.getcwd(), upload_folder)
-        
-        if not os.path.exists(upload_folder):
-            return jsonify({'status': 'error', 'message': 'Upload folder does not exist'}), 500
-        
-        for name in os.listdir(upload_folder):
-            if name.startswith(target_prefix):
-                file_name = name
-                break
-
-        if not file_name:
+        if resume is None:
             return jsonify({'status': 'error', 'message': 'Resume file not found'}), 404
 
-        file_path = os.path.join(upload_folder, file_name)
+        file_name = resume['file_name']
 
-        # Extract text from PDF
         if not file_name.lower().endswith('.pdf'):
             return jsonify({
                 'status': 'error', 
                 'message': 'Highlighted view is only available for PDF files.'
             }), 400
 
-        if not PDF_EXTRACTION_AVAILABLE:
-            return jsonify({
-                'status': 'error',
-                'message': 'PDF extraction library not available.'
-            }), 500
-
-        resume_text = extract_text_from_pdf(file_path)
-
-        if not resume_text:
-            return jsonify({
-                'status': 'error',
-                'message': 'Could not extract text from PDF.'
-            }), 500
-
-        # Find highlighted sections and keywords
-        highlights = find_highlighted_sections(resume_text, job_title, job_description, applicant_data)
-        matched_keywords = highlights.get('matched_keywords', [])
-        
         # Get ATS score
-        score_details = simulate_ats_scoring(job_title, job_description, applicant_data, file_path, file_name, return_details=True)
+        score_details = get_ats_score_details(conn, app_id_found, job_title, row['applicant_data'])
         ats_score = score_details.get('score', 0)
 
-        # Create highlighted HTML
-        highlighted_text = highlight_text_in_resume(resume_text, matched_keywords, highlights, job_title)
+        resume_sha256 = _current_resume_sha256(conn, resume)
+        fragment_key = highlighted_fragment_key(resume_sha256, job_title, job_description, applicant_data)
+        etag = hashlib.sha256(f"{fragment_key}\x1f{app_id_found}\x1f{job_title}\x1f{ats_score}".encode('utf-8')).hexdigest()
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return _revalidate_privately(response)
+
+        fragment = get_highlighted_fragment(conn, fragment_key)
+        if fragment is None:
+            if not PDF_EXTRACTION_AVAILABLE:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'PDF extraction library not available.'
+                }), 500
+
+            # Extract text from PDF
+            extraction = get_resume_extraction(conn, resume)
+            resume_text = extraction['text'] if extraction else None
+            if not resume_text:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Could not extract text from PDF.'
+                }), 500
+
+            # Find highlighted sections and keywords (reusing the worker's when still current)
+            highlights = (get_cached_highlights(conn, app_id_found, row['applicant_data'], resume)
+                          or find_highlighted_sections(resume_text, job_title, job_description, applicant_data))
+
+            # Create highlighted HTML
+            fragment = render_highlighted_fragment(resume_text, job_title, job_description, highlights)
+            store_highlighted_fragment(conn, fragment_key, resume_sha256, *fragment)
+            conn.commit()
+        highlighted_text, matched_keyword_count = fragment
 
         # Generate HTML page
         html_content = f"""
@@ -1449,7 +4630,7 @@ def view_resume_highlighted(app_id):
             <div class="info-item"><strong>Application ID:</strong> {app_id_found}</div>
             <div class="info-item"><strong>Job Title:</strong> {job_title}</div>
             <div class="info-item"><strong>ATS Score:</strong> <span class="score-badge">{ats_score}%</span></div>
-            <div class="info-item"><strong>Matched Keywords:</strong> {len(matched_keywords)}</div>
+            <div class="info-item"><strong>Matched Keywords:</strong> {matched_keyword_count}</div>
         </div>
     </div>
     
@@ -1484,8 +4665,9 @@ def view_resume_highlighted(app_id):
 </html>
         """
 
-        from flask import Response
-        return Response(html_content, mimetype='text/html')
+        response = Response(html_content, mimetype='text/html')
+        response.set_etag(etag)
+        return _revalidate_privately(response)
 
     except Exception as e:
         print(f"Error generating highlighted resume for {app_id}: {e}")
@@ -1494,7 +4676,7 @@ def view_resume_highlighted(app_id):
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
-def highlight_text_in_resume(resume_text, matched_keywords, highlights, job_title):
+def highlight_text_in_resume(resume_text, matched_keywords, highlights, job_title, job_description=None):
     """
     Highlights keywords in resume text with different colors based on section.
     Also highlights project sections relevant to the job role.
@@ -1502,9 +4684,6 @@ def highlight_text_in_resume(resume_text, matched_keywords, highlights, job_titl
     """
     import html
     
-    # Escape HTML to prevent XSS
-    highlighted_text = html.escape(resume_text)
-    
     # Get keywords by section
     skill_keywords = set()
     exp_keywords = set()
@@ -1525,88 +4704,67 @@ def highlight_text_in_resume(resume_text, matched_keywords, highlights, job_titl
             if edu.get('highlighted_keywords'):
                 edu_keywords.update([kw.lower() for kw in edu['highlighted_keywords']])
     
-    # Identify project sections based on job title (BEFORE HTML escaping)
-    normalized_title = job_title.lower()
-    project_keywords = []
-    
-    if 'data' in normalized_title or 'scientist' in normalized_title:
-        project_keywords = ['python', 'machine learning', 'ml', 'data science', 'data analysis', 'pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch', 'project', 'model', 'dataset', 'prediction', 'algorithm']
-    elif 'frontend' in normalized_title or 'react' in normalized_title:
-        project_keywords = ['react', 'javascript', 'typescript', 'frontend', 'ui', 'ux', 'project', 'application', 'component', 'redux']
-    elif 'backend' in normalized_title or 'node' in normalized_title:
-        project_keywords = ['node', 'express', 'api', 'backend', 'server', 'database', 'project', 'microservice', 'rest', 'postgres', 'mongodb']
-    elif 'designer' in normalized_title or 'ux' in normalized_title:
-        project_keywords = ['design', 'ui', 'ux', 'figma', 'sketch', 'prototype', 'project', 'wireframe', 'user experience']
-    
-    # Find project sections in original text
-    import re
-    project_patterns = [
-        r'(project[s]?[:]?\s*\n.*?)(?=\n\n|\n[A-Z][a-z]+|$)',
-        r'(key\s+project[s]?[:]?\s*\n.*?)(?=\n\n|\n[A-Z][a-z]+|$)',
-        r'(notable\s+project[s]?[:]?\s*\n.*?)(?=\n\n|\n[A-Z][a-z]+|$)',
-        r'(portfolio\s+project[s]?[:]?\s*\n.*?)(?=\n\n|\n[A-Z][a-z]+|$)',
-    ]
+    # Project sections come from the segmenter; highlights precomputed before it lack them
+    sections = highlights.get('sections')
+    if sections is None:
+        sections = [section._asdict() for section in segment_resume(resume_text)]
+    project_keywords = list(get_job_requirements(job_title, job_description).project_keywords)
+    relevant_terms = [kw.lower() for kw in matched_keywords + project_keywords]
     
+    # Wrap each project section that mentions a relevant keyword
     project_markers = []
-    for pattern in project_patterns:
-        matches = list(re.finditer(pattern, resume_text, re.IGNORECASE | re.DOTALL))
-        for match in matches:
-            project_text = match.group(1)
-            project_lower = project_text.lower()
-            has_relevant_keyword = any(kw.lower() in project_lower for kw in matched_keywords + project_keywords)
-            
-            if has_relevant_keyword:
-                project_markers.append((match.start(), match.end(), project_text))
-                break
-    
-    # Escape HTML first
-    highlighted_text = html.escape(resume_text)
-    
-    # Mark project sections (reverse order to preserve indices after replacement)
-    for start, end, project_text in reversed(project_markers):
-        escaped_project = html.escape(project_text)
-        # Find the escaped version in highlighted_text
-        escaped_start = highlighted_text.find(escaped_project)
-        if escaped_start != -1:
-            highlighted_section = f'<div class="project-section">{escaped_project}</div>'
-            highlighted_text = highlighted_text[:escaped_start] + highlighted_section + highlighted_text[escaped_start + len(escaped_project):]
-    
-    # Highlight keywords with word boundaries (case-insensitive)
-    all_keywords = [kw.lower() for kw in matched_keywords]
-    
-    # Sort by length (longest first) to avoid partial matches
-    all_keywords.sort(key=len, reverse=True)
+    for section in sections:
+        if section['kind'] != 'projects':
+            continue
+        project_lower = resume_text[section['start']:section['end']].lower()
+        if any(term in project_lower for term in relevant_terms):
+            project_markers.append((section['start'], section['end']))
     
-    for keyword in all_keywords:
+    # Determine highlight class for each keyword based on section
+    keyword_classes = {}
+    for keyword in matched_keywords:
+        keyword = keyword.lower()
         if not keyword or len(keyword) < 2:
             continue
-            
-        # Determine highlight class based on section
-        highlight_class = 'highlight'
         if keyword in skill_keywords:
-            highlight_class = 'highlight-skill'
+            keyword_classes[keyword] = 'highlight-skill'
         elif keyword in exp_keywords:
-            highlight_class = 'highlight-experience'
+            keyword_classes[keyword] = 'highlight-experience'
         elif keyword in edu_keywords:
-            highlight_class = 'highlight-education'
-        
-        # Case-insensitive replacement with word boundaries
-        # Highlight keywords even inside project sections
-        pattern = re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE)
-        
-        def replace_func(match):
-            matched_text = match.group(0)
-            # Check if already inside a highlight span (avoid double highlighting)
-            before_match = highlighted_text[max(0, match.start()-100):match.start()]
-            # If we're inside a project div but not already highlighted, still highlight
-            if '<div class="project-section">' in before_match and '</span>' not in before_match[-50:]:
-                return f'<span class="{highlight_class}">{matched_text}</span>'
-            # If already highlighted, skip
-            if '</span>' in before_match[-50:]:
-                return matched_text
-            return f'<span class="{highlight_class}">{matched_text}</span>'
-        
-        highlighted_text = pattern.sub(replace_func, highlighted_text)
+            keyword_classes[keyword] = 'highlight-education'
+        else:
+            keyword_classes[keyword] = 'highlight'
+    
+    # Collect markup insertions on the original text; at equal positions closing
+    # tags sort before opening ones so spans and project divs nest correctly
+    insertions = []
+    for start, end in project_markers:
+        insertions.append((start, 2, '<div class="project-section">'))
+        insertions.append((end, 1, '</div>'))
+    
+    # Section spans are ordered and disjoint, so their edges are already sorted
+    project_edges = [edge for marker in project_markers for edge in marker]
+    matcher = keyword_matcher(keyword_classes)
+    if matcher is not None:
+        for match in matcher.finditer(resume_text):
+            # Highlight keywords even inside project sections, but never across a boundary
+            next_edge = bisect.bisect_right(project_edges, match.start())
+            if next_edge < len(project_edges) and project_edges[next_edge] < match.end():
+                continue
+            highlight_class = keyword_classes[match.group(0).lower()]
+            insertions.append((match.start(), 3, f'<span class="{highlight_class}">'))
+            insertions.append((match.end(), 0, '</span>'))
+    insertions.sort(key=lambda item: (item[0], item[1]))
+    
+    # Build the HTML in one pass, escaping text between insertions to prevent XSS
+    parts = []
+    last = 0
+    for position, _, tag in insertions:
+        parts.append(html.escape(resume_text[last:position]))
+        parts.append(tag)
+        last = position
+    parts.append(html.escape(resume_text[last:]))
+    highlighted_text = ''.join(parts)
     
     return highlighted_text
 
@@ -1615,8 +4773,8 @@ def highlight_text_in_resume(resume_text, matched_keywords, highlights, job_titl
 @app.route('/api/filtered_scores', methods=['GET', 'OPTIONS'])
 def get_filtered_scores():
     """
-    Retrieves all applications, calculates ATS scores, and filters them 
-    to return only those with a score > 60, sorted by score.
+    Returns persisted ATS scores (see ats_scores) filtered to applications
+    with a resume and a score > 60, sorted by score.
     """
     # CORS FIX: Allow preflight OPTIONS request to pass without authentication
     if request.method == 'OPTIONS':
@@ -1629,67 +4787,190 @@ def get_filtered_scores():
         return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT app_id, job_title, applicant_data FROM applications")
-        all_rows = cursor.fetchall() 
-        conn.close()
-        
-        if not all_rows:
+        if application_store.count_applications() == 0:
             return jsonify({'status': 'info', 'message': 'No applications found.'}), 200
 
-        # --- Processing and Scoring ---
-        processed_results = []
-        for row in all_rows: 
-            app_id = row['app_id']
-            job_title = row['job_title']
-            applicant_data = json.loads(row['applicant_data']) if row['applicant_data'] else {}
-            job_description = applicant_data.get('jobDescription', '')
-            
-            target_prefix = f"{app_id}_"
-            file_name = None
-            
-            # Using global 'app' variable to access UPLOAD_FOLDER
-            for name in os.listdir(app.config['UPLOAD_FOLDER']):
-                if name.startswith(target_prefix):
-                    file_name = name
-                    break
-            
-            score = 0
-            
-            if file_name:
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], file_name)
-                score = simulate_ats_scoring(job_title, job_description, applicant_data, file_path, file_name)
-                
-            # Only include results if the score is > 60 AND a file was found
-            if file_name and score > 60:
-                processed_results.append({
-                    'App_ID': app_id,
-                    'Job_Title': job_title,
-                    'Resume_File': file_name,
-                    'ATS_Score': score
-                })
-
-        # Sort the results by score (descending)
-        processed_results.sort(key=lambda x: x['ATS_Score'], reverse=True)
-        
+        conn = get_request_db()
+        cursor = conn.cursor()
+
+        refresh_stale_ats_scores(conn)
+
+        # Only include results if the score is > 60 AND a file was found
+        cursor.execute('''
+            SELECT app_id, job_title, resume_file, score
+            FROM ats_scores
+            WHERE has_resume = 1 AND score > 60
+            ORDER BY score DESC
+        ''')
+        processed_results = [{
+            'App_ID': r['app_id'],
+            'Job_Title': r['job_title'],
+            'Resume_File': r['resume_file'],
+            'ATS_Score': r['score']
+        } for r in cursor.fetchall()]
+
         return jsonify({
             'status': 'success',
             'filtered_applications': processed_results
         }), 200
 
     except Exception as e:
-        print(f"Error during filtered scoring: {e}")
-        return jsonify({'status': 'error', 'message': f'Failed to retrieve filtered data: {str(e)}'}), 500
-# --- NEW: Authenticated All Scored Applications Endpoint ---
-@app.route('/api/scored_applications', methods=['GET', 'OPTIONS'])
-def get_all_scored_applications():
+        print(f"Error during filtered scoring: {e}")
+        return jsonify({'status': 'error', 'message': f'Failed to retrieve filtered data: {str(e)}'}), 500
+# --- NEW: Authenticated All Scored Applications Endpoint ---
+SCORED_APPLICATIONS_MAX_LIMIT = 500
+# sort name -> (score direction, app_id direction); both orders are served by the (score DESC, app_id) indexes
+SCORED_APPLICATIONS_SORTS = {
+    'score_desc': ('DESC', 'ASC'),
+    'score_asc': ('ASC', 'DESC'),
+}
+
+def _encode_cursor(*values):
+    """Opaque keyset cursor for the sort key values of the last row on a page."""
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+def _decode_cursor(cursor_value, size):
+    """Returns the list of values from a cursor made by _encode_cursor; raises ValueError if malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor_value.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid cursor')
+    return values
+
+def _scored_applications_filters(args):
+    """Builds the WHERE clauses and parameters for the scored applications filters in args."""
+    clauses, params = [], []
+    job_title = (args.get('job_title') or '').strip()
+    if job_title:
+        clauses.append("s.job_title = ?")
+        params.append(job_title)
+    for name, op in (('min_score', '>='), ('max_score', '<=')):
+        value = args.get(name)
+        if value not in (None, ''):
+            try:
+                value = int(value)
+            except ValueError:
+                raise ValueError(f'{name} must be an integer')
+            clauses.append(f"s.score {op} ?")
+            params.append(value)
+    has_resume = (args.get('has_resume') or '').strip().lower()
+    if has_resume:
+        if has_resume not in ('1', '0', 'true', 'false'):
+            raise ValueError('has_resume must be true or false')
+        clauses.append("s.has_resume = ?")
+        params.append(1 if has_resume in ('1', 'true') else 0)
+    status = (args.get('status') or '').strip()
+    if status:
+        # Kept in sync with the invites by sync_ats_application_statuses
+        clauses.append("s.application_status = ?")
+        params.append(status)
+    search = (args.get('search') or '').strip()
+    if search:
+        # Application ID prefix, with or without the MQ- part, as a range on the primary key
+        prefix = 'MQ-' + re.sub(r'^mq-', '', search.lower())
+        clauses.append("s.app_id >= ? AND s.app_id < ?")
+        params.extend([prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)])
+    return clauses, params
+
+@app.route('/api/scored_applications', methods=['GET', 'OPTIONS'])
+def get_all_scored_applications():
+    """
+    Returns applications with their persisted ATS scores, including entries
+    without resumes (score 0, Resume_File null).
+
+    Query parameters (all optional):
+    - job_title, min_score, max_score, has_resume, status (application status,
+      'Open' when not set) and search (App_ID prefix) filter the rows
+    - sort: score_desc (default) or score_asc; ties are ordered by App_ID
+    - limit: page size (max 500); without it every matching row is returned
+    - cursor: next_cursor from the previous page
+    The response includes the total number of matching rows.
+    """
+    # CORS preflight
+    if request.method == 'OPTIONS':
+        return jsonify({'status': 'ok'}), 200
+
+    provided_key = request.headers.get('X-Recruiter-Key')
+    if not RECRUITER_KEY or provided_key != RECRUITER_KEY:
+        return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
+
+    try:
+        clauses, params = _scored_applications_filters(request.args)
+        sort = request.args.get('sort') or 'score_desc'
+        if sort not in SCORED_APPLICATIONS_SORTS:
+            raise ValueError(f"sort must be one of: {', '.join(SCORED_APPLICATIONS_SORTS)}")
+        score_dir, app_id_dir = SCORED_APPLICATIONS_SORTS[sort]
+        limit = request.args.get('limit')
+        if limit not in (None, ''):
+            try:
+                limit = int(limit)
+            except ValueError:
+                raise ValueError('limit must be an integer')
+            limit = max(1, min(limit, SCORED_APPLICATIONS_MAX_LIMIT))
+        else:
+            limit = None
+        cursor_value = request.args.get('cursor')
+        after = _decode_cursor(cursor_value, 2) if cursor_value else None
+        if after is not None and not (isinstance(after[0], int) and isinstance(after[1], str)):
+            raise ValueError('Invalid cursor')
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    try:
+        conn = get_request_db()
+        refresh_stale_ats_scores(conn)
+        sync_ats_application_statuses(conn)
+        cursor = conn.cursor()
+        from_sql = "FROM ats_scores s"
+        where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        cursor.execute(f"SELECT COUNT(*) AS n {from_sql} {where_sql}", params)
+        total = cursor.fetchone()['n']
+
+        page_clauses, page_params = list(clauses), list(params)
+        if after is not None:
+            score_op = '<' if score_dir == 'DESC' else '>'
+            app_id_op = '>' if app_id_dir == 'ASC' else '<'
+            page_clauses.append(f"(s.score {score_op} ? OR (s.score = ? AND s.app_id {app_id_op} ?))")
+            page_params.extend([after[0], after[0], after[1]])
+        page_where = f"WHERE {' AND '.join(page_clauses)}" if page_clauses else ""
+        sql = f'''
+            SELECT s.app_id, s.job_title, s.resume_file, s.score, s.application_status
+            {from_sql} {page_where}
+            ORDER BY s.score {score_dir}, s.app_id {app_id_dir}
+        '''
+        if limit is not None:
+            sql += " LIMIT ?"
+            page_params.append(limit + 1)
+        cursor.execute(sql, page_params)
+        rows = cursor.fetchall()
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1]['score'], rows[-1]['app_id'])
+        results = [{
+            'App_ID': r['app_id'],
+            'Job_Title': r['job_title'],
+            'Resume_File': r['resume_file'],
+            'ATS_Score': r['score'],
+            'Application_Status': r['application_status']
+        } for r in rows]
+
+        return jsonify({'status': 'success', 'applications': results, 'total': total, 'next_cursor': next_cursor}), 200
+
+    except Exception as e:
+        print(f"Error during scoring all applications: {e}")
+        return jsonify({'status': 'error', 'message': f'Failed to retrieve data: {str(e)}'}), 500
+
+@app.route('/api/rescore', methods=['GET', 'POST', 'OPTIONS'])
+@cross_origin(headers=['Content-Type', 'X-Recruiter-Key'], methods=['GET', 'POST', 'OPTIONS'])
+def bulk_rescore():
     """
-    Returns ALL applications with computed ATS scores (no filtering).
-    Includes entries without resumes with score 0 and Resume_File as null.
+    POST queues (or resumes) a bulk re-extraction/rescoring run for the job
+    workers. GET returns the progress of the latest run.
     """
-    # CORS preflight
     if request.method == 'OPTIONS':
         return jsonify({'status': 'ok'}), 200
 
@@ -1697,48 +4978,40 @@ def get_all_scored_applications():
     if not RECRUITER_KEY or provided_key != RECRUITER_KEY:
         return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
 
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT app_id, job_title, applicant_data FROM applications")
-        all_rows = cursor.fetchall()
-        conn.close()
-
-        results = []
-        for row in all_rows:
-            app_id = row['app_id']
-            job_title = row['job_title']
-            applicant_data = json.loads(row['applicant_data']) if row['applicant_data'] else {}
-            job_description = applicant_data.get('jobDescription', '')
-
-            target_prefix = f"{app_id}_"
-            file_name = None
-            for name in os.listdir(app.config['UPLOAD_FOLDER']):
-                if name.startswith(target_prefix):
-                    file_name = name
-                    break
+    if request.method == 'GET':
+        return jsonify({'status': 'success', 'run': get_rescore_run()}), 200
 
-            if file_name:
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], file_name)
-                score = simulate_ats_scoring(job_title, job_description, applicant_data, file_path, file_name)
-            else:
-                score = 0
+    try:
+        payload = request.json if request.is_json else {}
+        payload = payload or {}
+        run, queued = queue_rescore_run(
+            reextract=bool(payload.get('reextract')),
+            restart=bool(payload.get('restart')),
+            workers=payload.get('workers'),
+            chunk_size=int(payload.get('chunk_size') or RESCORE_CHUNK_SIZE)
+        )
+        if not queued:
+            return jsonify({'status': 'error', 'message': 'A rescore run is already in progress.', 'run': run}), 409
+        return jsonify({'status': 'success', 'run': run}), 202
+    except Exception as e:
+        print(f"Error starting rescore run: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
 
-            results.append({
-                'App_ID': app_id,
-                'Job_Title': job_title,
-                'Resume_File': file_name,
-                'ATS_Score': score
-            })
 
-        # Sort by score descending for convenience
-        results.sort(key=lambda x: x['ATS_Score'], reverse=True)
+@app.route('/api/rescore/<int:run_id>', methods=['GET', 'OPTIONS'])
+def get_bulk_rescore(run_id):
+    """Returns the progress of a bulk rescoring run."""
+    if request.method == 'OPTIONS':
+        return jsonify({'status': 'ok'}), 200
 
-        return jsonify({'status': 'success', 'applications': results}), 200
+    provided_key = request.headers.get('X-Recruiter-Key')
+    if not RECRUITER_KEY or provided_key != RECRUITER_KEY:
+        return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
 
-    except Exception as e:
-        print(f"Error during scoring all applications: {e}")
-        return jsonify({'status': 'error', 'message': f'Failed to retrieve data: {str(e)}'}), 500
+    run = get_rescore_run(run_id)
+    if run is None:
+        return jsonify({'status': 'error', 'message': 'Rescore run not found'}), 404
+    return jsonify({'status': 'success', 'run': run}), 200
 
 # --- NEW: Authenticated Interview Invite Endpoint (Individual Invite) ---
 @app.route('/api/invite_applicant/<app_id>', methods=['POST', 'OPTIONS'])
@@ -1753,11 +5026,7 @@ def invite_applicant(app_id):
     if not RECRUITER_KEY or provided_key != RECRUITER_KEY:
         return jsonify({'status': 'error', 'message': 'Access Denied: Invalid credentials.'}), 401
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT applicant_data, job_title FROM applications WHERE app_id = ?", (app_id,))
-    row = cursor.fetchone()
-    conn.close()
+    row = application_store.get_application(app_id)
 
     if row is None:
         return jsonify({'status': 'error', 'message': 'Application ID not found.'}), 404
@@ -1771,33 +5040,140 @@ def invite_applicant(app_id):
     if not applicant_email:
         return jsonify({'status': 'error', 'message': 'Applicant email address not found.'}), 400
 
-    if send_interview_invite(applicant_email, applicant_name, job_title):
-        # Record/Upsert into invites schedule table
-        recruiter_name = request.headers.get('X-Recruiter-Name', 'Recruiter')
+    if not _smtp_configured():
+        return jsonify({'status': 'error', 'message': 'Email disabled or SMTP credentials missing.'}), 500
+
+    # Record/Upsert into invites schedule table first: the email is only queued once the invite exists
+    recruiter_name = request.headers.get('X-Recruiter-Name', 'Recruiter')
+    source = (applicant_data.get('source') or applicant_data.get('referralSource') or '').strip()
+    try:
+        application_store.record_invite_sent(app_id, recruiter_name, job_title, source)
+    except Exception as e:
+        print(f"Error writing invite record for {app_id}: {e}")
+        return jsonify({'status': 'error', 'message': 'Failed to record the invite; no email was queued.'}), 500
+
+    conn = get_request_db()
+    email_id, queued = enqueue_email(conn, build_interview_invite(applicant_email, applicant_name, job_title, app_id),
+                                     app_id, 'interview_invite', f"{app_id}:interview_invite")
+    conn.commit()
+    try:
+        mark_export_dirty()
+    except Exception as e:
+        print(f"Warning: failed to schedule Excel rebuild after invite: {e}")
+    message = f'Invitation queued for {applicant_name}' if queued else f'Invitation already queued or sent to {applicant_name}'
+    return jsonify({'status': 'success', 'message': message, 'email_id': email_id, 'duplicate': not queued}), 200
+
+
+@app.route('/api/invite_applicants', methods=['POST', 'OPTIONS'])
+def invite_applicants():
+    """
+    Queues interview invites for many applicants at once. Body: {"app_ids": [...]}
+    or {"min_score": N} plus optional job_title, max_score, has_resume, status
+    and search, filtering like /api/scored_applications (at most
+    BULK_INVITE_MAX applicants). Returns a result per applicant with its
+    outbox email_id; delivery is tracked at /api/email_outbox.
+    """
+    if request.method == 'OPTIONS':
+        return jsonify({'status': 'ok'}), 200
+
+    provided_key = request.headers.get('X-Recruiter-Key')
+    if not RECRUITER_KEY or provided_key != RECRUITER_KEY:
+        return jsonify({'status': 'error', 'message': 'Access Denied: Invalid credentials.'}), 401
+
+    payload = request.get_json(silent=True) or {}
+    app_ids = payload.get('app_ids')
+    if app_ids is not None:
+        if not isinstance(app_ids, list) or not all(isinstance(a, str) for a in app_ids):
+            return jsonify({'status': 'error', 'message': 'app_ids must be a list of application IDs'}), 400
+        app_ids = list(dict.fromkeys(a.strip() for a in app_ids if a.strip()))
+    elif payload.get('min_score') is not None:
+        filters = {name: str(payload[name]) for name in ('job_title', 'min_score', 'max_score', 'has_resume', 'status', 'search')
+                   if payload.get(name) is not None}
+        try:
+            clauses, params = _scored_applications_filters(filters)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        conn = get_request_db()
+        refresh_stale_ats_scores(conn)
+        sync_ats_application_statuses(conn)
+        query = f"SELECT s.app_id FROM ats_scores s WHERE {' AND '.join(clauses)} ORDER BY s.score DESC, s.app_id LIMIT ?"
+        app_ids = [r['app_id'] for r in conn.execute(query, params + [BULK_INVITE_MAX + 1]).fetchall()]
+    else:
+        return jsonify({'status': 'error', 'message': 'Provide app_ids or min_score'}), 400
+
+    if not app_ids:
+        return jsonify({'status': 'error', 'message': 'No applicants matched'}), 400
+    if len(app_ids) > BULK_INVITE_MAX:
+        return jsonify({'status': 'error', 'message': f'At most {BULK_INVITE_MAX} applicants can be invited per request'}), 400
+    if not _smtp_configured():
+        return jsonify({'status': 'error', 'message': 'Email disabled or SMTP credentials missing.'}), 500
+
+    recruiter_name = request.headers.get('X-Recruiter-Name', 'Recruiter')
+    rows = {r['app_id']: r for r in application_store.get_applications(app_ids)}
+    results, recipients, invites = {}, [], []
+    for app_id in app_ids:
+        row = rows.get(app_id)
+        if row is None:
+            results[app_id] = {'app_id': app_id, 'status': 'error', 'message': 'Application ID not found.'}
+            continue
+        applicant_data = json.loads(row['applicant_data']) if row['applicant_data'] else {}
+        applicant_email = applicant_data.get('communication', {}).get('email')
+        applicant_name = applicant_data.get('personal', {}).get('firstName', 'Applicant')
+        if not applicant_email:
+            results[app_id] = {'app_id': app_id, 'status': 'error', 'message': 'Applicant email address not found.'}
+            continue
         source = (applicant_data.get('source') or applicant_data.get('referralSource') or '').strip()
+        recipients.append((app_id, applicant_email, {'applicant_name': applicant_name, 'job_title': row['job_title'], 'app_id': app_id}))
+        invites.append((app_id, recruiter_name, row['job_title'], source))
+
+    # Invites are recorded first; no email is queued for an invite that was not written
+    if invites:
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO invites (app_id, recruiter, interviewer, job_title, source, resume_status, phone_status, inperson_status, invited_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-                ON CONFLICT(app_id) DO UPDATE SET
-                    recruiter=excluded.recruiter,
-                    job_title=excluded.job_title
-            ''', (app_id, recruiter_name, '', job_title, source, 'Go', 'Pending', 'Pending'))
-            conn.commit()
-            conn.close()
+            application_store.record_invites_sent(invites)
         except Exception as e:
-            print(f"Warning: failed to write invite record for {app_id}: {e}")
-        return jsonify({'status': 'success', 'message': f'Invitation sent to {applicant_name}'}), 200
-    else:
-        return jsonify({'status': 'error', 'message': 'Failed to send email via SMTP.'}), 500
+            print(f"Error writing invite records: {e}")
+            return jsonify({'status': 'error', 'message': 'Failed to record the invites; no emails were queued.'}), 500
+
+    rendered = render_email_batch('interview_invite', [context for _, _, context in recipients])
+    conn = get_request_db()
+    for (app_id, applicant_email, _), email in zip(recipients, rendered):
+        email_id, queued = enqueue_email(conn, email_message(email, applicant_email),
+                                         app_id, 'interview_invite', f"{app_id}:interview_invite")
+        results[app_id] = {
+            'app_id': app_id,
+            'email': applicant_email,
+            'email_id': email_id,
+            'status': 'success',
+            'message': 'Invitation queued' if queued else 'Invitation already queued or sent',
+            'duplicate': not queued,
+        }
+    conn.commit()
+
+    if invites:
+        try:
+            mark_export_dirty()
+        except Exception as e:
+            print(f"Warning: failed to schedule Excel rebuild after invites: {e}")
+
+    return jsonify({
+        'status': 'success',
+        'queued': sum(1 for r in results.values() if r['status'] == 'success' and not r['duplicate']),
+        'failed': sum(1 for r in results.values() if r['status'] == 'error'),
+        'results': [results[a] for a in app_ids],
+    }), 200
 
 
 # --- NEW: Authenticated Recruiter Schedule APIs ---
+SCHEDULE_MAX_LIMIT = 500
+
 @app.route('/api/schedule', methods=['GET', 'OPTIONS'])
 def get_schedule():
-    """Returns all invited candidates with scheduling/status info."""
+    """
+    Returns candidates with scheduling/status info and email in one query,
+    most recently invited first. Optional query parameters: recruiter,
+    interviewer and status filters, limit (max 500; all rows when omitted)
+    and cursor (next_cursor of the previous page).
+    """
     if request.method == 'OPTIONS':
         return jsonify({'status': 'ok'}), 200
 
@@ -1805,56 +5181,49 @@ def get_schedule():
     if not RECRUITER_KEY or provided_key != RECRUITER_KEY:
         return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
 
+    filters = {}
+    for name in ApplicationStore.SCHEDULE_FILTERS:
+        value = request.args.get(name)
+        if value is not None and value.strip() != '':
+            filters[name] = value.strip()
+    limit = request.args.get('limit')
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT a.app_id,
-                   COALESCE(i.recruiter, '') AS recruiter,
-                   COALESCE(i.interviewer, '') AS interviewer,
-                   COALESCE(i.job_title, a.job_title) AS job_title,
-                   COALESCE(i.source, '') AS source,
-                   COALESCE(i.phone_status, 'Pending') AS phone_status,
-                   COALESCE(i.inperson_status, 'Pending') AS inperson_status,
-                   COALESCE(i.invited_at, '') AS invited_at,
-                   COALESCE(i.application_status, 'Open') AS application_status,
-                   COALESCE(i.rsvp_status, 'Pending') AS rsvp_status
-            FROM applications a
-            LEFT JOIN invites i ON i.app_id = a.app_id
-            ORDER BY COALESCE(i.invited_at, '') DESC
-        ''')
-        rows = cursor.fetchall()
-        # Also fetch applicant email for direct mailto links
-        items = []
-        for r in rows:
-            email_value = ''
-            try:
-                c2 = conn.cursor()
-                c2.execute("SELECT applicant_data FROM applications WHERE app_id = ?", (r['app_id'],))
-                arow = c2.fetchone()
-                if arow and arow['applicant_data']:
-                    adata = json.loads(arow['applicant_data'])
-                    email_value = (adata.get('communication') or {}).get('email') or ''
-            except Exception as _e:
-                email_value = ''
-
-            items.append({
-                'App_ID': r['app_id'],
-                'Recruiter': r['recruiter'],
-                'Interviewer': r['interviewer'],
-                'Job_Title': r['job_title'],
-                'Source': r['source'],
-                'Phone_Status': r['phone_status'],
-                'Inperson_Status': r['inperson_status'],
-                'Invited_At': r['invited_at'],
-                'Application_Status': r['application_status'],
-                'Rsvp_Status': r['rsvp_status'],
-                'Email': email_value
-            })
-
-        conn.close()
+        limit = max(1, min(int(limit), SCHEDULE_MAX_LIMIT)) if limit not in (None, '') else None
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'limit must be an integer'}), 400
+    try:
+        cursor_value = request.args.get('cursor')
+        after = _decode_cursor(cursor_value, 2) if cursor_value else None
+        if after is not None and not all(isinstance(v, str) for v in after):
+            raise ValueError('Invalid cursor')
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
 
-        return jsonify({'status': 'success', 'schedule': items}), 200
+    try:
+        rows, total = application_store.list_schedule(filters, after, limit + 1 if limit is not None else None)
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1]['invited_at'], rows[-1]['app_id'])
+        items = [{
+            'App_ID': r['app_id'],
+            'Recruiter': r['recruiter'],
+            'Interviewer': r['interviewer'],
+            'Job_Title': r['job_title'],
+            'Source': r['source'],
+            'Phone_Status': r['phone_status'],
+            'Inperson_Status': r['inperson_status'],
+            'Invited_At': r['invited_at'],
+            'Application_Status': r['application_status'],
+            'Rsvp_Status': r['rsvp_status'],
+            'Email': r['email']
+        } for r in rows]
+
+        response = {'status': 'success', 'schedule': items}
+        if limit is not None:
+            response.update({'total': total, 'next_cursor': next_cursor})
+        return jsonify(response), 200
     except Exception as e:
         print(f"Error retrieving schedule: {e}")
         return jsonify({'status': 'error', 'message': 'Failed to load schedule'}), 500
@@ -1898,11 +5267,7 @@ def update_schedule(app_id):
         should_auto_select = False
         if 'application_status' not in payload:
             # Check current statuses from database to determine final state
-            conn_check = get_db_connection()
-            cursor_check = conn_check.cursor()
-            cursor_check.execute("SELECT phone_status, inperson_status FROM invites WHERE app_id = ?", (app_id,))
-            existing_row = cursor_check.fetchone()
-            conn_check.close()
+            existing_row = application_store.get_invite(app_id)
             
             # Determine the final statuses after update
             final_phone = phone_status_value if 'phone_status' in payload else (normalize_status(existing_row['phone_status']) if existing_row else None)
@@ -1927,10 +5292,10 @@ def update_schedule(app_id):
                 # Normalize status values for phone_status and inperson_status
                 if key in ('phone_status', 'inperson_status'):
                     normalized = normalize_status(payload[key])
-                    fields.append(f"{column} = ?")
+                    fields.append(column)
                     values.append(normalized)
                 else:
-                    fields.append(f"{column} = ?")
+                    fields.append(column)
                     values.append(payload[key])
         
         # Add application_status based on auto-update logic
@@ -1938,33 +5303,25 @@ def update_schedule(app_id):
         if should_auto_reject:
             # Only add if not already in the update list
             if 'application_status' not in payload:
-                fields.append("application_status = ?")
+                fields.append("application_status")
                 values.append('Rejected')
         elif should_auto_select:
             # Only add if not already in the update list
             if 'application_status' not in payload:
-                fields.append("application_status = ?")
+                fields.append("application_status")
                 values.append('Selected')
 
         if not fields:
             return jsonify({'status': 'error', 'message': 'No updatable fields provided'}), 400
 
-        values.append(app_id)
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        # Ensure row exists for this app_id
-        cursor.execute("INSERT OR IGNORE INTO invites (app_id, recruiter, interviewer, job_title, source, resume_status, phone_status, inperson_status, invited_at, application_status) VALUES (?, '', '', (SELECT job_title FROM applications WHERE app_id = ?), '', 'Pending', 'Pending', 'Pending', datetime('now'), 'Open')", (app_id, app_id))
-        cursor.execute(f"UPDATE invites SET {', '.join(fields)} WHERE app_id = ?", values)
-        conn.commit()
-        updated = cursor.rowcount
-        conn.close()
+        updated = application_store.update_invite(app_id, dict(zip(fields, values)))
         if updated == 0:
             return jsonify({'status': 'error', 'message': 'Invite not found'}), 404
-        # Best-effort: regenerate Excel workbook so Selected/Rejected sheets stay updated
+        # Best-effort: the Selected/Rejected sheets are rebuilt in the background
         try:
-            _generate_and_write_excel()
+            mark_export_dirty()
         except Exception as _e:
-            print(f"Warning: failed to auto-regenerate Excel after schedule update: {_e}")
+            print(f"Warning: failed to schedule Excel rebuild after schedule update: {_e}")
         return jsonify({'status': 'success'}), 200
     except Exception as e:
         print(f"Error updating schedule {app_id}: {e}")
@@ -1994,11 +5351,7 @@ def send_status_email_endpoint(app_id):
             return jsonify({'status': 'error', 'message': 'Missing required fields: interview_date, interview_time, process_status'}), 400
 
         # Get applicant details
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT applicant_data, job_title FROM applications WHERE app_id = ?", (app_id,))
-        row = cursor.fetchone()
-        conn.close()
+        row = application_store.get_application(app_id)
 
         if row is None:
             return jsonify({'status': 'error', 'message': 'Application ID not found.'}), 404
@@ -2012,34 +5365,33 @@ def send_status_email_endpoint(app_id):
             return jsonify({'status': 'error', 'message': 'Applicant email address not found.'}), 400
 
         # Ensure RSVP token (create if missing)
-        token = None
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            # Ensure invites row
-            cursor.execute("INSERT OR IGNORE INTO invites (app_id, recruiter, interviewer, job_title, source, resume_status, phone_status, inperson_status, invited_at, application_status) VALUES (?, '', '', ?, '', 'Pending', 'Pending', 'Pending', datetime('now'), 'Open')", (app_id, job_title))
-            # Try fetch token
-            cursor.execute("SELECT rsvp_token FROM invites WHERE app_id = ?", (app_id,))
-            row = cursor.fetchone()
-            token = (row['rsvp_token'] if row else None)
-            if not token:
-                token = os.urandom(16).hex()
-                cursor.execute("UPDATE invites SET rsvp_token = ?, invited_at = datetime('now') WHERE app_id = ?", (token, app_id))
-            conn.commit()
-            conn.close()
+            token = application_store.ensure_rsvp_token(app_id, job_title)
         except Exception as _e:
             print(f"Warning: failed to generate RSVP token for {app_id}: {_e}")
             token = os.urandom(16).hex()
+        try:
+            mark_export_dirty()
+        except Exception as _e:
+            print(f"Warning: failed to schedule Excel rebuild for {app_id}: {_e}")
 
-        # Send email (inject token into body template)
-        if send_status_email(applicant_email, applicant_name, job_title, app_id, process_status, interview_date, interview_time, additional_notes, rsvp_token=token):
-            return jsonify({
-                'status': 'success',
-                'message': f'Status email sent successfully to {applicant_name}',
-                'applicant_name': applicant_name
-            }), 200
-        else:
-            return jsonify({'status': 'error', 'message': 'Failed to send email via SMTP.'}), 500
+        if not _smtp_configured():
+            return jsonify({'status': 'error', 'message': 'Email disabled or SMTP credentials missing.'}), 500
+
+        # Queue email (inject token into body template); identical resends are deduplicated
+        context = status_email_context(applicant_name, job_title, app_id, process_status, interview_date, interview_time, additional_notes, token)
+        msg = email_message(render_email_batch('status', [context])[0], applicant_email, reply_to=os.getenv("EMAIL_HOST_USER"))
+        content_key = hashlib.sha256(json.dumps(context, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        conn = get_request_db()
+        email_id, queued = enqueue_email(conn, msg, app_id, 'status', f"{app_id}:status:{content_key}")
+        conn.commit()
+        return jsonify({
+            'status': 'success',
+            'message': f'Status email queued for {applicant_name}' if queued else f'This status email was already queued or sent to {applicant_name}',
+            'applicant_name': applicant_name,
+            'email_id': email_id,
+            'duplicate': not queued
+        }), 200
 
     except Exception as e:
         print(f"Error sending status email for {app_id}: {e}")
@@ -2061,17 +5413,12 @@ def get_applicant_email(app_id):
         return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT applicant_data FROM applications WHERE app_id = ?", (app_id,))
-        row = cursor.fetchone()
-        conn.close()
+        row = application_store.get_application(app_id)
 
         if row is None:
             return jsonify({'status': 'error', 'message': 'Application ID not found.'}), 404
 
-        applicant_data = json.loads(row['applicant_data'])
-        applicant_email = applicant_data.get('communication', {}).get('email')
+        applicant_email = row['email']
 
         if not applicant_email:
             return jsonify({'status': 'error', 'message': 'Applicant email address not found.'}), 404
@@ -2086,6 +5433,291 @@ def get_applicant_email(app_id):
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
+# --- Database Connection Pool Metrics ---
+@app.route('/api/db_pool', methods=['GET', 'OPTIONS'])
+def get_db_pool_stats():
+    """Returns this worker process's SQLite connection pool counters."""
+    if request.method == 'OPTIONS':
+        return jsonify({'status': 'ok'}), 200
+
+    provided_key = request.headers.get('X-Recruiter-Key')
+    if not RECRUITER_KEY or provided_key != RECRUITER_KEY:
+        return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
+
+    return jsonify({'status': 'success', 'pool': db_pool_stats()}), 200
+
+
+@app.route('/api/smtp_pool', methods=['GET', 'OPTIONS'])
+def get_smtp_pool_stats():
+    """Returns this worker process's SMTP session pool counters and send latency."""
+    if request.method == 'OPTIONS':
+        return jsonify({'status': 'ok'}), 200
+
+    provided_key = request.headers.get('X-Recruiter-Key')
+    if not RECRUITER_KEY or provided_key != RECRUITER_KEY:
+        return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
+
+    return jsonify({'status': 'success', 'pool': smtp_pool_stats()}), 200
+
+
+EMAIL_OUTBOX_MAX_LIMIT = 500
+
+@app.route('/api/email_outbox', methods=['GET', 'OPTIONS'])
+def list_email_outbox():
+    """
+    Lists outbox emails, newest first, with counts per status. Optional query
+    parameters: status (queued, sending, sent, failed), app_id, template,
+    limit (default 50, max 500) and before (next_before of the previous page).
+    """
+    if request.method == 'OPTIONS':
+        return jsonify({'status': 'ok'}), 200
+
+    provided_key = request.headers.get('X-Recruiter-Key')
+    if not RECRUITER_KEY or provided_key != RECRUITER_KEY:
+        return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
+
+    try:
+        limit = max(1, min(int(request.args.get('limit') or 50), EMAIL_OUTBOX_MAX_LIMIT))
+        before = int(request.args['before']) if request.args.get('before') else None
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'limit and before must be integers'}), 400
+    clauses, params = [], []
+    for name in ('status', 'app_id', 'template'):
+        value = (request.args.get(name) or '').strip()
+        if value:
+            clauses.append(f"{name} = ?")
+            params.append(value)
+    if before is not None:
+        clauses.append("id < ?")
+        params.append(before)
+    where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    conn = get_request_db()
+    rows = conn.execute(f"SELECT * FROM email_outbox {where_sql} ORDER BY id DESC LIMIT ?", params + [limit + 1]).fetchall()
+    counts = {r['status']: r['n'] for r in conn.execute("SELECT status, COUNT(*) AS n FROM email_outbox GROUP BY status")}
+    next_before = rows[limit - 1]['id'] if len(rows) > limit else None
+    return jsonify({
+        'status': 'success',
+        'counts': counts,
+        'emails': [email_outbox_row(r) for r in rows[:limit]],
+        'next_before': next_before,
+    }), 200
+
+
+@app.route('/api/email_outbox/<int:email_id>', methods=['GET', 'OPTIONS'])
+def get_email_outbox_entry(email_id):
+    """Returns the delivery status of one outbox email."""
+    if request.method == 'OPTIONS':
+        return jsonify({'status': 'ok'}), 200
+
+    provided_key = request.headers.get('X-Recruiter-Key')
+    if not RECRUITER_KEY or provided_key != RECRUITER_KEY:
+        return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
+
+    row = get_request_db().execute("SELECT * FROM email_outbox WHERE id = ?", (email_id,)).fetchone()
+    if row is None:
+        return jsonify({'status': 'error', 'message': 'Email not found'}), 404
+    return jsonify({'status': 'success', 'email': email_outbox_row(row)}), 200
+
+
+@app.route('/api/email_outbox/<int:email_id>/retry', methods=['POST', 'OPTIONS'])
+def retry_email_outbox_entry(email_id):
+    """Queues a failed outbox email for another round of delivery attempts."""
+    if request.method == 'OPTIONS':
+        return jsonify({'status': 'ok'}), 200
+
+    provided_key = request.headers.get('X-Recruiter-Key')
+    if not RECRUITER_KEY or provided_key != RECRUITER_KEY:
+        return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
+
+    conn = get_request_db()
+    cursor = conn.execute(
+        "UPDATE email_outbox SET status = 'queued', attempts = 0, run_after = ?, updated_at = datetime('now') WHERE id = ? AND status = 'failed'",
+        (time.time(), email_id)
+    )
+    conn.commit()
+    if cursor.rowcount == 0:
+        row = conn.execute("SELECT status FROM email_outbox WHERE id = ?", (email_id,)).fetchone()
+        if row is None:
+            return jsonify({'status': 'error', 'message': 'Email not found'}), 404
+        return jsonify({'status': 'error', 'message': f"Only failed emails can be retried (status: {row['status']})"}), 409
+    _email_wakeup.set()
+    return jsonify({'status': 'success'}), 200
+
+
+def _email_template_json(row):
+    return {
+        'name': row['name'],
+        'subject': row['subject'],
+        'text_body': row['text_body'],
+        'html_body': row['html_body'],
+        'version': row['version'],
+        'updated_at': row['updated_at'],
+    }
+
+
+@app.route('/api/email_templates', methods=['GET', 'OPTIONS'])
+def list_email_templates():
+    """Lists the email templates and the variables they can use."""
+    if request.method == 'OPTIONS':
+        return jsonify({'status': 'ok'}), 200
+
+    provided_key = request.headers.get('X-Recruiter-Key')
+    if not RECRUITER_KEY or provided_key != RECRUITER_KEY:
+        return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
+
+    rows = get_request_db().execute("SELECT * FROM email_templates ORDER BY name").fetchall()
+    return jsonify({
+        'status': 'success',
+        'templates': [_email_template_json(r) for r in rows],
+        'variables': sorted(EMAIL_TEMPLATE_SAMPLE_CONTEXT),
+    }), 200
+
+
+@app.route('/api/email_templates/<name>', methods=['GET', 'PUT', 'OPTIONS'])
+def email_template(name):
+    """
+    GET returns a template. PUT updates any of subject, text_body and html_body
+    (null or empty html_body removes the HTML part); templates that do not
+    compile are rejected.
+    """
+    if request.method == 'OPTIONS':
+        return jsonify({'status': 'ok'}), 200
+
+    provided_key = request.headers.get('X-Recruiter-Key')
+    if not RECRUITER_KEY or provided_key != RECRUITER_KEY:
+        return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
+
+    conn = get_request_db()
+    row = conn.execute("SELECT * FROM email_templates WHERE name = ?", (name,)).fetchone()
+    if row is None:
+        return jsonify({'status': 'error', 'message': 'Template not found'}), 404
+    if request.method == 'GET':
+        return jsonify({'status': 'success', 'template': _email_template_json(row)}), 200
+
+    payload = request.get_json(silent=True) or {}
+    subject = payload.get('subject', row['subject'])
+    text_body = payload.get('text_body', row['text_body'])
+    html_body = payload.get('html_body', row['html_body']) or None
+    if not isinstance(subject, str) or not subject.strip() or not isinstance(text_body, str) or not text_body.strip():
+        return jsonify({'status': 'error', 'message': 'subject and text_body must be non-empty strings'}), 400
+    if html_body is not None and not isinstance(html_body, str):
+        return jsonify({'status': 'error', 'message': 'html_body must be a string or null'}), 400
+    try:
+        template = compile_email_template(name, subject, text_body, html_body)
+    except jinja2.TemplateSyntaxError as e:
+        return jsonify({'status': 'error', 'message': f'Template syntax error (line {e.lineno}): {e.message}'}), 400
+    # A trial render catches sandbox violations and runtime errors before the template is stored
+    try:
+        render_email_batch(template, [EMAIL_TEMPLATE_SAMPLE_CONTEXT])
+    except jinja2.sandbox.SecurityError as e:
+        return jsonify({'status': 'error', 'message': f'Template not allowed: {e}'}), 400
+    except jinja2.TemplateError as e:
+        return jsonify({'status': 'error', 'message': f'Template error: {e}'}), 400
+
+    conn.execute(
+        "UPDATE email_templates SET subject = ?, text_body = ?, html_body = ?, version = version + 1, updated_at = datetime('now') WHERE name = ?",
+        (subject, text_body, html_body, name)
+    )
+    conn.commit()
+    row = conn.execute("SELECT * FROM email_templates WHERE name = ?", (name,)).fetchone()
+    _cache_email_template(row)
+    return jsonify({'status': 'success', 'template': _email_template_json(row)}), 200
+
+
+@app.route('/api/email_templates/<name>/preview', methods=['POST', 'OPTIONS'])
+def preview_email_template(name):
+    """
+    Renders a template without sending it. Body (all optional): app_id to use
+    that applicant's name and job title, context with variables to override,
+    and subject/text_body/html_body to preview unsaved edits.
+    """
+    if request.method == 'OPTIONS':
+        return jsonify({'status': 'ok'}), 200
+
+    provided_key = request.headers.get('X-Recruiter-Key')
+    if not RECRUITER_KEY or provided_key != RECRUITER_KEY:
+        return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
+
+    row = get_request_db().execute("SELECT * FROM email_templates WHERE name = ?", (name,)).fetchone()
+    if row is None:
+        return jsonify({'status': 'error', 'message': 'Template not found'}), 404
+    payload = request.get_json(silent=True) or {}
+
+    context = dict(EMAIL_TEMPLATE_SAMPLE_CONTEXT)
+    if payload.get('app_id'):
+        application = application_store.get_application(payload['app_id'])
+        if application is None:
+            return jsonify({'status': 'error', 'message': 'Application ID not found.'}), 404
+        applicant_data = json.loads(application['applicant_data']) if application['applicant_data'] else {}
+        context.update(app_id=application['app_id'], job_title=application['job_title'],
+                       applicant_name=applicant_data.get('personal', {}).get('firstName', 'Applicant'))
+    if not isinstance(payload.get('context', {}), dict):
+        return jsonify({'status': 'error', 'message': 'context must be an object'}), 400
+    context.update(payload.get('context', {}))
+
+    html_body = payload.get('html_body', row['html_body']) or None
+    try:
+        template = compile_email_template(name, payload.get('subject', row['subject']),
+                                          payload.get('text_body', row['text_body']), html_body)
+        rendered = render_email_batch(template, [context])[0]
+    except jinja2.sandbox.SecurityError as e:
+        return jsonify({'status': 'error', 'message': f'Template not allowed: {e}'}), 400
+    except jinja2.TemplateError as e:
+        return jsonify({'status': 'error', 'message': f'Template error: {e}'}), 400
+    return jsonify({
+        'status': 'success',
+        'subject': rendered.subject,
+        'text_body': rendered.text,
+        'html_body': rendered.html,
+    }), 200
+
+
+# --- Applicant Search Endpoint (indexed extracted fields) ---
+@app.route('/api/applications/search', methods=['GET', 'OPTIONS'])
+def search_applications():
+    """
+    Finds applications by exact (case-insensitive) email, job_title, source,
+    degree, branch, institution, company or work_title. Filters combine with
+    AND. Pages by App_ID: pass next_after as 'after' for the next page.
+    """
+    if request.method == 'OPTIONS':
+        return jsonify({'status': 'ok'}), 200
+
+    provided_key = request.headers.get('X-Recruiter-Key')
+    if not RECRUITER_KEY or provided_key != RECRUITER_KEY:
+        return jsonify({'status': 'error', 'message': 'Access Denied: Invalid or missing recruiter credentials.'}), 401
+
+    filters = {}
+    for name in APPLICATION_SEARCH_FIELDS:
+        value = (request.args.get(name) or '').strip()
+        if value:
+            filters[name] = value
+    if not filters:
+        return jsonify({'status': 'error', 'message': f"Provide at least one of: {', '.join(APPLICATION_SEARCH_FIELDS)}"}), 400
+    try:
+        limit = max(1, min(int(request.args.get('limit') or 100), 500))
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'limit must be an integer'}), 400
+
+    try:
+        rows = application_store.search_applications(filters, request.args.get('after'), limit + 1)
+
+        next_after = rows[limit - 1]['app_id'] if len(rows) > limit else None
+        results = [{
+            'App_ID': r['app_id'],
+            'Job_Title': r['job_title'],
+            'Email': r['email'] or '',
+            'First_Name': r['first_name'] or '',
+            'Last_Name': r['last_name'] or '',
+            'Source': r['source'] or ''
+        } for r in rows[:limit]]
+        return jsonify({'status': 'success', 'applications': results, 'next_after': next_after}), 200
+    except Exception as e:
+        print(f"Error searching applications: {e}")
+        return jsonify({'status': 'error', 'message': f'Failed to search applications: {str(e)}'}), 500
+
+
 # --- NEW: Public RSVP endpoint for applicants ---
 @app.route('/rsvp/<token>', methods=['GET'])
 def handle_rsvp(token):
@@ -2095,18 +5727,15 @@ def handle_rsvp(token):
         response_value = 'unknown'
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT app_id FROM invites WHERE rsvp_token = ?", (token,))
-        row = cursor.fetchone()
-        if not row:
-            return '<h3>Invalid or expired RSVP link.</h3>', 404
-        app_id = row['app_id']
         # Map friendly status
         status = 'Accepted' if response_value == 'accept' else ('Declined' if response_value == 'decline' else 'Unknown')
-        cursor.execute("UPDATE invites SET rsvp_status = ?, rsvp_response_at = datetime('now') WHERE app_id = ?", (status, app_id))
-        conn.commit()
-        conn.close()
+        app_id = application_store.record_rsvp(token, status)
+        if app_id is None:
+            return '<h3>Invalid or expired RSVP link.</h3>', 404
+        try:
+            mark_export_dirty()
+        except Exception as _e:
+            print(f"Warning: failed to schedule Excel rebuild after RSVP: {_e}")
 
         html = f"""
         <!DOCTYPE html>
@@ -2121,7 +5750,6 @@ def handle_rsvp(token):
         </div>
         </body></html>
         """
-        from flask import Response
         return Response(html, mimetype='text/html')
     except Exception as e:
         print(f"Error handling RSVP for token {token}: {e}")
@@ -2133,4 +5761,9 @@ if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     # Only run in debug mode if explicitly set in environment
     debug_mode = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
+    # Background job and email outbox workers run in the serving process only
+    # (under the debug reloader, that is the child it restarts)
+    if not debug_mode or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_job_workers()
+        start_email_workers()
     app.run(debug=debug_mode, host='0.0.0.0', port=port)
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""
+Benchmarks resume section detection: the single-pass segment_resume() in
+backend.py against the regex searches it replaced, on an ordinary resume and
+on inputs that make the old whitespace and lazy-match patterns backtrack.
+
+    python bench_segmenter.py [--size CHARS] [--repeat N]
+
+Importing backend initializes its database, so the benchmark runs in a
+temporary directory.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Section patterns used by find_highlighted_sections / highlight_text_in_resume
+# before the segmenter, kept here as the baseline
+LEGACY_SEARCH_PATTERNS = [
+    r'skills?\s*[:]?\s*\n(.+?)(?=\n\n|\n[A-Z]|\n[0-9]|$)',
+    r'technical\s+skills?\s*[:]?\s*\n(.+?)(?=\n\n|\n[A-Z]|$)',
+    r'core\s+skills?\s*[:]?\s*\n(.+?)(?=\n\n|\n[A-Z]|$)',
+    r'technologies?\s*[:]?\s*\n(.+?)(?=\n\n|\n[A-Z]|$)',
+    r'experience\s*[:]?\s*\n(.+?)(?=\n\n[A-Z][a-z]+\s*[:]?|\n\nEducation|\n\nSkills|$)',
+    r'work\s+experience\s*[:]?\s*\n(.+?)(?=\n\n[A-Z][a-z]+\s*[:]?|\n\nEducation|\n\nSkills|$)',
+    r'professional\s+experience\s*[:]?\s*\n(.+?)(?=\n\n[A-Z][a-z]+\s*[:]?|\n\nEducation|\n\nSkills|$)',
+    r'education\s*[:]?\s*\n(.+?)(?=\n\n[A-Z][a-z]+\s*[:]?|\n\nSkills|$)',
+    r'academic\s+qualification\s*[:]?\s*\n(.+?)(?=\n\n[A-Z][a-z]+\s*[:]?|\n\nSkills|$)',
+]
+LEGACY_PROJECT_PATTERNS = [
+    r'(project[s]?[:]?\s*\n.*?)(?=\n\n|\n[A-Z][a-z]+|$)',
+    r'(key\s+project[s]?[:]?\s*\n.*?)(?=\n\n|\n[A-Z][a-z]+|$)',
+    r'(notable\s+project[s]?[:]?\s*\n.*?)(?=\n\n|\n[A-Z][a-z]+|$)',
+    r'(portfolio\s+project[s]?[:]?\s*\n.*?)(?=\n\n|\n[A-Z][a-z]+|$)',
+]
+
+SAMPLE_RESUME = """Jane Doe
+jane.doe@example.com | +1 555 0100
+
+Summary
+Backend engineer with six years of Python and cloud experience.
+
+Technical Skills:
+Python, Django, Flask, PostgreSQL, Docker, Kubernetes, AWS, React
+
+Work Experience
+Senior Python Developer, Acme Corp (2020 - 2024)
+Responsibilities:
+- Built REST APIs and data pipelines on AWS
+- Led the migration to Kubernetes
+
+Python Developer, Globex (2018 - 2020)
+- Maintained Django services and CI pipelines
+
+Projects
+Resume parser: extracted structured data from PDFs with Python
+Dashboard: React front end backed by a Flask API
+
+Education
+BSc Computer Science, MIT (2014 - 2018)
+
+Certifications
+AWS Certified Developer
+"""
+
+
+def legacy_sections(text):
+    """Runs the old searches the way the highlight code did (one search per pattern, all project matches)."""
+    found = [re.search(p, text, re.IGNORECASE | re.DOTALL) for p in LEGACY_SEARCH_PATTERNS]
+    for pattern in LEGACY_PROJECT_PATTERNS:
+        found.extend(re.finditer(pattern, text, re.IGNORECASE | re.DOTALL))
+    return found
+
+
+def inputs(size):
+    """(name, text) pairs: ordinary and long resumes, then backtracking cases."""
+    repeats = max(1, size // len(SAMPLE_RESUME))
+    return [
+        ('sample resume', SAMPLE_RESUME),
+        ('long resume (sample repeated)', SAMPLE_RESUME * repeats),
+        # '\s*[:]?\s*\n' retries every split of a whitespace run that never reaches a newline
+        ('heading + whitespace run, no newline', 'Skills' + ' ' * size + 'python'),
+        ('many headings followed by spaces', ('experience' + ' ' * 60 + 'x ') * max(1, size // 72)),
+        # The lazy bodies rescan to the end of the text looking for a terminator that never comes
+        ('heading, then one unbroken line', 'Projects\n' + 'python docker ' * max(1, size // 14)),
+        ('lowercase lines, no blank lines', 'skills\n' + 'python and docker\n' * max(1, size // 18)),
+    ]
+
+
+def best_time(func, text, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--size', type=int, default=20000, help='Approximate length of the generated inputs (default: 20000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per input; the best is reported (default: 3)')
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    os.chdir(tempfile.mkdtemp(prefix='bench_segmenter_'))
+    import backend
+
+    print(f"{'input':<40} {'chars':>8} {'regex ms':>10} {'segmenter ms':>13} {'speedup':>8}")
+    for name, text in inputs(args.size):
+        legacy_ms = best_time(legacy_sections, text, args.repeat)
+        segment_ms = best_time(backend.segment_resume, text, args.repeat)
+        speedup = legacy_ms / segment_ms if segment_ms else float('inf')
+        print(f"{name:<40} {len(text):>8} {legacy_ms:>10.2f} {segment_ms:>13.3f} {speedup:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+# Gunicorn settings for backend:app (gunicorn -c gunicorn.conf.py backend:app)
+
+
+def post_fork(server, worker):
+    # Each worker process runs its own background job and email outbox threads.
+    # They are started here rather than on import, so the Flask CLI and other
+    # scripts importing backend do not start them.
+    import backend
+    backend.start_job_workers()
+    backend.start_email_workers()
@@ -1,10 +1,15 @@
 const RECRUITER_KEY = "YourVerySecretRecruiterKey12345";
 const BASE_URL = window.location.origin || "";
-const SHORTLISTED_APPLICANTS = []; // Current filtered set for "Invite All"
-const ALL_APPLICATIONS = []; // Full list from backend
+const PAGE_SIZE = 50;
+const BULK_INVITE_MAX = 500; // Applicants per /api/invite_applicants request
+let MATCHING_TOTAL = 0; // Applicants matching the current filters, across all pages
+const PAGE_CURSORS = [null]; // Cursor of each visited page; last entry is the current page
+let NEXT_CURSOR = null;
+let SEARCH_TIMER = null;
 
 /**
- * Calls the API, fetches filtered and scored applications, and builds the table.
+ * Calls the API, fetches one page of scored applications matching the current
+ * filters (filtering, sorting and paging happen server-side), and builds the table.
  */
 async function loadRecruiterDashboard() {
     const tableBody = document.getElementById('applications-table-body');
@@ -12,13 +17,19 @@ async function loadRecruiterDashboard() {
     const inviteAllButton = document.getElementById('invite-all-button');
     
     tableBody.innerHTML = '';
-    SHORTLISTED_APPLICANTS.length = 0;
-    ALL_APPLICATIONS.length = 0;
+    MATCHING_TOTAL = 0;
     loadingMessage.textContent = 'Loading and scoring applications...';
     inviteAllButton.disabled = true;
 
+    const { minScore, searchTerm } = currentFilters();
+    const params = new URLSearchParams({ limit: PAGE_SIZE, sort: 'score_desc' });
+    if (minScore > 0) params.set('min_score', minScore);
+    if (searchTerm) params.set('search', searchTerm);
+    const cursor = PAGE_CURSORS[PAGE_CURSORS.length - 1];
+    if (cursor) params.set('cursor', cursor);
+
     try {
-        const response = await fetch(`${BASE_URL}/api/scored_applications`, {
+        const response = await fetch(`${BASE_URL}/api/scored_applications?${params}`, {
             method: 'GET',
             headers: {
                 'X-Recruiter-Key': RECRUITER_KEY,
@@ -34,11 +45,12 @@ async function loadRecruiterDashboard() {
         const data = await response.json();
 
         if (data.status === 'success' && Array.isArray(data.applications)) {
-            // Store all applications and render with current filter (default 0)
-            data.applications.forEach(a => ALL_APPLICATIONS.push(a));
-            applyFilters();
-            loadingMessage.textContent = `Loaded ${ALL_APPLICATIONS.length} applications.`;
-            inviteAllButton.disabled = false;
+            NEXT_CURSOR = data.next_cursor;
+            MATCHING_TOTAL = data.total;
+            renderTable(data.applications);
+            updatePageStatus(data.applications.length, data.total, minScore, searchTerm);
+            loadingMessage.textContent = `Loaded ${data.applications.length} of ${data.total} applications.`;
+            inviteAllButton.disabled = data.total === 0;
         } else {
             loadingMessage.textContent = data.message || 'No applications found.';
         }
@@ -48,16 +60,47 @@ async function loadRecruiterDashboard() {
     }
 }
 
+function currentFilters() {
+    return {
+        minScore: Math.max(0, Math.min(100, parseInt(document.getElementById('min-score').value || '0', 10))),
+        searchTerm: (document.getElementById('search-app-id').value || '').trim()
+    };
+}
+
+function updatePageStatus(pageCount, total, minScore, searchTerm) {
+    const currentFilter = document.getElementById('current-filter');
+    const first = (PAGE_CURSORS.length - 1) * PAGE_SIZE;
+    let statusMsg = pageCount ? `Showing ${first + 1}-${first + pageCount} of ${total}` : `Showing 0 of ${total}`;
+    if (minScore > 0) {
+        statusMsg += ` (Min Score: ${minScore})`;
+    }
+    if (searchTerm) {
+        statusMsg += ` (Search: "${searchTerm}")`;
+    }
+    currentFilter.textContent = statusMsg;
+    document.getElementById('prev-page').disabled = PAGE_CURSORS.length <= 1;
+    document.getElementById('next-page').disabled = !NEXT_CURSOR;
+}
+
+function nextPage() {
+    if (!NEXT_CURSOR) return;
+    PAGE_CURSORS.push(NEXT_CURSOR);
+    loadRecruiterDashboard();
+}
+
+function prevPage() {
+    if (PAGE_CURSORS.length <= 1) return;
+    PAGE_CURSORS.pop();
+    loadRecruiterDashboard();
+}
+
 function renderTable(applications) {
     const tableBody = document.getElementById('applications-table-body');
     tableBody.innerHTML = '';
-    SHORTLISTED_APPLICANTS.length = 0;
 
     applications.forEach(app => {
         const row = tableBody.insertRow();
 
-        SHORTLISTED_APPLICANTS.push(app.App_ID);
-
         row.insertCell().textContent = app.App_ID;
         row.insertCell().textContent = app.Job_Title;
 
@@ -115,34 +158,14 @@ function renderTable(applications) {
 }
 
 function applyFilters() {
-    const minScoreInput = document.getElementById('min-score');
-    const searchInput = document.getElementById('search-app-id');
-    const currentFilter = document.getElementById('current-filter');
-    
-    const minScore = Math.max(0, Math.min(100, parseInt(minScoreInput.value || '0', 10)));
-    const searchTerm = (searchInput.value || '').trim().toLowerCase();
-    
-    let filtered = ALL_APPLICATIONS.filter(a => {
-        // Apply score filter
-        const scoreMatch = (a.ATS_Score || 0) >= minScore;
-        
-        // Apply search filter (case-insensitive partial match)
-        const searchMatch = !searchTerm || (a.App_ID || '').toLowerCase().includes(searchTerm);
-        
-        return scoreMatch && searchMatch;
-    });
-    
-    renderTable(filtered);
-    
-    // Update status message
-    let statusMsg = `Showing ${filtered.length}/${ALL_APPLICATIONS.length}`;
-    if (minScore > 0) {
-        statusMsg += ` (Min Score: ${minScore})`;
-    }
-    if (searchTerm) {
-        statusMsg += ` (Search: "${searchTerm}")`;
-    }
-    currentFilter.textContent = statusMsg;
+    // Restart from the first page whenever the filters change
+    PAGE_CURSORS.length = 1;
+    loadRecruiterDashboard();
+}
+
+function onSearchInput() {
+    clearTimeout(SEARCH_TIMER);
+    SEARCH_TIMER = setTimeout(applyFilters, 300);
 }
 
 function clearFilters() {
@@ -367,7 +390,7 @@ async function sendInterviewInvite(appId, buttonElement) {
     const data = await response.json();
     
     if (data.status === 'success') {
-        buttonElement.textContent = 'Sent! ✅';
+        buttonElement.textContent = 'Queued ✅';
         buttonElement.style.backgroundColor = '#198754'; // Success color
     } else {
         alert('Failed to send invite: ' + data.message);
@@ -377,46 +400,71 @@ async function sendInterviewInvite(appId, buttonElement) {
 }
 
 /**
- * Sends an invite to ALL applicants listed in the table using the global SHORTLISTED_APPLICANTS array.
+ * Queues invites for ALL applicants matching the current filters (every page,
+ * not just the one shown) with one /api/invite_applicants request.
  */
 async function sendInviteToAllShortlisted() {
     const inviteAllButton = document.getElementById('invite-all-button');
     const statusDiv = document.getElementById('invite-status-all');
-    
-    const totalCount = SHORTLISTED_APPLICANTS.length;
-    
+    const { minScore, searchTerm } = currentFilters();
+
+    const totalCount = MATCHING_TOTAL;
+
     if (totalCount === 0) {
         statusDiv.textContent = "No candidates to invite.";
         return;
     }
-    
+    if (totalCount > BULK_INVITE_MAX) {
+        statusDiv.textContent = `${totalCount} applicants match; raise the minimum score or search to invite at most ${BULK_INVITE_MAX} at once.`;
+        return;
+    }
+
     if (!confirm(`Are you sure you want to send an interview invitation to ALL ${totalCount} shortlisted applicants?`)) {
         return;
     }
 
     // Disable button during process
     inviteAllButton.disabled = true;
-    inviteAllButton.textContent = `Sending 0/${totalCount}...`;
+    inviteAllButton.textContent = `Queueing ${totalCount} invitations...`;
     statusDiv.textContent = 'Starting batch email process...';
-    
-    let sentCount = 0;
-    
-    for (const appId of SHORTLISTED_APPLICANTS) {
-        // Find the corresponding button on the table row
-        const buttonElement = document.querySelector(`[data-app-id="${appId}"]`);
-        
-        // Use the individual invite function
-        await sendInterviewInvite(appId, buttonElement);
-        
-        // Wait a short delay to avoid overwhelming the SMTP server
-        await new Promise(resolve => setTimeout(resolve, 500)); 
-        
-        sentCount++;
-        inviteAllButton.textContent = `Sending ${sentCount}/${totalCount}...`;
+
+    const payload = { min_score: minScore };
+    if (searchTerm) payload.search = searchTerm;
+
+    try {
+        const response = await fetch(`${BASE_URL}/api/invite_applicants`, {
+            method: 'POST',
+            headers: {
+                'X-Recruiter-Key': RECRUITER_KEY,
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(payload)
+        });
+        const data = await response.json();
+
+        if (data.status === 'success') {
+            // Mark the rows of this page that were queued
+            data.results.forEach(result => {
+                const buttonElement = document.querySelector(`[data-app-id="${result.app_id}"]`);
+                if (!buttonElement) return;
+                buttonElement.disabled = true;
+                buttonElement.textContent = result.status === 'success' ? 'Queued ✅' : 'Failed ❌';
+                buttonElement.style.backgroundColor = result.status === 'success' ? '#198754' : '#dc3545';
+            });
+            const duplicates = data.results.filter(r => r.duplicate).length;
+            statusDiv.textContent = `Batch process finished. ${data.queued} invitations queued` +
+                (duplicates ? `, ${duplicates} already queued or sent` : '') +
+                (data.failed ? `, ${data.failed} failed` : '') + '.';
+            inviteAllButton.textContent = `Batch Complete!`;
+        } else {
+            statusDiv.textContent = 'Failed to send invites: ' + data.message;
+            inviteAllButton.textContent = 'Send Interview Invitation to ALL Matching Candidates';
+        }
+    } catch (error) {
+        console.error('Bulk invite error:', error);
+        statusDiv.textContent = 'Error connecting to the backend server. Ensure the server is running.';
+        inviteAllButton.textContent = 'Send Interview Invitation to ALL Matching Candidates';
     }
-    
-    statusDiv.textContent = `Batch process finished. ${sentCount} invitations sent.`;
-    inviteAllButton.textContent = `Batch Complete!`;
     inviteAllButton.disabled = false;
 }
 
@@ -509,7 +557,7 @@ async function showScoreDetails(appId) {
                         <strong>Resume Type Bonus:</strong> ${breakdown.resume_type_score} points
                         ${breakdown.resume_type_score > 0 ? '<span style="color: green;">✓ PDF format</span>' : '<span style="color: #999;">Consider using PDF format</span>'}
                     </div>
-                    ${breakdown.jitter !== 0 ? `<div class="breakdown-item"><strong>Random Factor:</strong> ${breakdown.jitter > 0 ? '+' : ''}${breakdown.jitter} points</div>` : ''}
+                    ${breakdown.jitter !== 0 ? `<div class="breakdown-item"><strong>${breakdown.jitter_mode === 'seeded' ? 'Seeded Factor' : 'Random Factor'}:</strong> ${breakdown.jitter > 0 ? '+' : ''}${breakdown.jitter} points</div>` : ''}
                     <div class="breakdown-item" style="background: #e7f3ff; border-left-color: #007bff;">
                         <strong>Total Score:</strong> ${details.score}% 
                         <span style="float: right; font-size: 1.2em; color: ${details.score >= 80 ? 'green' : (details.score >= 70 ? 'orange' : '#333')};">
@@ -368,7 +368,7 @@ async function sendStatusEmail() {
         const data = await response.json();
         
         if (data.status === 'success') {
-            alert(`Email sent successfully to ${data.applicant_name || 'applicant'}!`);
+            alert(data.message || `Email queued for ${data.applicant_name || 'applicant'}.`);
             closeMailModal();
         } else {
             alert(`Failed to send email: ${data.message || 'Unknown error'}`);
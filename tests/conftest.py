@@ -0,0 +1,78 @@
+import io
+import os
+import sys
+import tempfile
+
+import pytest
+
+# backend.py keeps its database, resumes and Excel export relative to the
+# working directory, so the tests run it from a scratch directory. Importing it
+# does not start the background workers; tests run queued work explicitly.
+# The PostgreSQL store tests use DATABASE_URL if it is set, else a throwaway
+# server from pgserver (requirements-dev.txt); without either they are skipped.
+TEST_DATABASE_URL = os.environ.pop('DATABASE_URL', '')
+if not TEST_DATABASE_URL:
+    try:
+        import pgserver
+    except ImportError:
+        pgserver = None
+    if pgserver is not None:
+        TEST_DATABASE_URL = pgserver.get_server(tempfile.mkdtemp(prefix='mqr-pg-'), cleanup_mode='delete').get_uri()
+os.environ['RECRUITER_API_KEY'] = 'test-recruiter-key'
+os.chdir(tempfile.mkdtemp(prefix='mqr-tests-'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backend  # noqa: E402
+
+RECRUITER_HEADERS = {'X-Recruiter-Key': 'test-recruiter-key'}
+
+
+@pytest.fixture
+def client():
+    return backend.app.test_client()
+
+
+def create_application(client, job_title, first_name='Ann', email='ann@example.com', **fields):
+    """Saves application details through the API and returns the new application ID."""
+    data = {
+        'jobTitle': job_title,
+        'jobDescription': 'We need python, sql and docker skills',
+        'personal': {'firstName': first_name},
+        'communication': {'email': email},
+        'work': [{'title': 'Python developer', 'company': 'Acme', 'startDate': '2020', 'endDate': '2022'}],
+        'education': [{'degree': 'BSc', 'branch': 'Computer Science', 'institution': 'MIT', 'grade': 'A'}],
+    }
+    data.update(fields)
+    response = client.post('/api/save_details', json=data)
+    assert response.status_code in (200, 201), response.get_json()
+    return response.get_json()['application_id']
+
+
+def make_pdf(*pages):
+    """Returns the bytes of a minimal PDF with one page per text (lines split on newlines)."""
+    objects = ['<< /Type /Catalog /Pages 2 0 R >>',
+               '<< /Type /Pages /Kids [%s] /Count %d >>' % (' '.join(f'{4 + 2 * i} 0 R' for i in range(len(pages))), len(pages)),
+               '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    for i, text in enumerate(pages):
+        lines = ' '.join(f'({line}) Tj 0 -14 Td' for line in text.split('\n'))
+        stream = f'BT /F1 12 Tf 72 720 Td {lines} ET'
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>')
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n{stream}\nendstream')
+    pdf = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f'{number} 0 obj\n{body}\nendobj\n'.encode('latin-1')
+    xref = len(pdf)
+    pdf += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('ascii')
+    pdf += ''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode('ascii')
+    pdf += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode('ascii')
+    return pdf
+
+
+def upload_resume(client, app_id, content, file_name='resume.pdf'):
+    """Uploads a resume for an application through /api/submit_application."""
+    response = client.post(f'/api/submit_application/{app_id}', data={'resume': (io.BytesIO(content), file_name)},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200, response.get_json()
+    return response
@@ -0,0 +1,109 @@
+"""Minimal SMTP server for the email tests: STARTTLS, AUTH, one thread per session."""
+import socketserver
+import ssl
+import threading
+
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    """
+    Accepts everything on 127.0.0.1 and records delivered messages as
+    (session number, recipients, data). Addresses in refuse get a 550 for
+    RCPT; with drop_after set, a session is closed without a reply when it
+    starts a message after delivering that many.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, certfile, keyfile):
+        super().__init__(('127.0.0.1', 0), _StubSMTPHandler)
+        self.tls = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.tls.load_cert_chain(certfile, keyfile)
+        self.lock = threading.Lock()
+        self.sessions = 0
+        self.messages = []
+        self.refuse = set()
+        self.drop_after = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, args=(0.05,), name='stub-smtp', daemon=True).start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _StubSMTPHandler(socketserver.BaseRequestHandler):
+
+    def _reply(self, code, *lines):
+        lines = lines or ('OK',)
+        text = ''.join(f"{code}{'-' if i < len(lines) - 1 else ' '}{line}\r\n" for i, line in enumerate(lines))
+        self.file.write(text.encode('ascii'))
+        self.file.flush()
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.sessions += 1
+            session = server.sessions
+        sock = self.request
+        self.file = sock.makefile('rwb')
+        tls, recipients, delivered = False, [], 0
+        try:
+            self._reply(220, 'stub ESMTP')
+            while True:
+                line = self.file.readline()
+                if not line:
+                    return
+                verb, _, arg = line.decode('ascii', 'replace').rstrip('\r\n').partition(' ')
+                verb = verb.upper()
+                if verb in ('EHLO', 'HELO'):
+                    self._reply(250, 'stub', 'AUTH PLAIN LOGIN' if tls else 'STARTTLS')
+                elif verb == 'STARTTLS':
+                    self._reply(220, 'Ready to start TLS')
+                    self.file.close()
+                    sock = server.tls.wrap_socket(sock, server_side=True)
+                    self.file = sock.makefile('rwb')
+                    tls = True
+                elif verb == 'AUTH':
+                    self._reply(235, 'Authentication successful')
+                elif verb == 'MAIL':
+                    if server.drop_after is not None and delivered >= server.drop_after:
+                        return
+                    recipients = []
+                    self._reply(250)
+                elif verb == 'RCPT':
+                    address = arg.split(':', 1)[-1].strip().strip('<>')
+                    if address in server.refuse:
+                        self._reply(550, 'No such user')
+                    else:
+                        recipients.append(address)
+                        self._reply(250)
+                elif verb == 'DATA':
+                    self._reply(354, 'End data with <CR><LF>.<CR><LF>')
+                    data = []
+                    while True:
+                        line = self.file.readline()
+                        if line in (b'.\r\n', b''):
+                            break
+                        data.append(line)
+                    with server.lock:
+                        server.messages.append((session, recipients, b''.join(data)))
+                    delivered += 1
+                    recipients = []
+                    self._reply(250, 'Queued')
+                elif verb in ('RSET', 'NOOP'):
+                    recipients = [] if verb == 'RSET' else recipients
+                    self._reply(250)
+                elif verb == 'QUIT':
+                    self._reply(221, 'Bye')
+                    return
+                else:
+                    self._reply(502, 'Command not implemented')
+        finally:
+            self.file.close()
+            sock.close()
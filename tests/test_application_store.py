@@ -0,0 +1,172 @@
+import uuid
+
+import pytest
+
+import backend
+from conftest import RECRUITER_HEADERS, TEST_DATABASE_URL, create_application
+
+
+@pytest.fixture(params=['sqlite', 'postgres'])
+def store(request):
+    if request.param == 'sqlite':
+        yield backend.application_store
+        return
+    if not TEST_DATABASE_URL:
+        pytest.skip('DATABASE_URL is not set')
+    if not backend.POSTGRES_AVAILABLE:
+        pytest.skip('psycopg2 is not installed')
+    pg_store = backend.PostgresApplicationStore(TEST_DATABASE_URL, max_connections=2)
+    pg_store.init_schema()
+    yield pg_store
+    pg_store._get_pool().closeall()
+
+
+@pytest.fixture
+def make_app(store):
+    """Creates applications with IDs unique to the test and removes them afterwards."""
+    prefix = f"T{uuid.uuid4().hex[:10]}-"
+    created = []
+
+    def make(suffix, job_title='Store Engineer', **applicant_data):
+        app_id = prefix + suffix
+        store.create_application(app_id, job_title, dict({'jobTitle': job_title}, **applicant_data))
+        created.append(app_id)
+        return app_id
+
+    yield make
+    with store._connection() as conn:
+        for table in ('invites', 'application_education', 'application_work', 'applications'):
+            for app_id in created:
+                store._execute(conn, f"DELETE FROM {table} WHERE app_id = ?", (app_id,))
+
+
+def test_abstract_store_cannot_be_instantiated():
+    with pytest.raises(TypeError):
+        backend.ApplicationStore()
+
+
+def test_postgres_sql_rewrites_placeholders():
+    if not backend.POSTGRES_AVAILABLE:
+        pytest.skip('psycopg2 is not installed')
+    pg_store = backend.PostgresApplicationStore('postgresql://unused')
+    assert pg_store._sql("SELECT a FROM t WHERE b = ? AND c IN (?, ?)") == "SELECT a FROM t WHERE b = %s AND c IN (%s, %s)"
+    assert pg_store._sql("UPDATE t SET updated_at = {now} WHERE id = ?") == (
+        f"UPDATE t SET updated_at = {pg_store.NOW_SQL} WHERE id = %s"
+    )
+    assert backend.SQLiteApplicationStore()._sql("SELECT {now} WHERE b = ?") == "SELECT datetime('now') WHERE b = ?"
+
+
+def test_record_invites_sent_upserts(store, make_app):
+    first, second = make_app('a'), make_app('b')
+    store.record_invites_sent([(first, 'rita', 'Store Engineer', 'web'), (second, 'rita', 'Store Engineer', 'web')])
+    invite = store.get_invite(first)
+    assert (invite['recruiter'], invite['source'], invite['phone_status']) == ('rita', 'web', 'Pending')
+    assert invite['invited_at']
+
+    store.update_invite(first, {'application_status': 'Selected'})
+    store.record_invite_sent(first, 'sam', 'Lead Store Engineer', 'referral')
+    invite = store.get_invite(first)
+    # Re-sending updates the recruiter and job title but keeps the source and status
+    assert (invite['recruiter'], invite['job_title'], invite['source'], invite['application_status']) == (
+        'sam', 'Lead Store Engineer', 'web', 'Selected')
+    assert store.invite_statuses([first, second, 'missing']) == {first: 'Selected'}
+    store.record_invites_sent([])
+
+
+def test_search(store, make_app):
+    ada = make_app('ada', source='LinkedIn', communication={'email': 'Ada@Example.com'},
+                   education=[{'degree': 'BSc', 'institution': 'MIT'}], work=[{'company': 'Acme', 'title': 'Engineer'}])
+    bob = make_app('bob', communication={'email': 'bob@example.com'},
+                   education=[{'degree': 'MSc', 'institution': 'mit'}], work=[{'company': 'ACME', 'title': 'Analyst'}])
+    make_app('cy', job_title='Other Role', communication={'email': 'cy@example.com'}, work=[{'company': 'Acme'}])
+
+    def ids(filters, **kwargs):
+        return [r['app_id'] for r in store.search_applications(filters, **kwargs) if r['app_id'] in (ada, bob)]
+
+    assert ids({'email': 'ada@example.COM'}) == [ada]
+    assert ids({'source': 'linkedin'}) == [ada]
+    assert ids({'job_title': 'STORE engineer', 'company': 'acme'}) == [ada, bob]
+    assert ids({'company': 'acme', 'job_title': 'Store Engineer'}) == [ada, bob]
+    assert ids({'institution': 'MIT', 'degree': 'msc'}) == [bob]
+    assert ids({'work_title': 'engineer', 'company': 'Acme'}) == [ada]
+    assert ids({'company': 'acme', 'job_title': 'Store Engineer'}, limit=1) == [ada]
+    assert ids({'company': 'acme', 'job_title': 'Store Engineer'}, after=ada) == [bob]
+
+
+def test_list_schedule_filters_and_pages(store, make_app):
+    recruiter = f"rec-{uuid.uuid4().hex[:8]}"
+    app_ids = [make_app(str(i)) for i in range(5)]
+    store.record_invites_sent([(app_id, recruiter, 'Store Engineer', 'web') for app_id in app_ids])
+    # Distinct invite times, oldest first
+    with store._connection() as conn:
+        for i, app_id in enumerate(app_ids):
+            store._execute(conn, "UPDATE invites SET invited_at = ? WHERE app_id = ?", (f"2024-01-0{i + 1} 09:00:00", app_id))
+    store.update_invite(app_ids[1], {'interviewer': 'ivan', 'application_status': 'Selected'})
+
+    rows, total = store.list_schedule({'recruiter': recruiter})
+    assert total is None
+    assert [r['app_id'] for r in rows] == app_ids[::-1]
+    assert rows[0]['application_status'] == 'Open'
+    assert rows[0]['interviewer'] == ''
+
+    pages, after = [], None
+    while True:
+        rows, total = store.list_schedule({'recruiter': recruiter}, after=after, limit=2)
+        assert total == 5
+        pages.append([r['app_id'] for r in rows])
+        if len(rows) < 2:
+            break
+        after = (rows[-1]['invited_at'], rows[-1]['app_id'])
+    assert pages == [app_ids[:2:-1], app_ids[2:0:-1], app_ids[:1]]
+
+    rows, _ = store.list_schedule({'recruiter': recruiter, 'status': 'Selected', 'interviewer': 'ivan'})
+    assert [r['app_id'] for r in rows] == [app_ids[1]]
+    rows, total = store.list_schedule({'recruiter': recruiter, 'status': 'Open'}, limit=10)
+    assert total == 4 and app_ids[1] not in [r['app_id'] for r in rows]
+
+
+def test_list_schedule_pages_into_uninvited(store, make_app):
+    invited, uninvited = make_app('invited'), [make_app(f"new{i}") for i in range(3)]
+    store.record_invite_sent(invited, 'rita', 'Store Engineer', 'web')
+
+    everything, _ = store.list_schedule({})
+    listed = [r['app_id'] for r in everything]
+    # Invited applications come first, newest first; the rest follow by app_id, descending
+    assert [r['invited_at'] != '' for r in everything] == sorted((r['invited_at'] != '' for r in everything), reverse=True)
+    assert listed.index(invited) < min(listed.index(app_id) for app_id in uninvited)
+    assert [app_id for app_id in listed if app_id in uninvited] == uninvited[::-1]
+
+    paged, after = [], None
+    while True:
+        rows, total = store.list_schedule({}, after=after, limit=3)
+        paged.extend(r['app_id'] for r in rows)
+        if len(rows) < 3:
+            break
+        after = (rows[-1]['invited_at'], rows[-1]['app_id'])
+    assert paged == listed and total == len(listed)
+
+
+def test_filtered_schedule_reads_invite_indexes(monkeypatch):
+    store = backend.application_store
+    plans = []
+    execute = store._execute
+
+    def explain(conn, query, params=()):
+        if 'ORDER BY' in query:
+            plans.append(' '.join(r['detail'] for r in conn.execute('EXPLAIN QUERY PLAN ' + store._sql(query), params)))
+        return execute(conn, query, params)
+
+    monkeypatch.setattr(store, '_execute', explain)
+    store.list_schedule({'recruiter': 'nobody', 'status': 'Selected'}, limit=10)
+    store.list_schedule({'interviewer': 'nobody'}, after=('2024-01-01 00:00:00', 'x'), limit=10)
+    assert len(plans) == 4
+    for plan in plans:
+        assert '_keyset' in plan and 'TEMP B-TREE' not in plan
+
+
+def test_search_endpoint_matches_form_source(client):
+    app_id = create_application(client, 'Source Search Engineer', source='Job Fair')
+    response = client.get('/api/applications/search', headers=RECRUITER_HEADERS,
+                          query_string={'source': 'job fair', 'job_title': 'source search ENGINEER'})
+    assert response.status_code == 200
+    assert [r['App_ID'] for r in response.get_json()['applications']] == [app_id]
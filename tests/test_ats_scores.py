@@ -0,0 +1,156 @@
+import json
+import random
+from collections import OrderedDict
+
+import backend
+from conftest import RECRUITER_HEADERS, create_application
+
+JOB_TITLE = 'Score Cache Engineer'
+
+
+def _list(client):
+    response = client.get('/api/scored_applications', headers=RECRUITER_HEADERS, query_string={'job_title': JOB_TITLE})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['applications']
+
+
+def _stored(app_id):
+    conn = backend.get_db_connection()
+    try:
+        return conn.execute("SELECT details, scoring_version FROM ats_scores WHERE app_id = ?", (app_id,)).fetchone()
+    finally:
+        conn.close()
+
+
+def test_changing_jitter_mode_rescores_stored_rows(client, monkeypatch):
+    app_id = create_application(client, JOB_TITLE)
+    _list(client)
+    assert _stored(app_id)['scoring_version'] == backend.ATS_SCORE_ROW_VERSION
+
+    monkeypatch.setattr(backend, 'ATS_SCORING_JITTER', 'off')
+    monkeypatch.setattr(backend, 'ATS_SCORE_ROW_VERSION', backend.ATS_SCORING_VERSION * 10 + 2)
+    _list(client)
+    row = _stored(app_id)
+    assert row['scoring_version'] == backend.ATS_SCORE_ROW_VERSION
+    assert json.loads(row['details'])['breakdown']['jitter'] == 0
+
+
+def test_search_is_an_indexed_app_id_prefix(client):
+    app_id = create_application(client, JOB_TITLE)
+    for term in (app_id, app_id[:6], app_id[3:7].upper(), app_id.lower()):
+        response = client.get('/api/scored_applications', headers=RECRUITER_HEADERS,
+                              query_string={'job_title': JOB_TITLE, 'search': term})
+        assert app_id in {a['App_ID'] for a in response.get_json()['applications']}, term
+    response = client.get('/api/scored_applications', headers=RECRUITER_HEADERS,
+                          query_string={'job_title': JOB_TITLE, 'search': app_id[4:]})
+    assert app_id not in {a['App_ID'] for a in response.get_json()['applications']}
+
+    clauses, params = backend._scored_applications_filters({'search': app_id[:6]})
+    conn = backend.get_db_connection()
+    plan = conn.execute(f"EXPLAIN QUERY PLAN SELECT app_id FROM ats_scores s WHERE {' AND '.join(clauses)}", params).fetchall()
+    conn.close()
+    assert '(app_id>? AND app_id<?)' in ' '.join(row['detail'] for row in plan)
+
+
+def test_listing_scores_new_and_invalidated_applications(client):
+    scored = create_application(client, JOB_TITLE)
+    _list(client)
+
+    # Written to the store without going through save_details, e.g. by a backfill
+    unscored = 'MQ-' + 'f' * 6 + 'aa'
+    backend.application_store.create_application(unscored, JOB_TITLE, {'jobTitle': JOB_TITLE})
+    # A resume change drops the stored score and queues the application
+    conn = backend.get_db_connection()
+    backend.invalidate_ats_score(conn, scored)
+    conn.commit()
+    conn.close()
+
+    listed = {a['App_ID'] for a in _list(client)}
+    assert {scored, unscored} <= listed
+    assert _stored(unscored)['scoring_version'] == backend.ATS_SCORE_ROW_VERSION
+
+    conn = backend.get_db_connection()
+    assert conn.execute("SELECT COUNT(*) AS n FROM ats_score_pending").fetchone()['n'] == 0
+    since = backend._sync_state_since(conn, 'ats_scores')
+    conn.close()
+    assert since > ''
+
+
+def test_listing_rescores_applications_whose_inputs_changed(client):
+    edited, other = create_application(client, JOB_TITLE), create_application(client, JOB_TITLE)
+    _list(client)
+    before = json.loads(_stored(edited)['details'])
+
+    # An edit written straight to the store: the row count does not change, the inputs do
+    data = {'jobTitle': JOB_TITLE, 'jobDescription': 'We need python, sql and docker skills',
+            'work': [{'title': f'Python developer {i}'} for i in range(5)]}
+    conn = backend.get_db_connection()
+    conn.execute("UPDATE applications SET applicant_data = ?, updated_at = datetime('now') WHERE app_id = ?",
+                 (json.dumps(data), edited))
+    backend.invalidate_ats_score(conn, other)
+    conn.commit()
+    conn.close()
+    # A new application arriving at the same time keeps the counts equal
+    backend.application_store.create_application('MQ-' + 'e' * 6 + 'bb', JOB_TITLE, {'jobTitle': JOB_TITLE})
+
+    listed = {a['App_ID'] for a in _list(client)}
+    assert {edited, other, 'MQ-' + 'e' * 6 + 'bb'} <= listed
+    after = json.loads(_stored(edited)['details'])
+    assert after['breakdown']['work_experience_score'] > before['breakdown']['work_experience_score']
+
+
+def _random_applicant(rng, index):
+    words = sorted(backend.ATS_SKILL_KEYWORDS) + ['Senior', 'Intern', 'Acme', 'Computer', 'Science', 'MBA', 'Design', 'Statistics', 'IT']
+
+    def phrase():
+        return ' '.join(rng.choice(words) for _ in range(rng.randint(0, 4)))
+
+    data = {}
+    if rng.random() < 0.9:
+        data['work'] = [{'title': phrase(), 'company': phrase()} for _ in range(rng.randint(0, 7))]
+    else:
+        data['work'] = 'not a list'
+    if rng.random() < 0.9:
+        data['education'] = [{'degree': phrase(), 'branch': phrase(), 'institution': phrase()} for _ in range(rng.randint(0, 3))]
+    return {
+        'app_id': rng.choice([f"MQ-{index:06x}aa", None]),
+        'applicant_data': data,
+        'resume_filename': rng.choice(['cv.pdf', 'CV.PDF', 'cv.docx', None]),
+    }
+
+
+def test_score_batch_matches_single_scoring():
+    rng = random.Random(8)
+    titles = ['Senior Frontend Engineer', 'Backend Developer', 'Data Scientist', 'Product Manager',
+              'UX Designer', 'Marketing Lead', 'Intern']
+    for _ in range(40):
+        title = rng.choice(titles)
+        description = ' '.join(rng.sample(sorted(backend.ATS_SKILL_KEYWORDS), rng.randint(0, 15)))
+        job = backend.get_job_requirements(title, description)
+        applicants = [_random_applicant(rng, i) for i in range(rng.randint(1, 30))]
+        for mode in ('seeded', 'off'):
+            batch = backend.score_batch(job, applicants, return_details=True, jitter_mode=mode)
+            for applicant, details in zip(applicants, batch):
+                single = backend.simulate_ats_scoring(title, description, applicant['applicant_data'],
+                                                      resume_filename=applicant['resume_filename'],
+                                                      return_details=True, app_id=applicant['app_id'], jitter_mode=mode)
+                assert details == single, (title, description, applicant)
+
+
+def test_job_requirements_are_cached_per_posting_in_an_lru(monkeypatch):
+    monkeypatch.setattr(backend, '_job_requirements_cache', OrderedDict())
+    monkeypatch.setattr(backend, '_job_requirements_stats', {'hits': 0, 'misses': 0})
+    monkeypatch.setattr(backend, 'JOB_REQUIREMENTS_CACHE_SIZE', 2)
+
+    frontend = backend.get_job_requirements('Senior Frontend Engineer', 'react and typescript')
+    assert frontend.target_skills == {'react', 'typescript'}
+    assert (frontend.seniority_bonus, frontend.role_family_bonus) == (15, 5)
+    assert backend.get_job_requirements('Senior Frontend Engineer', 'react and typescript') is frontend
+    # A changed description is a different posting
+    assert backend.get_job_requirements('Senior Frontend Engineer', 'react').target_skills == {'react'}
+    backend.get_job_requirements('Senior Frontend Engineer', 'react and typescript')
+    # The least recently used posting ('react') is evicted
+    backend.get_job_requirements('Data Scientist', 'python')
+    backend.get_job_requirements('Senior Frontend Engineer', 'react and typescript')
+    backend.get_job_requirements('Senior Frontend Engineer', 'react')
+    assert backend.job_requirements_cache_stats() == {'hits': 3, 'misses': 4, 'size': 2, 'capacity': 2}
@@ -0,0 +1,59 @@
+import time
+
+import backend
+from conftest import RECRUITER_HEADERS, create_application
+
+
+def _clear_runs():
+    conn = backend.get_db_connection()
+    conn.execute("DELETE FROM rescore_runs")
+    conn.execute("DELETE FROM jobs WHERE kind = 'bulk_rescore'")
+    conn.commit()
+    conn.close()
+
+
+def test_post_queues_one_run_and_job_worker_completes_it(client):
+    _clear_runs()
+    app_id = create_application(client, 'Bulk Rescore Engineer')
+
+    response = client.post('/api/rescore', headers=RECRUITER_HEADERS, json={'workers': 1})
+    assert response.status_code == 202, response.get_json()
+    run = response.get_json()['run']
+    assert run['status'] == 'queued'
+
+    # Another request (from any process) sees the queued run in the database
+    response = client.post('/api/rescore', headers=RECRUITER_HEADERS, json={'workers': 1})
+    assert response.status_code == 409
+    assert response.get_json()['run']['id'] == run['id']
+
+    assert backend.run_pending_jobs() >= 1
+    run = backend.get_rescore_run(run['id'])
+    assert run['status'] == 'done'
+    assert run['processed'] == run['total'] and run['failed'] == 0
+    assert run['locked_at'] is None
+
+    conn = backend.get_db_connection()
+    row = conn.execute("SELECT scoring_version FROM ats_scores WHERE app_id = ?", (app_id,)).fetchone()
+    conn.close()
+    assert row['scoring_version'] == backend.ATS_SCORE_ROW_VERSION
+
+
+def test_run_held_by_live_process_is_not_run_twice(client):
+    _clear_runs()
+    run_id = backend.create_rescore_run()
+    conn = backend.get_db_connection()
+    conn.execute("UPDATE rescore_runs SET status = 'running', locked_at = ? WHERE id = ?", (time.time(), run_id))
+    conn.commit()
+    conn.close()
+
+    assert backend.run_bulk_rescore(run_id, workers=1) is False
+    assert client.post('/api/rescore', headers=RECRUITER_HEADERS, json={}).status_code == 409
+
+    # A run whose worker stopped checkpointing can be taken over
+    conn = backend.get_db_connection()
+    conn.execute("UPDATE rescore_runs SET locked_at = ? WHERE id = ?", (time.time() - backend.RESCORE_LEASE_SECONDS - 1, run_id))
+    conn.commit()
+    conn.close()
+    response = client.post('/api/rescore', headers=RECRUITER_HEADERS, json={'workers': 1})
+    assert response.status_code == 202
+    assert response.get_json()['run']['id'] == run_id
@@ -0,0 +1,23 @@
+import backend
+from conftest import RECRUITER_HEADERS, create_application
+
+
+def test_handlers_return_connections_when_they_fail(client, monkeypatch):
+    app_id = create_application(client, 'Pool Engineer')
+    before = backend.db_pool_stats()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError('boom')
+    monkeypatch.setattr(backend, 'refresh_stale_ats_scores', fail)
+    monkeypatch.setattr(backend, 'enqueue_email', fail)
+    monkeypatch.setattr(backend, '_smtp_configured', lambda: True)
+
+    assert client.get('/api/scored_applications', headers=RECRUITER_HEADERS).status_code == 500
+    assert client.get('/api/filtered_scores', headers=RECRUITER_HEADERS).status_code == 500
+    response = client.post(f'/api/send_status_email/{app_id}', headers=RECRUITER_HEADERS,
+                           json={'process_status': 'Shortlisted', 'interview_date': '2025-01-15', 'interview_time': '14:30'})
+    assert response.status_code == 500
+
+    after = backend.db_pool_stats()
+    assert after['in_use'] == before['in_use']
+    assert after['leaked'] == before['leaked']
@@ -0,0 +1,57 @@
+import jinja2.sandbox
+import pytest
+
+import backend
+from conftest import RECRUITER_HEADERS
+
+UNSAFE_SOURCES = [
+    "{{ cycler.__init__.__globals__.os.getpid() }}",
+    "{{ ''.__class__.__mro__[1].__subclasses__() }}",
+    "{{ applicant_name.__class__.__base__ }}",
+]
+
+
+def test_template_renders_sample_context():
+    template = backend.compile_email_template('t', 'Hi {{ applicant_name }}', 'Role: {{ job_title }}\n')
+    rendered = backend.render_email_batch(template, [backend.EMAIL_TEMPLATE_SAMPLE_CONTEXT])[0]
+    assert rendered.subject == 'Hi ' + backend.EMAIL_TEMPLATE_SAMPLE_CONTEXT['applicant_name']
+    assert rendered.text == 'Role: ' + backend.EMAIL_TEMPLATE_SAMPLE_CONTEXT['job_title'] + '\n'
+
+
+
+def test_date_filters_pass_through_unparseable_values():
+    template = backend.compile_email_template(
+        't', 'Subject', '{{ interview_date|long_date }} {{ interview_time|clock_time }}')
+    contexts = [
+        {'interview_date': '2025-01-15', 'interview_time': '14:30'},
+        {'interview_date': ['2025-01-15'], 'interview_time': {'at': '14:30'}},
+        {'interview_date': 'soon', 'interview_time': None},
+    ]
+    assert [r.text for r in backend.render_email_batch(template, contexts)] == [
+        'January 15, 2025 02:30 PM',
+        "['2025-01-15'] {'at': '14:30'}",
+        'soon None',
+    ]
+
+@pytest.mark.parametrize('source', UNSAFE_SOURCES)
+def test_unsafe_attribute_access_is_rejected(source):
+    for text_body, html_body in ((source, None), ('ok', source)):
+        template = backend.compile_email_template('t', 'Subject', text_body, html_body)
+        with pytest.raises(jinja2.sandbox.SecurityError):
+            backend.render_email_batch(template, [backend.EMAIL_TEMPLATE_SAMPLE_CONTEXT])
+
+
+@pytest.mark.parametrize('source', UNSAFE_SOURCES)
+def test_unsafe_template_cannot_be_saved_or_previewed(client, source):
+    name = client.get('/api/email_templates', headers=RECRUITER_HEADERS).get_json()['templates'][0]['name']
+    before = client.get(f'/api/email_templates/{name}', headers=RECRUITER_HEADERS).get_json()
+
+    response = client.put(f'/api/email_templates/{name}', headers=RECRUITER_HEADERS,
+                          json={'subject': 'Subject', 'text_body': source})
+    assert response.status_code == 400
+    after = client.get(f'/api/email_templates/{name}', headers=RECRUITER_HEADERS).get_json()
+    assert after == before
+
+    response = client.post(f'/api/email_templates/{name}/preview', headers=RECRUITER_HEADERS,
+                           json={'text_body': source})
+    assert response.status_code == 400
@@ -0,0 +1,52 @@
+import time
+
+import backend
+
+
+def _reset_export_state():
+    conn = backend.get_db_connection()
+    conn.execute("UPDATE export_state SET dirty_since = NULL WHERE name = 'excel'")
+    conn.execute("DELETE FROM jobs WHERE kind = 'rebuild_excel'")
+    conn.commit()
+    conn.close()
+
+
+def _queued_rebuild():
+    conn = backend.get_db_connection()
+    try:
+        return conn.execute("SELECT run_after FROM jobs WHERE kind = 'rebuild_excel' AND status = 'queued'").fetchall()
+    finally:
+        conn.close()
+
+
+def test_edits_postpone_rebuild_up_to_max_wait(monkeypatch):
+    monkeypatch.setattr(backend, 'EXCEL_REBUILD_DELAY_SECONDS', 30)
+    monkeypatch.setattr(backend, 'EXCEL_REBUILD_MAX_WAIT_SECONDS', 60)
+    _reset_export_state()
+
+    backend.mark_export_dirty()
+    (job,) = _queued_rebuild()
+    assert abs(job['run_after'] - (time.time() + 30)) < 5
+
+    # The first edit happened 50s ago: further edits cannot push the rebuild past first edit + 60s
+    conn = backend.get_db_connection()
+    conn.execute("UPDATE export_state SET dirty_since = ? WHERE name = 'excel'", (time.time() - 50,))
+    conn.commit()
+    conn.close()
+    for _ in range(3):
+        backend.mark_export_dirty()
+    (job,) = _queued_rebuild()
+    assert abs(job['run_after'] - (time.time() + 10)) < 5
+
+
+def test_rebuild_starts_a_new_max_wait_window(monkeypatch):
+    _reset_export_state()
+    monkeypatch.setattr(backend, '_generate_and_write_excel', lambda: None)
+    backend.mark_export_dirty()
+    backend.rebuild_excel_export()
+
+    conn = backend.get_db_connection()
+    state = conn.execute("SELECT version, built_version, dirty_since FROM export_state WHERE name = 'excel'").fetchone()
+    conn.close()
+    assert state['dirty_since'] is None
+    assert state['built_version'] == state['version']
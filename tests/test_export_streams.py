@@ -0,0 +1,64 @@
+import csv
+import io
+
+import pyarrow.parquet
+
+import backend
+from conftest import RECRUITER_HEADERS, create_application
+
+JOB_TITLE = 'Export Stream Engineer'
+
+
+def _csv(client, **params):
+    response = client.get('/api/export.csv', headers=RECRUITER_HEADERS, query_string=params)
+    assert response.status_code == 200, response.get_json()
+    assert response.is_streamed
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    return {row['App_ID']: row for row in rows}, response.headers['X-Export-As-Of']
+
+
+def _backdate(*app_ids):
+    conn = backend.get_db_connection()
+    try:
+        for table in ('applications', 'invites'):
+            conn.execute(f"UPDATE {table} SET updated_at = '2000-01-01 00:00:00' WHERE app_id IN ({','.join('?' * len(app_ids))})", app_ids)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_csv_export_filters_by_sheet_and_update_time(client):
+    unchanged = create_application(client, JOB_TITLE, first_name='Una')
+    selected = create_application(client, JOB_TITLE, first_name='Sel')
+    _backdate(unchanged, selected)
+    response = client.patch(f'/api/schedule/{selected}', headers=RECRUITER_HEADERS, json={'application_status': 'Selected'})
+    assert response.status_code == 200
+
+    rows, as_of = _csv(client)
+    assert list(rows[unchanged]) == backend.STREAM_EXPORT_COLUMNS
+    assert rows[unchanged]['Job_Title'] == JOB_TITLE
+    assert as_of.endswith('Z')
+
+    rows, _ = _csv(client, filter='selected')
+    assert selected in rows and unchanged not in rows
+
+    rows, _ = _csv(client, updated_since='2001-01-01T05:30:00+05:30')
+    assert selected in rows and unchanged not in rows
+
+    for params in ({'filter': 'bogus'}, {'updated_since': 'yesterday'}):
+        response = client.get('/api/export.csv', headers=RECRUITER_HEADERS, query_string=params)
+        assert response.status_code == 400
+
+
+def test_parquet_export_matches_csv(client):
+    app_id = create_application(client, JOB_TITLE, first_name='Parq')
+    response = client.get('/api/export.parquet', headers=RECRUITER_HEADERS)
+    assert response.status_code == 200
+    assert response.headers['X-Export-As-Of']
+    table = pyarrow.parquet.read_table(io.BytesIO(response.data))
+    assert table.column_names == backend.STREAM_EXPORT_COLUMNS
+    parquet_rows = {row['App_ID']: row for row in table.to_pylist()}
+
+    csv_rows, _ = _csv(client)
+    assert set(parquet_rows) == set(csv_rows)
+    assert {k: v or '' for k, v in parquet_rows[app_id].items()} == csv_rows[app_id]
@@ -0,0 +1,109 @@
+import hashlib
+
+import backend
+from conftest import RECRUITER_HEADERS, create_application, make_pdf, upload_resume
+
+JOB_TITLE = 'Backend Engineer'
+JOB_DESCRIPTION = 'We need python, postgresql, docker and aws'
+RESUME_TEXT = (
+    'Skills\n'
+    'Python, PostgreSQL, Docker <script>\n'
+    'Experience\n'
+    'Ran python services on AWS at Acme; awsome mysql-free zone\n'
+    'Projects\n'
+    'REST api backend in python\n'
+)
+
+
+def test_keyword_matcher_matches_whole_words_longest_first():
+    matcher = backend.keyword_matcher({'postgres', 'postgresql', 'sql'})
+    assert [m.group(0) for m in matcher.finditer('PostgreSQL, postgres; mysql sql')] == ['PostgreSQL', 'postgres', 'sql']
+    # One compiled pattern per vocabulary, whatever the order or case
+    assert backend.keyword_matcher(['SQL', 'postgresql', 'postgres']) is matcher
+    assert backend.keyword_matcher(set()) is None
+
+
+def test_find_highlighted_sections_reports_first_match_per_keyword():
+    highlights = backend.find_highlighted_sections(RESUME_TEXT, JOB_TITLE, JOB_DESCRIPTION, {'work': [{'title': 'x', 'company': 'Acme'}]})
+    assert [k['keyword'] for k in highlights['keywords']] == ['python', 'postgresql', 'docker', 'aws']
+    assert highlights['keywords'][0]['position'] == RESUME_TEXT.index('Python')
+    assert highlights['skills'][0]['highlighted_keywords'] == ['python', 'postgresql', 'docker']
+    assert highlights['experience'][0]['job_titles'] == ['Acme']
+
+
+def test_highlighted_html_is_escaped_and_classed_by_section():
+    highlights = backend.find_highlighted_sections(RESUME_TEXT, JOB_TITLE, JOB_DESCRIPTION, {})
+    html = backend.highlight_text_in_resume(RESUME_TEXT, highlights['matched_keywords'], highlights, JOB_TITLE, JOB_DESCRIPTION)
+    assert '&lt;script&gt;' in html and '<script>' not in html
+    assert '<span class="highlight-skill">Python</span>' in html
+    assert '<span class="highlight-skill">PostgreSQL</span>' in html
+    assert '<span class="highlight-experience">AWS</span>' in html
+    assert 'awsome mysql' in html
+    assert html.count('<div class="project-section">') == 1
+    assert html.count('<span') == html.count('</span>')
+
+
+def test_highlighted_view_is_cached_per_fragment_inputs(client, monkeypatch):
+    renders = []
+    render = backend.highlight_text_in_resume
+
+    def counting_render(*args, **kwargs):
+        renders.append(args[0])
+        return render(*args, **kwargs)
+    monkeypatch.setattr(backend, 'highlight_text_in_resume', counting_render)
+
+    content = make_pdf('Skills\nPython, SQL and Docker', 'Experience\nPython developer at Acme')
+    first = create_application(client, JOB_TITLE)
+    second = create_application(client, JOB_TITLE)
+    other_work = create_application(client, JOB_TITLE, work=[{'title': 'Docker admin', 'company': 'Initech'}])
+    for app_id in (first, second, other_work):
+        upload_resume(client, app_id, content)
+
+    response = client.get(f'/api/view_resume_highlighted/{first}', headers=RECRUITER_HEADERS)
+    assert response.status_code == 200
+    assert '<span class="highlight-skill">Python</span>' in response.get_data(as_text=True)
+    assert first in response.get_data(as_text=True)
+    etag = response.headers['ETag']
+    response = client.get(f'/api/view_resume_highlighted/{first}', headers={**RECRUITER_HEADERS, 'If-None-Match': etag})
+    assert response.status_code == 304
+
+    # Same resume, posting and work/education entries: the fragment is shared
+    response = client.get(f'/api/view_resume_highlighted/{second}', headers=RECRUITER_HEADERS)
+    assert second in response.get_data(as_text=True) and response.headers['ETag'] != etag
+    assert len(renders) == 1
+    # Different work entries change the fragment key
+    client.get(f'/api/view_resume_highlighted/{other_work}', headers=RECRUITER_HEADERS)
+    assert len(renders) == 2
+
+    # Fragments are dropped with the last resume referencing their content
+    sha256 = hashlib.sha256(content).hexdigest()
+    for app_id in (first, second, other_work):
+        upload_resume(client, app_id, make_pdf('Skills\nFigma'))
+    conn = backend.get_db_connection()
+    assert conn.execute("SELECT 1 FROM highlighted_html_cache WHERE resume_sha256 = ?", (sha256,)).fetchone() is None
+    conn.close()
+
+
+def test_segment_resume_splits_on_known_headings():
+    text = (
+        'Jane Doe\n'
+        '== WORK EXPERIENCE ==\n'
+        'Developer at Acme\n'
+        'Responsibilities:\n'
+        '  built APIs\n'
+        '\n'
+        'Skills: Python, SQL\n'
+        'Education\r\n'
+        'BSc Computer Science\n'
+        '\n'
+        '\n'
+    )
+    sections = backend.segment_resume(text)
+    assert [(s.kind, s.title) for s in sections] == [('experience', 'work experience'), ('skills', 'skills'), ('education', 'education')]
+    experience, skills, education = sections
+    assert text[experience.start:experience.body_start] == '== WORK EXPERIENCE ==\n'
+    assert text[experience.body_start:experience.end] == 'Developer at Acme\nResponsibilities:\n  built APIs'
+    # Inline content after 'Heading:' belongs to the section
+    assert text[skills.body_start:skills.end] == 'Python, SQL'
+    assert text[education.body_start:education.end] == 'BSc Computer Science'
+    assert backend.segment_resume('No headings here\njust text') == []
@@ -0,0 +1,72 @@
+import pytest
+
+import backend
+from conftest import RECRUITER_HEADERS, create_application
+
+
+@pytest.fixture(autouse=True)
+def smtp_env(monkeypatch):
+    # Invites are only queued here; nothing is delivered
+    monkeypatch.setenv('EMAIL_HOST', 'smtp.invalid')
+    monkeypatch.setenv('EMAIL_HOST_USER', 'careers@example.com')
+    monkeypatch.setenv('EMAIL_HOST_PASSWORD', 'secret')
+
+
+def _outbox_count(app_id):
+    conn = backend.get_db_connection()
+    n = conn.execute("SELECT COUNT(*) AS n FROM email_outbox WHERE app_id = ? AND template = 'interview_invite'",
+                     (app_id,)).fetchone()['n']
+    conn.close()
+    return n
+
+
+def _fail(*args, **kwargs):
+    raise RuntimeError('store unavailable')
+
+
+def test_invite_is_recorded_before_email_is_queued(client):
+    app_id = create_application(client, 'Invite Engineer')
+    response = client.post(f'/api/invite_applicant/{app_id}', headers=dict(RECRUITER_HEADERS, **{'X-Recruiter-Name': 'rita'}))
+    assert response.status_code == 200
+    assert backend.application_store.get_invite(app_id)['recruiter'] == 'rita'
+    assert _outbox_count(app_id) == 1
+
+
+def test_invite_store_failure_queues_no_email(client, monkeypatch):
+    app_id = create_application(client, 'Invite Engineer')
+    monkeypatch.setattr(backend.application_store, 'record_invite_sent', _fail)
+    response = client.post(f'/api/invite_applicant/{app_id}', headers=RECRUITER_HEADERS)
+    assert response.status_code == 500
+    assert _outbox_count(app_id) == 0
+
+
+def test_bulk_invite_store_failure_queues_no_email(client, monkeypatch):
+    app_ids = [create_application(client, 'Bulk Invite Engineer') for _ in range(2)]
+    monkeypatch.setattr(backend.application_store, 'record_invites_sent', _fail)
+    response = client.post('/api/invite_applicants', headers=RECRUITER_HEADERS, json={'app_ids': app_ids})
+    assert response.status_code == 500
+    assert [_outbox_count(a) for a in app_ids] == [0, 0]
+
+    monkeypatch.delattr(backend.application_store, 'record_invites_sent')
+    response = client.post('/api/invite_applicants', headers=RECRUITER_HEADERS, json={'app_ids': app_ids})
+    assert response.get_json()['queued'] == 2
+    assert [_outbox_count(a) for a in app_ids] == [1, 1]
+    assert all(backend.application_store.get_invite(a) for a in app_ids)
+
+
+def test_bulk_invite_uses_listing_filters(client):
+    job_title = 'Filtered Invite Engineer'
+    app_ids = [create_application(client, job_title) for _ in range(3)]
+    listed = client.get('/api/scored_applications', headers=RECRUITER_HEADERS,
+                        query_string={'job_title': job_title, 'search': app_ids[1].lower()}).get_json()
+    assert [a['App_ID'] for a in listed['applications']] == [app_ids[1]]
+
+    response = client.post('/api/invite_applicants', headers=RECRUITER_HEADERS,
+                           json={'min_score': 0, 'job_title': job_title, 'search': app_ids[1].lower()})
+    assert response.status_code == 200
+    assert [r['app_id'] for r in response.get_json()['results']] == [app_ids[1]]
+
+    response = client.post('/api/invite_applicants', headers=RECRUITER_HEADERS, json={'min_score': 0, 'job_title': job_title})
+    assert sorted(r['app_id'] for r in response.get_json()['results']) == sorted(app_ids)
+    assert client.post('/api/invite_applicants', headers=RECRUITER_HEADERS,
+                       json={'min_score': 'high'}).status_code == 400
@@ -0,0 +1,97 @@
+import json
+import time
+
+import backend
+from conftest import create_application, make_pdf, upload_resume
+
+JOB_TITLE = 'Backend Pipeline Engineer'
+
+
+def _job(job_id):
+    conn = backend.get_db_connection()
+    try:
+        return conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+
+
+def _enqueue(kind, **kwargs):
+    conn = backend.get_db_connection()
+    try:
+        job_id = backend.enqueue_job(conn, kind, **kwargs)
+        conn.commit()
+        return job_id
+    finally:
+        conn.close()
+
+
+def _make_due(job_id):
+    conn = backend.get_db_connection()
+    try:
+        conn.execute("UPDATE jobs SET run_after = 0 WHERE id = ?", (job_id,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_failing_job_backs_off_then_fails(monkeypatch):
+    attempts = []
+
+    def flaky(app_id, payload):
+        attempts.append(payload)
+        raise RuntimeError('still broken')
+    monkeypatch.setitem(backend.JOB_HANDLERS, 'test_flaky', flaky)
+    monkeypatch.setattr(backend, 'JOB_RETRY_BASE_SECONDS', 60)
+    job_id = _enqueue('test_flaky', payload={'n': 1}, max_attempts=3)
+
+    backend.run_pending_jobs()
+    job = _job(job_id)
+    assert (job['status'], job['attempts'], job['last_error']) == ('queued', 1, 'still broken')
+    assert job['run_after'] > time.time() + 50
+
+    # The next retry waits twice as long
+    _make_due(job_id)
+    backend.run_pending_jobs()
+    assert _job(job_id)['run_after'] > time.time() + 110
+
+    _make_due(job_id)
+    backend.run_pending_jobs()
+    job = _job(job_id)
+    assert (job['status'], job['attempts']) == ('failed', 3)
+    assert attempts == [{'n': 1}] * 3
+
+
+def test_job_with_expired_lease_is_run_again(monkeypatch):
+    ran = []
+    monkeypatch.setitem(backend.JOB_HANDLERS, 'test_lease', lambda app_id, payload: ran.append(app_id))
+    job_id = _enqueue('test_lease', app_id='MQ-lease')
+    conn = backend.get_db_connection()
+    # Claimed by a worker that died: the lease is still live, then expired
+    conn.execute("UPDATE jobs SET status = 'running', attempts = 1, locked_at = ? WHERE id = ?", (time.time(), job_id))
+    conn.commit()
+    backend.run_pending_jobs()
+    assert ran == []
+    conn.execute("UPDATE jobs SET locked_at = ? WHERE id = ?", (time.time() - backend.JOB_LEASE_SECONDS - 1, job_id))
+    conn.commit()
+    conn.close()
+    backend.run_pending_jobs()
+    assert ran == ['MQ-lease']
+    assert (_job(job_id)['status'], _job(job_id)['attempts']) == ('done', 2)
+
+
+def test_upload_queues_processing_that_scores_and_highlights(client):
+    app_id = create_application(client, JOB_TITLE)
+    upload_resume(client, app_id, make_pdf('Experience\nPython developer with docker and sql'))
+    conn = backend.get_db_connection()
+    try:
+        job = conn.execute("SELECT * FROM jobs WHERE kind = 'process_resume' AND app_id = ?", (app_id,)).fetchone()
+        assert job['status'] == 'queued'
+        assert conn.execute("SELECT 1 FROM ats_scores WHERE app_id = ?", (app_id,)).fetchone() is None
+
+        backend.run_pending_jobs()
+        assert _job(job['id'])['status'] == 'done'
+        score = conn.execute("SELECT score, highlights FROM ats_scores WHERE app_id = ?", (app_id,)).fetchone()
+        assert score['score'] > 0
+        assert json.loads(score['highlights'])
+    finally:
+        conn.close()
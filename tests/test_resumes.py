@@ -0,0 +1,227 @@
+import hashlib
+import io
+import os
+
+import backend
+from conftest import RECRUITER_HEADERS, create_application, make_pdf, upload_resume
+
+JOB_TITLE = 'Resume Store Engineer'
+
+
+def _no_folder_scans(monkeypatch):
+    def scan(*args, **kwargs):
+        raise AssertionError('resume lookups must use the resumes index')
+    monkeypatch.setattr(os, 'listdir', scan)
+    monkeypatch.setattr(os, 'scandir', scan)
+
+
+def test_uploaded_resume_is_served_from_the_index(client, monkeypatch):
+    app_id = create_application(client, JOB_TITLE)
+    content = make_pdf('Experience\nPython developer at Acme')
+    upload_resume(client, app_id, content, 'My CV.pdf')
+
+    conn = backend.get_db_connection()
+    resume = backend.get_resume_record(conn, app_id)
+    conn.close()
+    assert resume['file_name'] == f'{app_id}_My_CV.pdf'
+    assert resume['mime_type'] == 'application/pdf'
+    assert resume['size_bytes'] == len(content)
+
+    _no_folder_scans(monkeypatch)
+    response = client.get(f'/api/view_resume/{app_id}', headers=RECRUITER_HEADERS)
+    assert response.status_code == 200
+    assert response.data == content
+    assert response.mimetype == 'application/pdf'
+
+    missing = create_application(client, JOB_TITLE)
+    response = client.get(f'/api/view_resume/{missing}', headers=RECRUITER_HEADERS)
+    assert response.status_code == 404
+
+
+def test_backfill_indexes_known_flat_files_only(client):
+    app_id = create_application(client, JOB_TITLE)
+    upload_folder = backend.app.config['UPLOAD_FOLDER']
+    content = make_pdf('Backfilled resume')
+    with open(os.path.join(upload_folder, f'{app_id}_old.pdf'), 'wb') as fh:
+        fh.write(content)
+    with open(os.path.join(upload_folder, 'MQ-unknown_old.pdf'), 'wb') as fh:
+        fh.write(b'%PDF-1.4 stray')
+
+    indexed, skipped = backend.backfill_resume_index()
+    assert indexed >= 1 and skipped >= 1
+    response = client.get(f'/api/view_resume/{app_id}', headers=RECRUITER_HEADERS)
+    assert response.status_code == 200
+    assert response.data == content
+    assert os.path.exists(os.path.join(upload_folder, 'MQ-unknown_old.pdf'))
+    os.remove(os.path.join(upload_folder, 'MQ-unknown_old.pdf'))
+
+
+def test_extraction_runs_once_per_content(client, monkeypatch):
+    calls = []
+    extract = backend._extract_pdf_pages
+
+    def counting_extract(path):
+        calls.append(path)
+        return extract(path)
+    monkeypatch.setattr(backend, '_extract_pdf_pages', counting_extract)
+    content = make_pdf('Experience\nPython developer', 'Skills\nDocker')
+    first = create_application(client, JOB_TITLE)
+    second = create_application(client, JOB_TITLE)
+    upload_resume(client, first, content)
+    upload_resume(client, second, content)
+
+    conn = backend.get_db_connection()
+    try:
+        results = [backend.get_resume_extraction(conn, backend.get_resume_record(conn, app_id))
+                   for app_id in (first, second, first)]
+        assert len(calls) == 1
+        text, pages = results[0]['text'], results[0]['pages']
+        assert all(result == results[0] for result in results)
+        assert [text[p['start']:p['end']] for p in pages] == ['Experience\nPython developer', 'Skills\nDocker']
+
+        # Once no resume references the old content its cached text is dropped
+        old_sha256 = results[0]['sha256']
+        upload_resume(client, first, make_pdf('Replacement'))
+        upload_resume(client, second, make_pdf('Replacement'))
+        assert conn.execute("SELECT 1 FROM resume_text_cache WHERE sha256 = ?", (old_sha256,)).fetchone() is None
+        assert backend.get_resume_extraction(conn, backend.get_resume_record(conn, first))['text'] == 'Replacement'
+        assert len(calls) == 2
+    finally:
+        conn.close()
+
+
+def _incoming_files():
+    return sorted(os.listdir(backend.UPLOAD_TMP_FOLDER))
+
+
+def test_rejected_uploads_leave_no_temp_files(client):
+    app_id = create_application(client, JOB_TITLE)
+    before = _incoming_files()
+    oversized = b'%PDF-' + b'0' * backend.RESUME_MAX_BYTES
+    response = client.post(f'/api/submit_application/{app_id}', data={'resume': (io.BytesIO(oversized), 'cv.pdf')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 413
+    response = client.post(f'/api/submit_application/{app_id}', data={'resume': (io.BytesIO(b'plain text'), 'cv.pdf')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 400
+    assert _incoming_files() == before
+
+    conn = backend.get_db_connection()
+    assert backend.get_resume_record(conn, app_id) is None
+    conn.close()
+
+
+def test_resumable_upload_appends_at_the_committed_offset(client):
+    app_id = create_application(client, JOB_TITLE)
+    content = make_pdf('Resumable upload')
+    response = client.post('/api/uploads', json={'app_id': app_id, 'file_name': 'cv.pdf', 'size': len(content)})
+    assert response.status_code == 201
+    upload_id = response.get_json()['upload_id']
+    upload_url = f'/api/uploads/{upload_id}'
+
+    half = len(content) // 2
+    response = client.patch(upload_url, data=content[:half], headers={'Upload-Offset': '0'})
+    assert response.headers['Upload-Offset'] == str(half)
+    # A retried chunk at a stale offset is refused with the committed offset
+    response = client.patch(upload_url, data=content[:half], headers={'Upload-Offset': '0'})
+    assert response.status_code == 409 and response.headers['Upload-Offset'] == str(half)
+    response = client.post(f'{upload_url}/complete', json={})
+    assert response.status_code == 409
+    response = client.patch(upload_url, data=content[half:] + b'extra', headers={'Upload-Offset': str(half)})
+    assert response.status_code == 413
+    response = client.patch(upload_url, data=content[half:], headers={'Upload-Offset': str(half)})
+    assert response.get_json()['complete']
+
+    response = client.post(f'{upload_url}/complete', json={'sha256': '0' * 64})
+    assert response.status_code == 422
+    sha256 = hashlib.sha256(content).hexdigest()
+    response = client.post(f'{upload_url}/complete', json={'sha256': sha256})
+    assert response.status_code == 200, response.get_json()
+    assert client.get(upload_url).status_code == 404
+
+    conn = backend.get_db_connection()
+    resume = backend.get_resume_record(conn, app_id)
+    conn.close()
+    assert resume['sha256'] == sha256
+    assert client.get(f'/api/view_resume/{app_id}', headers=RECRUITER_HEADERS).data == content
+
+
+def _blob(sha256):
+    conn = backend.get_db_connection()
+    try:
+        return conn.execute("SELECT * FROM resume_blobs WHERE sha256 = ?", (sha256,)).fetchone()
+    finally:
+        conn.close()
+
+
+def test_identical_resumes_share_a_blob_until_gc(client):
+    content = make_pdf('Shared blob resume')
+    sha256 = hashlib.sha256(content).hexdigest()
+    first = create_application(client, JOB_TITLE)
+    second = create_application(client, JOB_TITLE)
+    upload_resume(client, first, content)
+    upload_resume(client, second, content)
+    blob_path = os.path.join(backend.RESUME_BLOB_FOLDER, sha256[:2], sha256[2:4], sha256)
+    assert os.path.exists(blob_path)
+    assert _blob(sha256)['ref_count'] == 2
+    # Re-uploading the same file keeps a single reference per application
+    upload_resume(client, first, content)
+    assert _blob(sha256)['ref_count'] == 2
+
+    upload_resume(client, first, make_pdf('First replacement'))
+    upload_resume(client, second, make_pdf('Second replacement'))
+    blob = _blob(sha256)
+    assert blob['ref_count'] == 0 and blob['unreferenced_at'] is not None
+    conn = backend.get_db_connection()
+    assert conn.execute("SELECT 1 FROM jobs WHERE kind = 'gc_resume_blobs' AND status = 'queued'").fetchone()
+    conn.close()
+
+    backend.gc_resume_blobs(grace_seconds=3600)
+    assert os.path.exists(blob_path)
+    removed, freed = backend.gc_resume_blobs(grace_seconds=0)
+    assert removed >= 1 and freed >= len(content)
+    assert not os.path.exists(blob_path)
+    assert _blob(sha256) is None
+
+
+def test_gc_removes_orphaned_blob_files_only_when_asked():
+    orphan_sha256 = 'ab' * 32
+    orphan_path = backend.resume_blob_path(orphan_sha256)
+    os.makedirs(os.path.dirname(orphan_path), exist_ok=True)
+    with open(orphan_path, 'wb') as fh:
+        fh.write(b'%PDF-orphan')
+    os.utime(orphan_path, (1, 1))
+
+    backend.gc_resume_blobs(grace_seconds=0)
+    assert os.path.exists(orphan_path)
+    backend.gc_resume_blobs(grace_seconds=0, include_orphans=True)
+    assert not os.path.exists(orphan_path)
+
+
+def test_resume_is_served_with_etag_and_ranges(client, monkeypatch):
+    app_id = create_application(client, JOB_TITLE)
+    content = make_pdf('Range request resume')
+    sha256 = hashlib.sha256(content).hexdigest()
+    upload_resume(client, app_id, content)
+    url = f'/api/view_resume/{app_id}'
+
+    response = client.get(url, headers=RECRUITER_HEADERS)
+    assert response.headers['ETag'] == f'"{sha256}"'
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert set(response.headers['Cache-Control'].split(', ')) == {'private', 'no-cache'}
+    assert 'X-Recruiter-Key' in response.headers['Vary']
+
+    response = client.get(url, headers={**RECRUITER_HEADERS, 'If-None-Match': f'"{sha256}"'})
+    assert response.status_code == 304 and response.data == b''
+
+    response = client.get(url, headers={**RECRUITER_HEADERS, 'Range': 'bytes=0-9'})
+    assert response.status_code == 206
+    assert response.data == content[:10]
+    assert response.headers['Content-Range'] == f'bytes 0-9/{len(content)}'
+    response = client.get(url, headers={**RECRUITER_HEADERS, 'Range': 'bytes=0-9', 'If-Range': '"stale"'})
+    assert response.status_code == 200 and response.data == content
+
+    monkeypatch.setattr(backend, 'RESUME_ACCEL_REDIRECT_PREFIX', '/protected-resumes/')
+    response = client.get(url, headers=RECRUITER_HEADERS)
+    assert response.headers['X-Accel-Redirect'] == f'/protected-resumes/{sha256[:2]}/{sha256[2:4]}/{sha256}'
+    assert response.data == b''
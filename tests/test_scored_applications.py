@@ -0,0 +1,89 @@
+import backend
+from conftest import RECRUITER_HEADERS, create_application, make_pdf, upload_resume
+
+JOB_TITLE = 'Status Filter Engineer'
+
+
+def _listed(client, **params):
+    params.setdefault('job_title', JOB_TITLE)
+    response = client.get('/api/scored_applications', headers=RECRUITER_HEADERS, query_string=params)
+    assert response.status_code == 200, response.get_json()
+    return {a['App_ID']: a['Application_Status'] for a in response.get_json()['applications']}
+
+
+def _set_status(client, app_id, status):
+    response = client.patch(f'/api/schedule/{app_id}', headers=RECRUITER_HEADERS, json={'application_status': status})
+    assert response.status_code == 200, response.get_json()
+
+
+def test_status_filter_follows_invite_updates(client):
+    first, second, third = (create_application(client, JOB_TITLE) for _ in range(3))
+    assert _listed(client) == {first: 'Open', second: 'Open', third: 'Open'}
+
+    _set_status(client, first, 'Selected')
+    assert _listed(client, status='Selected') == {first: 'Selected'}
+    assert _listed(client, status='Open') == {second: 'Open', third: 'Open'}
+
+    _set_status(client, first, 'Rejected')
+    _set_status(client, second, 'Selected')
+    assert _listed(client, status='Selected') == {second: 'Selected'}
+    assert _listed(client, status='Rejected') == {first: 'Rejected'}
+    assert _listed(client)[third] == 'Open'
+
+
+def test_rescored_rows_keep_their_status(client):
+    app_id = create_application(client, JOB_TITLE)
+    _set_status(client, app_id, 'Selected')
+    assert _listed(client, status='Selected')[app_id] == 'Selected'
+
+    conn = backend.get_db_connection()
+    backend.invalidate_ats_score(conn, app_id)
+    conn.commit()
+    conn.close()
+    assert _listed(client, status='Selected')[app_id] == 'Selected'
+
+
+def test_status_filter_uses_index():
+    clauses, params = backend._scored_applications_filters({'status': 'Selected'})
+    conn = backend.get_db_connection()
+    plan = conn.execute(
+        f"EXPLAIN QUERY PLAN SELECT app_id FROM ats_scores s WHERE {' AND '.join(clauses)} ORDER BY s.score DESC, s.app_id ASC",
+        params
+    ).fetchall()
+    conn.close()
+    details = ' '.join(row['detail'] for row in plan)
+    assert 'idx_ats_scores_status_keyset' in details
+    assert 'TEMP B-TREE' not in details
+
+
+def test_keyset_pages_cover_the_listing_once(client):
+    job_title = 'Keyset Paging Engineer'
+    for i in range(7):
+        # Varying work history spreads the scores; equal scores are ordered by App_ID
+        app_id = create_application(client, job_title, work=[{'title': 'Python developer'}] * (i % 3))
+        if i % 4:
+            upload_resume(client, app_id, make_pdf('Resume'))
+    listings = {}
+    for sort in ('score_desc', 'score_asc'):
+        query = {'job_title': job_title, 'sort': sort}
+        full = client.get('/api/scored_applications', headers=RECRUITER_HEADERS, query_string=query).get_json()
+        assert full['total'] == 7 and full['next_cursor'] is None
+        listings[sort] = [(a['ATS_Score'], a['App_ID']) for a in full['applications']]
+
+        paged, cursor = [], None
+        while True:
+            page_query = dict(query, limit=3, cursor=cursor) if cursor else dict(query, limit=3)
+            page = client.get('/api/scored_applications', headers=RECRUITER_HEADERS, query_string=page_query).get_json()
+            assert page['total'] == 7 and len(page['applications']) <= 3
+            paged.extend((a['ATS_Score'], a['App_ID']) for a in page['applications'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        assert paged == listings[sort]
+    assert listings['score_desc'] == sorted(listings['score_desc'], key=lambda row: (-row[0], row[1]))
+    assert listings['score_asc'] == listings['score_desc'][::-1]
+    assert len({score for score, _ in listings['score_desc']}) > 1
+
+    response = client.get('/api/scored_applications', headers=RECRUITER_HEADERS,
+                          query_string={'job_title': job_title, 'limit': 3, 'cursor': 'not-a-cursor'})
+    assert response.status_code == 400
@@ -0,0 +1,112 @@
+import shutil
+import subprocess
+from email.mime.text import MIMEText
+
+import pytest
+
+import backend
+from smtp_stub import StubSMTPServer
+
+
+@pytest.fixture(scope='module')
+def certificate(tmp_path_factory):
+    if shutil.which('openssl') is None:
+        pytest.skip('openssl is needed to make the stub server certificate')
+    directory = tmp_path_factory.mktemp('smtp-cert')
+    certfile, keyfile = str(directory / 'cert.pem'), str(directory / 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1', '-subj', '/CN=localhost',
+                    '-keyout', keyfile, '-out', certfile], check=True, capture_output=True)
+    return certfile, keyfile
+
+
+def _drain_pool():
+    while not backend._smtp_pool.empty():
+        backend._close_smtp_session(backend._smtp_pool.get_nowait()[0])
+
+
+@pytest.fixture
+def smtp_server(certificate, monkeypatch):
+    server = StubSMTPServer(*certificate)
+    server.start()
+    monkeypatch.setenv('EMAIL_HOST', '127.0.0.1')
+    monkeypatch.setenv('EMAIL_PORT', str(server.port))
+    monkeypatch.setenv('EMAIL_HOST_USER', 'careers@example.com')
+    monkeypatch.setenv('EMAIL_HOST_PASSWORD', 'secret')
+    monkeypatch.setenv('EMAIL_RATE_PER_MINUTE', '0')
+    monkeypatch.setenv('EMAIL_RATE_PER_DAY', '0')
+    monkeypatch.setattr(backend, '_smtp_transport', None)
+    _drain_pool()
+    conn = backend.get_db_connection()
+    conn.execute("DELETE FROM email_outbox")
+    conn.commit()
+    conn.close()
+    yield server
+    _drain_pool()
+    server.stop()
+
+
+def _queue_invites(recipients):
+    conn = backend.get_db_connection()
+    ids = [backend.enqueue_email(conn, backend.build_interview_invite(r, 'Ann', 'Nurse', f'APP-{i}'), f'APP-{i}', 'interview_invite')[0]
+           for i, r in enumerate(recipients)]
+    conn.commit()
+    conn.close()
+    return ids
+
+
+def _outbox(ids):
+    conn = backend.get_db_connection()
+    rows = {r['id']: dict(r) for r in conn.execute(
+        f"SELECT id, status, last_error FROM email_outbox WHERE id IN ({', '.join('?' * len(ids))})", ids)}
+    conn.close()
+    return [rows[i] for i in ids]
+
+
+def test_outbox_sends_one_message_per_recipient(smtp_server):
+    recipients = [f'applicant{i}@example.com' for i in range(4)]
+    ids = _queue_invites(recipients)
+
+    assert backend.run_pending_emails() == 4
+    assert [row['status'] for row in _outbox(ids)] == ['sent'] * 4
+    assert sorted(rcpts for _, rcpts, _ in smtp_server.messages) == [[r] for r in recipients]
+    for (_, rcpts, data) in smtp_server.messages:
+        assert f"To: {rcpts[0]}".encode() in data
+
+
+def test_session_is_reused_across_messages(smtp_server):
+    before = backend.smtp_pool_stats()
+    for i in range(3):
+        msg = MIMEText('Hello')
+        msg['Subject'], msg['From'], msg['To'] = 'Hi', 'careers@example.com', f'r{i}@example.com'
+        backend.send_pooled_message(msg)
+
+    after = backend.smtp_pool_stats()
+    assert smtp_server.sessions == 1
+    assert {session for session, _, _ in smtp_server.messages} == {1}
+    assert after['connects'] - before['connects'] == 1
+    assert after['reused'] - before['reused'] == 2
+    assert after['transport'] == 'starttls'
+
+
+def test_refused_recipient_fails_without_retry(smtp_server):
+    smtp_server.refuse.add('nobody@example.com')
+    ids = _queue_invites(['first@example.com', 'nobody@example.com', 'second@example.com'])
+
+    assert backend.run_pending_emails() == 3
+    first, refused, second = _outbox(ids)
+    assert (first['status'], second['status']) == ('sent', 'sent')
+    assert refused['status'] == 'failed' and refused['last_error'].startswith('Recipient refused')
+    # The session survives the refusal and delivers the next message
+    assert smtp_server.sessions == 1
+    assert [rcpts for _, rcpts, _ in smtp_server.messages] == [['first@example.com'], ['second@example.com']]
+
+
+def test_dropped_connection_is_retried_on_a_new_session(smtp_server):
+    smtp_server.drop_after = 2
+    before = backend.smtp_pool_stats()
+    ids = _queue_invites([f'applicant{i}@example.com' for i in range(3)])
+
+    assert backend.run_pending_emails() == 3
+    assert [row['status'] for row in _outbox(ids)] == ['sent'] * 3
+    assert [session for session, _, _ in smtp_server.messages] == [1, 1, 2]
+    assert backend.smtp_pool_stats()['reconnects'] - before['reconnects'] == 1